@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks for the django_snooze hot paths, run them with runbenchmarks.py.
+
+Every result is kept in RESULTS so runbenchmarks.py can write them as JSON
+and runs of different versions can be compared.
+"""
+
+import os
+import timeit
+
+from django.db import connection, models
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+    import resource
+
+# The numbers of rows the benchmarks that seed tables run with, changed by
+# the --sizes option of runbenchmarks.py.
+SIZES = [1000, 10000, 100000]
+
+# The results of the benchmarks that ran, as dictionaries.
+RESULTS = []
+
+
+def best_of(func, repeat=3):
+    """Times a function a couple of times and takes the fastest run.
+
+    :param func: The function to time, called without arguments.
+    :param repeat: The number of runs.
+    :returns: The duration of the fastest run in seconds.
+
+    """
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def get_maxrss():
+    """Gets the peak resident size of the current process.
+
+    :returns: The peak in bytes.
+
+    """
+    # Linux reports kilobytes, macOS bytes.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if peak > 1 << 30 else peak * 1024
+
+
+def rss_growth(func):
+    """Runs a function and measures how much the peak resident size grows.
+
+    :param func: The function to run, called without arguments.
+    :returns: The growth in bytes.
+
+    """
+    before = get_maxrss()
+    func()
+    return get_maxrss() - before
+
+
+def peak_memory(func):
+    """Runs a function once and measures the peak memory use. On Python 3
+    that's the peak of the memory allocated during the run. On Python 2 it's
+    how much the peak resident size grows during the run, which is measured
+    in a forked process, whose peak starts at the current resident size, so
+    the peaks of earlier benchmarks don't hide it.
+
+    :param func: The function to run, called without arguments.
+    :returns: The peak in bytes.
+
+    """
+    if tracemalloc is None:
+        if not hasattr(os, 'fork'):
+            return rss_growth(func)
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if not pid:
+            os.close(read_fd)
+            status = 1
+            try:
+                os.write(write_fd, str(rss_growth(func)).encode('ascii'))
+                status = 0
+            finally:
+                os._exit(status)
+        os.close(write_fd)
+        try:
+            output = os.read(read_fd, 64)
+        finally:
+            os.close(read_fd)
+        if os.waitpid(pid, 0)[1]:
+            raise RuntimeError('The benchmark failed in the forked process.')
+        return int(output)
+
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def get_memory_source():
+    """Gets what peak_memory measures, for the JSON output.
+
+    :returns: tracemalloc or maxrss growth.
+
+    """
+    return 'maxrss growth' if tracemalloc is None else 'tracemalloc'
+
+
+def report(name, duration, rows=None, memory=None, unit='rows'):
+    """Prints the result of a benchmark and adds it to RESULTS.
+
+    :param name: The name of the benchmark.
+    :param duration: The duration in seconds.
+    :param rows: The number of rows, or other units, processed, if any.
+    :param memory: The peak memory use in bytes, if measured.
+    :param unit: What rows counts, like rows, requests or resolves.
+    :returns: None
+
+    """
+    line = '    {:<40} {:>10.2f} ms'.format(name, duration * 1000)
+    if rows:
+        line += ' {:>12,.0f} {}/s'.format(rows / duration, unit)
+    if memory is not None:
+        line += ' {:>8.1f} MB'.format(memory / 1048576.0)
+    print(line)
+    RESULTS.append({
+        'name': name,
+        'duration': duration,
+        'rows': rows,
+        'throughput': rows / duration if rows else None,
+        'unit': unit if rows else None,
+        'memory': memory,
+    })
+
+
+def create_tables(*model_classes):
+    """Creates the tables of models that aren't synced, like the ones of the
+    benchmarks app.
+
+    :param *model_classes: The models.
+    :returns: None
+
+    """
+    existing = connection.introspection.table_names()
+    with connection.schema_editor() as editor:
+        for model in model_classes:
+            if model._meta.db_table not in existing:
+                editor.create_model(model)
+
+
+def make_models(prefix, count):
+    """Creates throwaway models in the benchmarks app, with an integer, a
+    string and a date field.
+
+    :param prefix: The start of the model names, unique per benchmark.
+    :param count: The number of models.
+    :returns: A list of model classes.
+
+    """
+    result = []
+    for idx in range(count):
+        attrs = {
+            '__module__': __name__,
+            'Meta': type('Meta', (), {'app_label': 'benchmarks'}),
+            'one': models.IntegerField(),
+            'two': models.CharField(max_length=100, default='spam'),
+            'three': models.DateTimeField(null=True),
+        }
+        result.append(type(str('{}{}'.format(prefix, idx)),
+                           (models.Model,), attrs))
+    return result
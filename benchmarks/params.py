@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+Measures parsing and validating query parameters with and without the query
+plan cache of the resource.
+"""
+
+from django.http import QueryDict
+from django.test.client import RequestFactory
+from django.test.utils import override_settings
+
+from django_snooze.apis import API
+from django_snooze.resource import ModelResource
+from django_snooze.views import QueryView
+
+from benchmarks import best_of, report
+from tests.models import Simple
+
+REQUESTS = 10000
+
+
+def build_querysets(resource, query_string):
+    """Builds the filtered queryset of a query string the way QueryView does
+    for every request.
+
+    :param resource: The resource.
+    :param query_string: The query string.
+    :returns: None
+
+    """
+    request = RequestFactory().get('/')
+    get_dict = QueryDict(query_string)
+    for _ in range(REQUESTS):
+        view = QueryView(resource=resource, request=request)
+        view.parse_get_data(get_dict)
+        view.exclude_queryset(view.filter_queryset(resource.queryset))
+
+
+def run():
+    query_string = 'one__gte=1&two__in=a&two__in=b&!id=3'
+    for size in (0, 128):
+        with override_settings(SNOOZE_QUERY_PLAN_CACHE_SIZE=size):
+            resource = ModelResource(Simple, API())
+        report('filters, {} cached plans'.format(size),
+               best_of(lambda: build_querysets(resource, query_string)),
+               REQUESTS, unit='requests')
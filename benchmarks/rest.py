@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+Measures the throughput and peak memory of the REST views on seeded tables
+of wide rows and of rows that are mostly foreign keys, for every size in
+SIZES. Requests are resolved against the URLs of the API and handed to the
+views, without middleware.
+"""
+
+import datetime
+import json
+from decimal import Decimal
+
+from django.core.urlresolvers import RegexURLResolver
+from django.test.client import RequestFactory
+from django.utils import timezone
+
+from django_snooze.apis import API
+
+import benchmarks
+from benchmarks import best_of, create_tables, peak_memory, report
+from benchmarks.synthetic import Child, Parent, Wide
+
+# The number of requests of the benchmarks that don't depend on the size.
+REQUESTS = 1000
+# The number of objects created per request by the bulk create benchmark.
+BULK_OBJECTS = 1000
+# The number of Parent rows the foreign keys of Child point to.
+PARENTS = 1000
+
+
+def make_wide(idx):
+    """Builds a Wide object with values derived from a number.
+
+    :param idx: The number.
+    :returns: An unsaved Wide object.
+
+    """
+    now = timezone.now()
+    return Wide(int_one=idx, int_two=idx % 100, int_three=idx * 1000,
+                int_four=idx, int_five=idx % 1000,
+                char_one='Row {}'.format(idx), char_two='Group {}'.format(
+                    idx % 100),
+                char_three='x' * 50, char_four='', text='Text ' * 20,
+                date=datetime.date(2000, 1, 1), datetime_one=now,
+                datetime_two=None if idx % 2 else now,
+                bool_one=bool(idx % 2), bool_two=None,
+                decimal_one=Decimal('{}.25'.format(idx)),
+                decimal_two=Decimal('1.1234'), float_one=idx / 3.0,
+                float_two=None)
+
+
+def seed(size):
+    """Tops up the tables to the given number of rows.
+
+    :param size: The number of rows.
+    :returns: None
+
+    """
+    if not Parent.objects.exists():
+        Parent.objects.bulk_create(
+            [Parent(name='Parent {}'.format(x)) for x in range(PARENTS)],
+            batch_size=500)
+    parents = list(Parent.objects.values_list('pk', flat=True))
+
+    count = Wide.objects.count()
+    Wide.objects.bulk_create([make_wide(x) for x in range(count, size)],
+                             batch_size=500)
+    count = Child.objects.count()
+    Child.objects.bulk_create(
+        [Child(first_id=parents[x % PARENTS],
+               second_id=parents[(x + 1) % PARENTS],
+               third_id=parents[(x + 2) % PARENTS] if x % 2 else None,
+               fourth_id=None, name='Child {}'.format(x))
+         for x in range(count, size)],
+        batch_size=500)
+
+
+class Client(object):
+    """
+    Resolves requests against the URLs of an API and calls the views.
+    """
+
+    def __init__(self, api):
+        patterns, app_name, namespace = api.urls
+        self.resolver = RegexURLResolver(r'^/', patterns, app_name=app_name,
+                                         namespace=namespace)
+        self.factory = RequestFactory()
+
+    def request(self, request):
+        """Handles a request and reads the whole body of the response.
+
+        :param request: The request.
+        :returns: The response.
+
+        """
+        match = self.resolver.resolve(request.path_info)
+        response = match.func(request, *match.args, **match.kwargs)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        else:
+            response.content
+        assert response.status_code < 400, response.content
+        return response
+
+    def get(self, path, **params):
+        return self.request(self.factory.get(path, params))
+
+    def post(self, path, data):
+        return self.request(self.factory.post(
+            path, json.dumps(data), content_type='application/json'))
+
+
+def measure(name, func, rows=None, unit='rows'):
+    """Times a benchmark and measures its peak memory use.
+
+    :param name: The name of the benchmark.
+    :param func: The benchmark, called without arguments.
+    :param rows: The number of rows or requests handled per call.
+    :param unit: What rows counts, see report.
+    :returns: None
+
+    """
+    report(name, best_of(func), rows, peak_memory(func), unit)
+
+
+def run():
+    create_tables(Wide, Parent, Child)
+    api = API()
+    for model in (Wide, Parent, Child):
+        api.register(model)
+    api.rebuild_documents()
+    client = Client(api)
+
+    measure('index', lambda: [client.get('/') for _ in range(REQUESTS)],
+            REQUESTS, 'requests')
+    measure('schema', lambda: [client.get('/benchmarks/wide/schema/')
+                               for _ in range(REQUESTS)], REQUESTS, 'requests')
+    measure('resolve', lambda: [client.resolver.resolve('/benchmarks/wide/1/')
+                                for _ in range(REQUESTS)], REQUESTS,
+            'resolves')
+
+    data = {'name': 'Created'}
+    measure('create', lambda: [client.post('/benchmarks/parent/new/', data)
+                               for _ in range(REQUESTS)], REQUESTS,
+            'requests')
+    measure('create bulk', lambda: client.post('/benchmarks/parent/new/',
+                                               [data] * BULK_OBJECTS),
+            BULK_OBJECTS)
+    Parent.objects.filter(name='Created').delete()
+
+    for size in benchmarks.SIZES:
+        seed(size)
+        measure('pk wide {}'.format(size),
+                lambda: [client.get('/benchmarks/wide/{}/'.format(
+                    (x * 7919) % size + 1)) for x in range(REQUESTS)],
+                REQUESTS, 'requests')
+        measure('query wide {}'.format(size),
+                lambda: client.get('/benchmarks/wide/'), size)
+        measure('query wide values_list {}'.format(size),
+                lambda: client.get('/benchmarks/wide/',
+                                   __values_list='int_one,char_one,date'),
+                size)
+        measure('query wide ordered {}'.format(size),
+                lambda: client.get('/benchmarks/wide/',
+                                   __order_by='-char_two,int_one'),
+                size)
+        measure('query wide streamed {}'.format(size),
+                lambda: client.get('/benchmarks/wide/', __stream='1'), size)
+        measure('query fk {}'.format(size),
+                lambda: client.get('/benchmarks/child/'), size)
+        measure('query fk expanded {}'.format(size),
+                lambda: client.get('/benchmarks/child/',
+                                   __expand='first,second'), size)
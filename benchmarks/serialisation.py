@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Compares the compiled row serialisers with serialising field by field.
+"""
+
+from collections import OrderedDict
+
+from django_snooze.apis import API
+from django_snooze.resource import ModelResource
+from django_snooze.rows import convert_columns
+
+from benchmarks import best_of, report
+from tests.models import Simple
+
+ROWS = 100000
+
+
+def field_loop_obj_to_json(resource, obj):
+    """Serialises an object the way ModelResource did before the compiled
+    serialisers.
+    """
+    obj_dict = {}
+    for obj_field in resource.fields:
+        obj_dict[obj_field.name] = obj_field.to_json(
+            getattr(obj, obj_field.name)
+        )
+    return obj_dict
+
+
+def field_loop_tuple_to_json(resource, values, keys):
+    """Serialises a tuple the way ModelResource did before the compiled
+    serialisers.
+    """
+    obj_dict = OrderedDict()
+    for idx, key in enumerate(keys):
+        obj_dict[key] = resource.fields_dict[key].to_json(values[idx])
+    return obj_dict
+
+
+def run():
+    resource = ModelResource(Simple, API())
+    objs = [Simple(id=x + 1, one=x + 1, two='Row {}'.format(x))
+            for x in range(ROWS)]
+    keys = ['one', 'two']
+    tuples = [(x.one, x.two) for x in objs]
+
+    assert ([field_loop_obj_to_json(resource, x) for x in objs[:10]] ==
+            [resource.obj_to_json(x) for x in objs[:10]])
+
+    report('obj_to_json field loop',
+           best_of(lambda: [field_loop_obj_to_json(resource, x)
+                            for x in objs]),
+           ROWS)
+    serialiser = resource.serialiser
+    report('obj_to_json compiled',
+           best_of(lambda: [serialiser(x) for x in objs]),
+           ROWS)
+
+    rows = [(x.id, x.one, x.two) for x in objs]
+    serialiser = resource.row_serialiser
+    report('values_list rows compiled',
+           best_of(lambda: [serialiser(x) for x in rows]),
+           ROWS)
+
+    report('tuple_to_json field loop',
+           best_of(lambda: [field_loop_tuple_to_json(resource, x, keys)
+                            for x in tuples]),
+           ROWS)
+    serialiser = resource.get_tuple_serialiser(keys)
+    report('tuple_to_json compiled',
+           best_of(lambda: [serialiser(x) for x in tuples]),
+           ROWS)
+
+    fields = [resource.fields_dict[x] for x in keys]
+    report('tuples by column',
+           best_of(lambda: convert_columns(fields, tuples)),
+           ROWS)
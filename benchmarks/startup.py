@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""
+Measures discovering the models of a project with many models, building all
+resources up front and building them lazily.
+"""
+
+from django.test.utils import override_settings
+
+from django_snooze.apis import API
+
+from benchmarks import best_of, make_models, report
+
+MODELS = 1000
+
+
+def discover(**kwargs):
+    """Discovers the models with a new API and sets up its URLs.
+
+    :param kwargs: The arguments of the API.
+    :returns: None
+
+    """
+    api = API(**kwargs)
+    api.discover_models()
+    api.get_urls()
+
+
+def run():
+    make_models('Startup', MODELS)
+
+    report('discover {} models'.format(MODELS),
+           best_of(lambda: discover(lazy=False)))
+    report('discover {} models lazy'.format(MODELS),
+           best_of(lambda: discover(lazy=True)))
+    with override_settings(SNOOZE_EXCLUDE=['benchmarks']):
+        report('discover excluding the benchmarks app',
+               best_of(lambda: discover(lazy=False)))
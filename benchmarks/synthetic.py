@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+Synthetic models for the REST benchmarks, their tables are created by the
+benchmarks that use them.
+"""
+
+from django.db import models
+
+
+class Wide(models.Model):
+    """
+    A model with many columns of all common types.
+    """
+
+    int_one = models.IntegerField()
+    int_two = models.IntegerField(db_index=True)
+    int_three = models.BigIntegerField()
+    int_four = models.PositiveIntegerField()
+    int_five = models.PositiveSmallIntegerField()
+    char_one = models.CharField(max_length=100)
+    char_two = models.CharField(max_length=100, db_index=True)
+    char_three = models.CharField(max_length=100)
+    char_four = models.CharField(max_length=100, blank=True)
+    text = models.TextField(blank=True)
+    date = models.DateField()
+    datetime_one = models.DateTimeField()
+    datetime_two = models.DateTimeField(null=True)
+    bool_one = models.BooleanField(default=False)
+    bool_two = models.NullBooleanField()
+    decimal_one = models.DecimalField(max_digits=12, decimal_places=2)
+    decimal_two = models.DecimalField(max_digits=12, decimal_places=4)
+    float_one = models.FloatField()
+    float_two = models.FloatField(null=True)
+
+
+class Parent(models.Model):
+    """
+    The model the foreign keys of Child point to.
+    """
+
+    name = models.CharField(max_length=100)
+
+
+class Child(models.Model):
+    """
+    A model that's mostly foreign keys.
+    """
+
+    first = models.ForeignKey(Parent, related_name='+')
+    second = models.ForeignKey(Parent, related_name='+')
+    third = models.ForeignKey(Parent, related_name='+', null=True)
+    fourth = models.ForeignKey(Parent, related_name='+', null=True)
+    name = models.CharField(max_length=100)
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+Compares resolving resource URLs through the per-model patterns with the
+single router pattern, for APIs of growing numbers of models.
+"""
+
+from django.core.urlresolvers import RegexURLResolver
+
+from django_snooze.apis import API
+
+from benchmarks import best_of, make_models, report
+
+SIZES = [10, 100, 300, 1000]
+LOOKUPS = 100
+
+
+def make_resolver(model_classes, router):
+    """Builds a URL resolver for an API of the given models.
+
+    :param model_classes: The models to expose.
+    :param router: Whether to use router mode.
+    :returns: A RegexURLResolver.
+
+    """
+    api = API(router=router)
+    for model in model_classes:
+        api.register(model)
+    patterns, app_name, namespace = api.urls
+    return RegexURLResolver(r'^/', patterns, app_name=app_name,
+                            namespace=namespace)
+
+
+def run():
+    for size in SIZES:
+        model_classes = make_models('Urls{}x'.format(size), size)
+        # The last model is the worst case for the per-model patterns.
+        path = '/benchmarks/{}/1/'.format(
+            model_classes[-1]._meta.model_name)
+        for router in (False, True):
+            resolver = make_resolver(model_classes, router)
+            resolver.resolve(path)
+            report('resolve {} models{}'.format(
+                size, ' router' if router else ''),
+                best_of(lambda: [resolver.resolve(path)
+                                 for _ in range(LOOKUPS)]),
+                LOOKUPS, unit='resolves')
@@ -1,9 +1,14 @@
 # -*- coding: utf-8 -*-
 
+from django.core.urlresolvers import RegexURLResolver, reverse
 from django.db.models import get_models
+from django.db.models.signals import post_delete, post_save
 
+from django_snooze.cache import invalidate_model
+from django_snooze.conf import get_setting
 from django_snooze.resource import ModelResource
-from django_snooze.views import IndexView
+from django_snooze.views import (BatchView, IndexView, MetricsView,
+                                 RouterView, build_document)
 
 
 class API(object):
@@ -12,11 +17,34 @@ class API(object):
     routing.
     """
 
-    def __init__(self, name='django_snooze', app_name='django_snooze'):
+    def __init__(self, name='django_snooze', app_name='django_snooze',
+                 router=None, lazy=None, metrics=None):
+        """Sets up an empty API.
+
+        :param name: The instance namespace of the API URLs.
+        :param app_name: The application namespace of the API URLs.
+        :param router: Whether to route all resource URLs through a single
+                       URL pattern, defaults to the URL_ROUTER setting.
+        :param lazy: Whether resources are built on their first request,
+                     defaults to the LAZY_RESOURCES setting.
+        :param metrics: Whether to serve the request metrics at metrics/,
+                        defaults to the METRICS setting.
+        :returns: None
+
+        """
         self._resources = {}
+        self._registry = {}
         self.name = name
         self.app_name = app_name
+        self.router = get_setting('URL_ROUTER') if router is None else router
+        self.lazy = get_setting('LAZY_RESOURCES') if lazy is None else lazy
+        self.metrics = get_setting('METRICS') if metrics is None else metrics
         self.index_view = self.get_index_view()
+        self.router_view = self.get_router_view()
+        self.batch_view = self.get_batch_view()
+        self.metrics_view = self.get_metrics_view()
+        self._resolver = None
+        self._index_document = None
         self.discovered = False
 
     def discover_models(self):
@@ -28,13 +56,129 @@ class API(object):
             return True
 
         for model in get_models():
-            app = model._meta.app_label
-            resources = self._resources.get(app, [])
-            resources.append(ModelResource(model, self))
-            self._resources[app] = resources
+            if self.is_exposed(model):
+                self.register(model)
         self.discovered = True
+        self.rebuild_documents()
         return True
 
+    def is_exposed(self, model):
+        """Checks the INCLUDE and EXCLUDE settings to see if a model should
+        be discovered.
+
+        :param model: The model class.
+        :returns: A boolean.
+
+        """
+        names = set([model._meta.app_label.lower(),
+                     '{}.{}'.format(model._meta.app_label,
+                                    model._meta.model_name).lower()])
+        include = get_setting('INCLUDE')
+        if include is not None and not names & set(x.lower()
+                                                   for x in include):
+            return False
+        return not names & set(x.lower() for x in get_setting('EXCLUDE'))
+
+    def register(self, model):
+        """Adds a model to the resource registry.
+
+        :param model: The model class.
+        :returns: The ModelResource of the model.
+
+        """
+        # Writes invalidate everything cached for the model. The receivers
+        # are only connected for registered models, Django fetches objects
+        # before deleting them when a model has any receiver.
+        post_save.connect(invalidate_model, sender=model,
+                          dispatch_uid='snooze_invalidate')
+        post_delete.connect(invalidate_model, sender=model,
+                            dispatch_uid='snooze_invalidate')
+
+        app = model._meta.app_label
+        resource = ModelResource(model, self, lazy=self.lazy)
+        resources = self._resources.get(app, [])
+        resources.append(resource)
+        self._resources[app] = resources
+        self._registry[(app, resource.model_name)] = resource
+        self._resolver = None
+        return resource
+
+    def get_index(self):
+        """Builds the index of all apps and models discovered by the API.
+
+        :returns: A dictionary keyed by app of dictionaries keyed by model
+                  name with the paths of the resource.
+
+        """
+        index_struct = {}
+        for app, resources in self._resources.items():
+            app_dict = index_struct.get(app, {})
+            for resource in resources:
+                app_dict[resource.model_name] = {
+                    'query_path': reverse('{}:{}'.format(
+                        self.app_name,
+                        resource.query_reverse_name
+                    )),
+                    'schema_path': reverse('{}:{}'.format(
+                        self.app_name,
+                        resource.schema_reverse_name
+                    )),
+                    'new_path': reverse('{}:{}'.format(
+                        self.app_name,
+                        resource.new_reverse_name
+                    ))
+                }
+            index_struct[app] = app_dict
+        return index_struct
+
+    def get_index_document(self):
+        """Gets the encoded index document. The index needs the URLs of the
+        API, which aren't loaded yet when the models are discovered, so it's
+        built on first use.
+
+        :returns: A document as returned by build_document.
+
+        """
+        if self._index_document is None:
+            self._index_document = build_document(self.get_index())
+        return self._index_document
+
+    def rebuild_documents(self):
+        """Drops the encoded index document and the schema documents of all
+        resources, they get rebuilt on their next use. Call this when
+        resources are added or changed.
+
+        :returns: None
+
+        """
+        self._index_document = None
+        for resources in self._resources.values():
+            for resource in resources:
+                resource.rebuild_schema_document()
+
+    def get_resource(self, model):
+        """Finds the resource of a model.
+
+        :param model: The model class.
+        :returns: The ModelResource of the model, None if it's not exposed.
+
+        """
+        resource = self._registry.get((model._meta.app_label,
+                                       model._meta.model_name))
+        if resource is None or resource.model is not model:
+            return None
+        return resource
+
+    def get_resource_by_name(self, app, model_name):
+        """Finds a resource by app label and model name.
+
+        :param app: The app label.
+        :param model_name: The model name.
+        :returns: The ModelResource, None if there is none.
+
+        """
+        return self._registry.get((app, model_name))
+
     def get_index_view(self):
         """Constructs an initialised IndexView.
 
@@ -43,31 +187,99 @@ class API(object):
         """
         return IndexView.as_view(api=self)
 
+    def get_router_view(self):
+        """Constructs an initialised RouterView.
+
+        :returns: An initialised RouterView
+
+        """
+        return RouterView.as_view(api=self)
+
+    def get_resource_view(self, resource, name):
+        """Gets a view of a resource for the URL patterns, lazy resources
+        get a view that builds the resource on its first request.
+
+        :param resource: The ModelResource.
+        :param name: The attribute name of the view, like query_view.
+        :returns: A view function.
+
+        """
+        if resource.lazy:
+            return resource.get_lazy_view(name)
+        return getattr(resource, name)
+
+    def get_batch_view(self):
+        """Constructs an initialised BatchView.
+
+        :returns: An initialised BatchView
+
+        """
+        return BatchView.as_view(api=self)
+
+    def get_metrics_view(self):
+        """Constructs an initialised MetricsView.
+
+        :returns: An initialised MetricsView
+
+        """
+        return MetricsView.as_view()
+
+    def get_resolver(self):
+        """Gets a resolver for paths below the API root, batches use it to
+        resolve their requests. It's built on first use.
+
+        :returns: A RegexURLResolver.
+
+        """
+        if self._resolver is None:
+            self._resolver = RegexURLResolver(r'^', self.get_urls())
+        return self._resolver
+
     def get_urls(self):
         """
         Constructs the API urls based on what models are registered.
+
+        In router mode a single pattern routes all resource URLs, the
+        patterns of the resources come after it so they can still be
+        reversed but are never tried when resolving.
         """
         from django.conf.urls import url
 
         # Base URL patterns
         urlpatterns = [
             url(r'^$', self.index_view, name='index'),
+            url(r'^batch/$', self.batch_view, name='batch'),
         ]
 
+        if self.metrics:
+            urlpatterns += [
+                url(r'^metrics/$', self.metrics_view, name='metrics'),
+            ]
+
+        if self.router:
+            urlpatterns += [
+                url(r'^(?P<app>[^/]+)/(?P<model_name>[^/]+)/(?P<path>.*)$',
+                    self.router_view,
+                    name='router'),
+            ]
+
         for app, resources in self._resources.items():
             for resource in resources:
                 urlpatterns += [
                     url(resource.query_url_re,
-                        resource.query_view,
+                        self.get_resource_view(resource, 'query_view'),
                         name=resource.query_reverse_name),
                     url(resource.schema_url_re,
-                        resource.schema_view,
+                        self.get_resource_view(resource, 'schema_view'),
                         name=resource.schema_reverse_name),
                     url(resource.pk_url_re,
-                        resource.pk_view,
+                        self.get_resource_view(resource, 'pk_view'),
                         name=resource.pk_reverse_name),
+                    url(resource.many_url_re,
+                        self.get_resource_view(resource, 'many_view'),
+                        name=resource.many_reverse_name),
                     url(resource.new_url_re,
-                        resource.new_view,
+                        self.get_resource_view(resource, 'new_view'),
                         name=resource.new_reverse_name),
                 ]
 
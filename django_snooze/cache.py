@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""
+Helpers for caching query results on top of Django's cache framework.
+
+Every model has a version number in the cache that is part of the key of all
+cached data of the model. Writes bump the version, which invalidates all
+cached data of the model at once.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from django_snooze.conf import get_setting
+
+try:
+    from django.core.cache import caches
+except ImportError:
+    # Django < 1.7
+    from django.core.cache import get_cache as _get_cache
+    caches = None
+
+_stats_lock = threading.Lock()
+_stats = defaultdict(lambda: {'hits': 0, 'misses': 0})
+
+
+def get_cache():
+    """Gets the cache django_snooze is configured to use.
+
+    :returns: A Django cache backend.
+
+    """
+    alias = get_setting('CACHE_ALIAS')
+    if caches is None:
+        return _get_cache(alias)
+    return caches[alias]
+
+
+def caching_enabled():
+    """Checks if any of the caches is enabled.
+
+    :returns: Boolean
+
+    """
+    return (get_setting('QUERY_CACHE_TIMEOUT') is not None or
+            get_setting('COUNT_CACHE_TIMEOUT') is not None)
+
+
+def _version_key(model):
+    """Builds the cache key of the version of a model, proxy and deferred
+    models share the version of their concrete model.
+
+    :param model: The model class.
+    :returns: A cache key.
+
+    """
+    meta = getattr(model._meta, 'concrete_model', model)._meta
+    return 'snooze:version:{}.{}'.format(meta.app_label, meta.model_name)
+
+
+def _initial_version():
+    """Versions start at the current time, so the version of a model whose
+    version got evicted from the cache never goes back to an older version.
+
+    :returns: A version number.
+
+    """
+    return int(time.time() * 1000)
+
+
+def get_versions(models):
+    """Gets the current versions of a number of models.
+
+    :param models: A list of model classes.
+    :returns: A list of version numbers.
+
+    """
+    cache = get_cache()
+    keys = [_version_key(x) for x in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _initial_version(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_version(model):
+    """Bumps the version of a model, invalidating everything that is cached
+    for it.
+
+    :param model: The model class.
+    :returns: None
+
+    """
+    cache = get_cache()
+    key = _version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _initial_version(), None)
+
+
+def invalidate_model(sender, **kwargs):
+    """Signal receiver for post_save and post_delete that bumps the version
+    of the model that was written to.
+
+    :param sender: The model class.
+    :param **kwargs: The signal arguments.
+    :returns: None
+
+    """
+    if caching_enabled():
+        bump_version(sender)
+
+
+def make_key(prefix, resource, models, *params):
+    """Builds a cache key from a resource, the versions of the models the
+    data depends on and a number of parameter dictionaries. The dictionaries
+    are normalised so the order of the parameters in the query string doesn't
+    matter.
+
+    :param prefix: The kind of data that is cached.
+    :param resource: The resource the data belongs to.
+    :param models: The models the data depends on.
+    :param *params: Dictionaries of parameter name to a list of values.
+    :returns: A cache key.
+
+    """
+    normalised = json.dumps([sorted(x.items()) for x in params])
+    return 'snooze:{}:{}.{}:{}:{}'.format(
+        prefix, resource.app, resource.model_name,
+        '-'.join(str(x) for x in get_versions(models)),
+        hashlib.md5(normalised.encode('utf-8')).hexdigest())
+
+
+def record_lookup(resource, hit):
+    """Counts a cache lookup for a resource.
+
+    :param resource: The resource that was looked up.
+    :param hit: Whether the lookup was a hit.
+    :returns: None
+
+    """
+    with _stats_lock:
+        _stats['{}.{}'.format(resource.app, resource.model_name)][
+            'hits' if hit else 'misses'] += 1
+
+
+def get_stats():
+    """Gets the hit and miss counters of the query cache, to tune cache
+    timeouts and sizes with.
+
+    :returns: A dictionary keyed by resource of dictionaries with the number
+              of hits and misses.
+
+    """
+    with _stats_lock:
+        return {key: dict(value) for key, value in _stats.items()}
+
+
+class LRUCache(object):
+    """
+    A small thread safe least recently used cache, for things that are kept
+    in the process instead of the Django cache.
+    """
+
+    def __init__(self, size):
+        """Sets up an empty cache.
+
+        :param size: The maximum number of items, None means no maximum.
+        :returns: None
+
+        """
+        self.size = size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Gets an item and marks it as the most recently used.
+
+        :param key: The key of the item.
+        :returns: The item, None if it isn't cached.
+
+        """
+        with self._lock:
+            value = self._items.pop(key, None)
+            if value is not None:
+                self._items[key] = value
+            return value
+
+    def set(self, key, value):
+        """Adds an item, dropping the least recently used item when the
+        cache is full.
+
+        :param key: The key of the item.
+        :param value: The item.
+        :returns: None
+
+        """
+        with self._lock:
+            self._items.pop(key, None)
+            self._items[key] = value
+            if self.size is not None and len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+    def __len__(self):
+        return len(self._items)
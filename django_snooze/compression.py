@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+Compression of response bodies and decompression of request bodies. gzip and
+deflate come from zlib, br is available if the brotli package is installed.
+
+Streamed bodies are compressed chunk by chunk, every chunk is flushed so
+clients can start decoding before the response is complete.
+"""
+
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def _zlib_wbits(encoding):
+    """Gets the zlib window bits of an encoding, gzip needs a gzip header
+    and deflate means the zlib format in HTTP.
+
+    :param encoding: gzip or deflate.
+    :returns: The wbits argument of zlib.
+
+    """
+    if encoding == 'gzip':
+        return 16 + zlib.MAX_WBITS
+    return zlib.MAX_WBITS
+
+
+def get_encodings():
+    """Gets the content encodings that are available, in order of
+    preference.
+
+    :returns: A list of encodings.
+
+    """
+    encodings = ['gzip', 'deflate']
+    if brotli is not None:
+        encodings.insert(0, 'br')
+    return encodings
+
+
+def negotiate(header):
+    """Picks the best available content encoding for an Accept-Encoding
+    header, ties go to the order of get_encodings.
+
+    :param header: The value of the Accept-Encoding header.
+    :returns: An encoding, None if the body should not be compressed.
+
+    """
+    qualities = {}
+    for part in header.split(','):
+        params = part.split(';')
+        coding = params[0].strip().lower()
+        quality = 1.0
+        for param in params[1:]:
+            key, _, value = param.partition('=')
+            if key.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            qualities[coding] = quality
+
+    best = None
+    best_quality = 0.0
+    for encoding in get_encodings():
+        quality = qualities.get(encoding, qualities.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(data, encoding, level):
+    """Compresses a body.
+
+    :param data: The body as bytes.
+    :param encoding: The content encoding.
+    :param level: The compression level, from 1 to 9.
+    :returns: The compressed body.
+
+    """
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    compressor = zlib.compressobj(level, zlib.DEFLATED, _zlib_wbits(encoding))
+    return compressor.compress(data) + compressor.flush()
+
+
+def compress_stream(chunks, encoding, level):
+    """Compresses a streamed body incrementally.
+
+    :param chunks: An iterable of chunks of the body as bytes.
+    :param encoding: The content encoding.
+    :param level: The compression level, from 1 to 9.
+    :returns: A generator of compressed chunks.
+
+    """
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=level)
+        for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+        return
+
+    compressor = zlib.compressobj(level, zlib.DEFLATED, _zlib_wbits(encoding))
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def decompress(data, encoding, max_size):
+    """Decompresses a request body.
+
+    :param data: The compressed body.
+    :param encoding: The content encoding of the body.
+    :param max_size: The maximum size of the decompressed body, None means
+                     no maximum.
+    :returns: The decompressed body.
+    :raises ValueError: When the encoding isn't supported, the body is
+                        corrupt or it decompresses to more than max_size.
+
+    """
+    if encoding == 'br' and brotli is not None:
+        try:
+            result = brotli.decompress(data)
+        except brotli.error as e:
+            raise ValueError(str(e))
+    elif encoding in ('gzip', 'deflate'):
+        decompressor = zlib.decompressobj(_zlib_wbits(encoding))
+        try:
+            result = decompressor.decompress(data, max_size or 0)
+        except zlib.error as e:
+            raise ValueError(str(e))
+        if decompressor.unconsumed_tail:
+            raise ValueError('The body is too large.')
+    else:
+        raise ValueError('Content encoding {} is not supported.'.format(
+            encoding))
+
+    if max_size is not None and len(result) > max_size:
+        raise ValueError('The body is too large.')
+    return result
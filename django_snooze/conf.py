@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Default settings for django_snooze, every one of them can be overridden in the
+Django settings by prefixing its name with SNOOZE_.
+"""
+
+from django.conf import settings
+
+DEFAULTS = {
+    # The number of objects returned by a query if no __limit is given, None
+    # means all objects are returned.
+    'DEFAULT_LIMIT': None,
+    # The maximum value of __limit, None means no maximum.
+    'MAX_LIMIT': None,
+    # The maximum number of objects a query returns, whatever its limit. It
+    # can be set per resource in RESOURCE_LIMITS, None means no maximum.
+    'MAX_ROWS': None,
+    # The number of seconds after which the queries of a query request are
+    # cancelled, on PostgreSQL, MySQL and SQLite. It can be set per resource
+    # in RESOURCE_LIMITS, None means no timeout.
+    'STATEMENT_TIMEOUT': None,
+    # Whether order_by and the expensive lookup types, like regex and
+    # icontains, are only allowed on indexed fields. It can be set per
+    # resource in RESOURCE_LIMITS.
+    'INDEXED_LOOKUPS_ONLY': False,
+    # MAX_ROWS, STATEMENT_TIMEOUT and INDEXED_LOOKUPS_ONLY per resource, as
+    # dictionaries keyed by app_label.model_name.
+    'RESOURCE_LIMITS': {},
+    # The maximum number of objects fetched by primary key in one request,
+    # None means no maximum.
+    'MAX_PKS': 500,
+    # The number of query shapes per resource whose validated parameters are
+    # kept, None keeps all of them.
+    'QUERY_PLAN_CACHE_SIZE': 128,
+    # The number of serialisers per resource that are compiled for field
+    # selections, values_list columns and expansions and kept, None keeps
+    # all of them.
+    'SERIALISER_CACHE_SIZE': 128,
+    # The number of rows serialised at a time in streamed responses.
+    'STREAM_CHUNK_SIZE': 100,
+    # The apps and models to discover, as app_label or app_label.model_name.
+    # None discovers all of them.
+    'INCLUDE': None,
+    # The apps and models to leave out, as app_label or app_label.model_name.
+    'EXCLUDE': [],
+    # Whether to build the form, field adaptors, serialisers and views of a
+    # resource on its first request instead of when it's discovered.
+    'LAZY_RESOURCES': False,
+    # Whether to route all resource URLs through a single URL pattern, which
+    # resolves in constant time instead of trying the patterns of every model.
+    'URL_ROUTER': False,
+    # The number of objects inserted per query when creating objects in bulk,
+    # None inserts them all in one query, which can hit the limits of SQLite.
+    'BULK_BATCH_SIZE': 500,
+    # Whether bulk updates and deletes need at least one filter or exclusion,
+    # so a request can't change every object of a model.
+    'BULK_REQUIRE_FILTER': True,
+    # The maximum number of objects a bulk update or delete may change, None
+    # means no maximum.
+    'BULK_MAX_ROWS': 1000,
+    # The maximum number of requests in a batch, None means no maximum.
+    'BATCH_MAX_REQUESTS': 50,
+    # The number of threads the reads before the first write of a batch run
+    # in, None runs all requests of a batch one after the other. Batches in
+    # a transaction, like with ATOMIC_REQUESTS, always run in order.
+    'BATCH_THREADS': None,
+    # Whether to compress responses for clients that send Accept-Encoding.
+    'COMPRESSION': True,
+    # Responses smaller than this many bytes aren't compressed, streamed
+    # responses always are.
+    'COMPRESSION_MIN_SIZE': 500,
+    # The compression level, from 1 for the fastest to 9 for the smallest.
+    'COMPRESSION_LEVEL': 6,
+    # The maximum size in bytes of a compressed request body once it's
+    # decompressed, None means no maximum.
+    'MAX_BODY_SIZE': 10 * 1024 * 1024,
+    # Whether to time the phases and database queries of requests, see
+    # django_snooze.instrumentation.
+    'INSTRUMENTATION': False,
+    # Whether to count requests per resource and serve the counts at the
+    # metrics/ URL of the API, the metrics argument of an API overrides it.
+    # See django_snooze.metrics.
+    'METRICS': False,
+    # Requests that take at least this many seconds are logged to the
+    # django_snooze logger with their parameters, SQL and query plan, None
+    # disables the log.
+    'SLOW_REQUEST_THRESHOLD': None,
+    # Whether to send ETags and answer conditional requests.
+    'ETAGS': True,
+    # Fields that change whenever an object changes, like a version number
+    # or updated_at, keyed by app_label.model_name. Conditional requests for
+    # these models are answered without building the content.
+    'VERSION_FIELDS': {},
+    # The Django cache django_snooze caches in.
+    'CACHE_ALIAS': 'default',
+    # The number of seconds query results are cached, None disables the
+    # cache.
+    'QUERY_CACHE_TIMEOUT': None,
+    # The number of seconds counts are cached, None disables the cache.
+    'COUNT_CACHE_TIMEOUT': None,
+    # Counts are estimated from the database statistics when the estimate is
+    # at least this many rows, None always counts exactly.
+    'COUNT_ESTIMATE_THRESHOLD': None,
+}
+
+
+def get_setting(name):
+    """Gets a django_snooze setting, falling back to the default if it isn't
+    set in the Django settings.
+
+    :param name: The name of the setting, without the SNOOZE_ prefix.
+    :returns: The value of the setting.
+
+    """
+    return getattr(settings, 'SNOOZE_{}'.format(name), DEFAULTS[name])
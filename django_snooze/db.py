@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+Database backend specific helpers, every helper falls back to doing nothing
+on backends it doesn't know about.
+"""
+
+import json
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.db import DatabaseError, connections, transaction
+
+try:
+    from django.core.exceptions import EmptyResultSet
+except ImportError:
+    # Moved in Django 1.11.
+    from django.db.models.sql.datastructures import EmptyResultSet
+
+# The statement that explains a query, per database vendor.
+EXPLAIN_STATEMENTS = {
+    'postgresql': 'EXPLAIN ',
+    'mysql': 'EXPLAIN ',
+    'sqlite': 'EXPLAIN QUERY PLAN ',
+}
+
+# The number of SQLite virtual machine instructions between the checks of
+# the statement timeout.
+SQLITE_PROGRESS_STEPS = 1000
+
+
+class StatementTimeout(DatabaseError):
+    """
+    Raised when a query is cancelled because it ran past its statement
+    timeout.
+    """
+
+
+def estimate_count(queryset):
+    """Estimates the number of rows of a queryset from the statistics of the
+    database backend, this is a lot cheaper than counting on big tables.
+
+    PostgreSQL estimates any query with the planner, MySQL only knows the
+    size of whole tables.
+
+    :param queryset: The queryset to estimate.
+    :returns: The estimated number of rows, None if the backend has no
+              estimate for this queryset.
+
+    """
+    connection = connections[queryset.db]
+    query = queryset.query
+
+    if connection.vendor == 'postgresql':
+        sql, params = query.sql_with_params()
+        cursor = connection.cursor()
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0]
+        if not isinstance(plan, list):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+    if connection.vendor == 'mysql' and not query.has_filters():
+        cursor = connection.cursor()
+        cursor.execute(
+            'SELECT TABLE_ROWS FROM information_schema.TABLES '
+            'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s',
+            [queryset.model._meta.db_table])
+        row = cursor.fetchone()
+        return int(row[0]) if row and row[0] is not None else None
+
+    return None
+
+
+def get_sql(queryset):
+    """Gets the SQL a queryset runs.
+
+    :param queryset: The queryset.
+    :returns: A tuple of the SQL and its parameters, the SQL is None if the
+              queryset can't match any rows and runs no query.
+
+    """
+    try:
+        return queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return (None, ())
+
+
+def explain(queryset):
+    """Gets the plan the database would run the query of a queryset with.
+
+    :param queryset: The queryset to explain.
+    :returns: A list with a dictionary per row of the EXPLAIN output, keyed
+              by its columns. None if the backend can't explain queries.
+
+    """
+    connection = connections[queryset.db]
+    statement = EXPLAIN_STATEMENTS.get(connection.vendor)
+    if statement is None:
+        return None
+
+    sql, params = get_sql(queryset)
+    if sql is None:
+        return []
+    cursor = connection.cursor()
+    cursor.execute(statement + sql, params)
+    columns = [x[0] for x in cursor.description]
+    return [OrderedDict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+@contextmanager
+def statement_timeout(using, seconds):
+    """Cancels the queries run in the block once they take longer than the
+    timeout. PostgreSQL runs the block in a transaction with a local
+    statement_timeout, MySQL sets max_execution_time for the session and
+    SQLite checks the time from a progress handler. Other backends don't
+    time out.
+
+    :param using: The alias of the database.
+    :param seconds: The timeout in seconds, None means no timeout.
+    :returns: A context manager.
+    :raises StatementTimeout: When a query is cancelled.
+
+    """
+    connection = connections[using]
+    vendors = ('postgresql', 'mysql', 'sqlite')
+    if seconds is None or connection.vendor not in vendors:
+        yield
+        return
+
+    milliseconds = max(1, int(seconds * 1000))
+    deadline = time.time() + seconds
+    try:
+        if connection.vendor == 'postgresql':
+            with transaction.atomic(using=using):
+                connection.cursor().execute(
+                    'SET LOCAL statement_timeout = %s', [milliseconds])
+                yield
+        elif connection.vendor == 'mysql':
+            cursor = connection.cursor()
+            cursor.execute('SELECT @@SESSION.max_execution_time')
+            previous = cursor.fetchone()[0]
+            cursor.execute('SET SESSION max_execution_time = %s',
+                           [milliseconds])
+            try:
+                yield
+            finally:
+                connection.cursor().execute(
+                    'SET SESSION max_execution_time = %s', [previous])
+        else:
+            connection.ensure_connection()
+            connection.connection.set_progress_handler(
+                lambda: int(time.time() >= deadline), SQLITE_PROGRESS_STEPS)
+            try:
+                yield
+            finally:
+                connection.connection.set_progress_handler(
+                    None, SQLITE_PROGRESS_STEPS)
+    except DatabaseError as e:
+        if isinstance(e, StatementTimeout) or time.time() < deadline:
+            raise
+        raise StatementTimeout(str(e))
@@ -7,9 +7,25 @@ just be duplicating Django's excellent documentation.
 from collections import OrderedDict
 
 from django.db.models.fields import NOT_PROVIDED
+from django.utils.encoding import force_text
 
 from django_snooze.exceptions import RESTError
 
+# The lookup types queries can use.
+LOOKUP_TYPES = frozenset([
+    'iexact', 'contains', 'icontains', 'startswith', 'istartswith',
+    'endswith', 'iendswith', 'month', 'day', 'week_day', 'hour', 'minute',
+    'second', 'isnull', 'search', 'regex', 'iregex', 'exact', 'gt', 'gte',
+    'lt', 'lte', 'range', 'in', 'year',
+])
+# The lookup types that take a list of values.
+LIST_LOOKUP_TYPES = frozenset(['range', 'in'])
+# The lookup types that are only allowed on indexed fields when
+# INDEXED_LOOKUPS_ONLY is set.
+EXPENSIVE_LOOKUP_TYPES = frozenset([
+    'contains', 'icontains', 'search', 'regex', 'iregex',
+])
+
 
 class Field(object):
     """
@@ -27,6 +43,7 @@ class Field(object):
         """
         self.field = field
         self.name = field.name
+        self.attname = field.attname
         self.null = field.null
         self.blank = field.blank
         self.validators = field.validators
@@ -50,7 +67,7 @@ class Field(object):
         schema['null'] = self.null
         schema['blank'] = self.blank
         schema['editable'] = self.editable
-        schema['help_text'] = self.help_text
+        schema['help_text'] = force_text(self.help_text)
         schema['primary_key'] = self.primary_key
         schema['unique'] = self.unique
         if self.default != NOT_PROVIDED:
@@ -71,6 +88,25 @@ class Field(object):
         """
         return str(field_value) if field_value else None
 
+    def get_json_converter(self):
+        """Gets the function that converts values of this field to their
+        serialisable value, to be bound by the compiled row serialisers.
+
+        :returns: A function, or None if the values need no conversion.
+
+        """
+        return self.to_json
+
+    def get_column_converter(self):
+        """Gets the function that converts raw column values of this field,
+        as fetched by values_list or read from the attname of a model object,
+        to their serialisable value.
+
+        :returns: A function, or None if the values need no conversion.
+
+        """
+        return self.get_json_converter()
+
     def process_param(self, param, value):
         """Validates a query and value parameter. Will check if it's a valid
         lookup type and will raise a RESTError with a proper message if it's
@@ -80,6 +116,17 @@ class Field(object):
         :param value: A querydict value list.
         :returns: Tuple of the processed parameter and a processed value.
 
+        """
+        lookup_type = self.check_param(param)
+        return (param, self.process_value(lookup_type, value))
+
+    def check_param(self, param):
+        """Validates a query parameter, this only depends on its name so the
+        result can be kept in a query plan.
+
+        :param param: A query parameter.
+        :returns: The lookup type of the parameter.
+
         """
         param_list = param.split('__')
 
@@ -94,29 +141,30 @@ class Field(object):
 
         field, lookup_type = param_list
 
-        if lookup_type not in {
-            'iexact', 'contains', 'icontains', 'startswith', 'istartswith',
-            'endswith', 'iendswith', 'month', 'day', 'week_day', 'hour',
-            'minute', 'second', 'isnull', 'search', 'regex', 'iregex', 'exact',
-            'gt', 'gte', 'lt', 'lte', 'range', 'range', 'in', 'year'
-        }:
+        if lookup_type not in LOOKUP_TYPES:
             raise RESTError(400, {
                 'Error': '{} is not a valid lookup type for field {}'.format(
                     param_list[1], param_list[0]
                 )})
+        return lookup_type
+
+    def process_value(self, lookup_type, value):
+        """Validates the value of a query parameter.
+
+        :param lookup_type: The lookup type from check_param.
+        :param value: A querydict value list.
+        :returns: The processed value.
 
+        """
         # Validate the value for non list type parameters.
-        if lookup_type not in {'range', 'in'}:
+        if lookup_type not in LIST_LOOKUP_TYPES:
             if len(value) > 1:
                 raise RESTError(400, {
                     'Error': '{} only takes a single value.'.format(
                         lookup_type)
                 })
-            value = value[0]
-        else:
-            value = list(value)
-
-        return (param, value)
+            return value[0]
+        return list(value)
 
 
 # Integer fields
@@ -160,7 +208,15 @@ class AutoField(IntegerField):
     """
     An automatically incrementing integer field.
     """
-    pass
+
+    def get_json_converter(self):
+        """Values of an AutoField are always non-zero integers, so they can be
+        used as is.
+
+        :returns: None
+
+        """
+        return None
 
 
 # Other number fields
@@ -438,6 +494,25 @@ class ForeignKey(Field):
         """
         return int(field_value.pk) if field_value else None
 
+    def column_to_json(self, field_value):
+        """Convert the raw column value, the primary key of the related
+        object, to something we can use.
+
+        :param field_value: The primary key of the related object.
+        :returns: A integer of the pk of the object.
+
+        """
+        return int(field_value) if field_value else None
+
+    def get_column_converter(self):
+        """Related objects are fetched as their primary key when using
+        values_list.
+
+        :returns: The column_to_json method.
+
+        """
+        return self.column_to_json
+
 
 class ManyToManyField(ForeignKey):
     """
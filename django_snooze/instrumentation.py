@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+Timing of the phases of API requests, enabled by the INSTRUMENTATION
+setting.
+
+Every request gets a Timings object that the views time their phases with.
+When the request is done the timings are sent in the Server-Timing header
+and with the request_timed signal. When instrumentation is disabled requests
+get the shared NULL_TIMINGS, which does nothing.
+"""
+
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import connections
+from django.dispatch import Signal
+
+from django_snooze.conf import get_setting
+
+# Sent when an instrumented request is done, with the view instance, the
+# request, the response and the Timings of the request. Streamed responses
+# are sent before their body is generated.
+request_timed = Signal(providing_args=['view', 'request', 'response',
+                                       'timings'])
+
+
+def _debug_cursor_attr(connection):
+    """Gets the name of the flag that makes a connection log its queries
+    without DEBUG, it was renamed in Django 1.8.
+
+    :param connection: A database connection.
+    :returns: The name of the attribute.
+
+    """
+    if hasattr(connection, 'force_debug_cursor'):
+        return 'force_debug_cursor'
+    return 'use_debug_cursor'
+
+
+class Phase(object):
+    """
+    Context manager that adds the time spent in it to a phase.
+    """
+
+    def __init__(self, timings, name):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.time()
+
+    def __exit__(self, *exc_info):
+        self.timings.add(self.name, time.time() - self.start)
+
+
+class Timings(object):
+    """
+    The time spent in the phases of a request and in database queries.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        """Starts timing a request, the database connections log their
+        queries until finish is called. The queries that are only logged for
+        the timings are dropped again by finish.
+
+        :returns: None
+
+        """
+        self.phases = OrderedDict()
+        self.queries = 0
+        self.query_time = 0.0
+        self.total = None
+        self.start = time.time()
+        self._connections = []
+        for connection in connections.all():
+            attr = _debug_cursor_attr(connection)
+            value = getattr(connection, attr)
+            self._connections.append((connection, attr, value,
+                                      len(connection.queries),
+                                      value or settings.DEBUG))
+            setattr(connection, attr, True)
+
+    def phase(self, name):
+        """Times a phase, phases that are entered more than once add up.
+
+        :param name: The name of the phase.
+        :returns: A context manager.
+
+        """
+        return Phase(self, name)
+
+    def add(self, name, duration):
+        """Adds time to a phase.
+
+        :param name: The name of the phase.
+        :param duration: The time in seconds.
+        :returns: None
+
+        """
+        self.phases[name] = self.phases.get(name, 0.0) + duration
+
+    def finish(self):
+        """Stops timing the request and collects the queries it ran, only
+        the first call counts.
+
+        :returns: None
+
+        """
+        if self.total is not None:
+            return
+        self.total = time.time() - self.start
+        for connection, attr, value, start, logged in self._connections:
+            queries = connection.queries[start:]
+            self.queries += len(queries)
+            self.query_time += sum(float(x['time']) for x in queries)
+            setattr(connection, attr, value)
+            if not logged:
+                # Nothing resets the queries of connections outside the
+                # request cycle, like the ones of batch threads.
+                del connection.queries[start:]
+        self._connections = []
+
+    def server_timing(self):
+        """Formats the timings for the Server-Timing header, in
+        milliseconds.
+
+        :returns: The value of the header.
+
+        """
+        metrics = ['{};dur={:.2f}'.format(name, duration * 1000)
+                   for name, duration in self.phases.items()]
+        metrics.append('db;dur={:.2f};desc="{} queries"'.format(
+            self.query_time * 1000, self.queries))
+        metrics.append('total;dur={:.2f}'.format(self.total * 1000))
+        return ', '.join(metrics)
+
+
+class NullPhase(object):
+    """
+    Context manager that does nothing.
+    """
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+class NullTimings(object):
+    """
+    Timings for when instrumentation is disabled, it does nothing.
+    """
+
+    enabled = False
+    _phase = NullPhase()
+
+    def phase(self, name):
+        return self._phase
+
+    def add(self, name, duration):
+        pass
+
+    def finish(self):
+        pass
+
+
+NULL_TIMINGS = NullTimings()
+
+
+def start_timings():
+    """Starts timing a request.
+
+    :returns: Timings, NULL_TIMINGS if instrumentation is disabled.
+
+    """
+    if get_setting('INSTRUMENTATION'):
+        return Timings()
+    return NULL_TIMINGS
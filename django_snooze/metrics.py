@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+In-process request metrics, enabled by the METRICS setting and rendered in
+the Prometheus text exposition format by the metrics/ URL of the API.
+
+Every thread records into its own shard, so recording doesn't take a lock.
+Shards are only summed when the metrics are rendered. The shards of threads
+that are gone are folded into a retired total then, so the counters never go
+down and servers that start a thread per request don't pile up shards.
+"""
+
+import threading
+import weakref
+from bisect import bisect_left
+from collections import defaultdict
+
+# The upper bounds of the latency histogram buckets, in seconds.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# The counters, with their help text and label names.
+COUNTERS = (
+    ('snooze_requests_total', 'Requests handled.',
+     ('app', 'model', 'view', 'status')),
+    ('snooze_errors_total', 'Requests answered with a RESTError.',
+     ('app', 'model', 'view', 'status')),
+    ('snooze_rows_serialised_total', 'Rows converted for responses.',
+     ('app', 'model', 'view')),
+    ('snooze_response_bytes_total', 'Bytes of response bodies.',
+     ('app', 'model', 'view')),
+)
+HISTOGRAM = 'snooze_request_duration_seconds'
+
+_local = threading.local()
+# Tuples of a weak reference to a thread and the shard of the thread.
+_shards = []
+_shards_lock = threading.Lock()
+
+
+class Shard(object):
+    """
+    The metrics recorded by a single thread.
+    """
+
+    def __init__(self):
+        # Keyed by metric name and label values.
+        self.counters = defaultdict(float)
+        # Keyed by label values, a count per bucket, with the +Inf bucket
+        # last, followed by the sum and the count.
+        self.histograms = {}
+
+    def merge(self, other):
+        """Adds the metrics of another shard to this one.
+
+        :param other: A Shard.
+        :returns: None
+
+        """
+        for key, value in list(other.counters.items()):
+            self.counters[key] += value
+        for labels, values in list(other.histograms.items()):
+            total = self.histograms.setdefault(labels, [0] * len(values))
+            for idx, value in enumerate(values):
+                total[idx] += value
+
+    def clear(self):
+        """Drops all metrics of the shard.
+
+        :returns: None
+
+        """
+        self.counters.clear()
+        self.histograms.clear()
+
+
+# The metrics of threads that are gone.
+_retired = Shard()
+
+
+def _get_shard():
+    """Gets the shard of the current thread, it's created on first use.
+
+    :returns: A Shard.
+
+    """
+    shard = getattr(_local, 'shard', None)
+    if shard is None:
+        shard = _local.shard = Shard()
+        with _shards_lock:
+            _shards.append((weakref.ref(threading.current_thread()), shard))
+    return shard
+
+
+def record_request(labels, status, duration, rows=0, size=0, error=False):
+    """Records a handled request.
+
+    :param labels: A tuple of the app, model and view.
+    :param status: The status code of the response.
+    :param duration: The time spent in the view, in seconds.
+    :param rows: The number of rows converted.
+    :param size: The size of the response body, in bytes.
+    :param error: Whether the request was answered with a RESTError.
+    :returns: None
+
+    """
+    shard = _get_shard()
+    counters = shard.counters
+    counters[('snooze_requests_total', labels + (str(status),))] += 1
+    if error:
+        counters[('snooze_errors_total', labels + (str(status),))] += 1
+    if rows:
+        counters[('snooze_rows_serialised_total', labels)] += rows
+    if size:
+        counters[('snooze_response_bytes_total', labels)] += size
+
+    histogram = shard.histograms.get(labels)
+    if histogram is None:
+        histogram = shard.histograms[labels] = [0] * (len(BUCKETS) + 3)
+    histogram[bisect_left(BUCKETS, duration)] += 1
+    histogram[-2] += duration
+    histogram[-1] += 1
+
+
+def record_stream(labels, size, rows=0):
+    """Records the body of a streamed response, which is generated after
+    its request was recorded.
+
+    :param labels: A tuple of the app, model and view.
+    :param size: The size of the body, in bytes.
+    :param rows: The number of rows converted for the body.
+    :returns: None
+
+    """
+    counters = _get_shard().counters
+    if rows:
+        counters[('snooze_rows_serialised_total', labels)] += rows
+    if size:
+        counters[('snooze_response_bytes_total', labels)] += size
+
+
+def collect():
+    """Sums the shards of all threads.
+
+    :returns: A tuple of a dictionary of counters and a dictionary of
+              histograms, keyed like the ones of a Shard.
+
+    """
+    total = Shard()
+    with _shards_lock:
+        # Threads that are gone don't record anymore, their shards can be
+        # folded into the retired total without racing them.
+        live = []
+        for ref, shard in _shards:
+            thread = ref()
+            if thread is None or not thread.is_alive():
+                _retired.merge(shard)
+            else:
+                live.append((ref, shard))
+        _shards[:] = live
+        total.merge(_retired)
+        shards = [shard for ref, shard in live]
+    for shard in shards:
+        total.merge(shard)
+    return (total.counters, total.histograms)
+
+
+def _format_labels(names, values):
+    """Formats the labels of a sample.
+
+    :param names: The label names.
+    :param values: The label values.
+    :returns: The labels between braces.
+
+    """
+    return '{{{}}}'.format(','.join(
+        '{}="{}"'.format(name, value.replace('\\', '\\\\').replace('"', '\\"'))
+        for name, value in zip(names, values)))
+
+
+def _format_value(value):
+    """Formats a sample value, whole numbers without a fraction.
+
+    :param value: A number.
+    :returns: A string.
+
+    """
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+def render():
+    """Renders all metrics in the Prometheus text exposition format.
+
+    :returns: The text.
+
+    """
+    counters, histograms = collect()
+    lines = []
+    for name, help_text, label_names in COUNTERS:
+        lines.append('# HELP {} {}'.format(name, help_text))
+        lines.append('# TYPE {} counter'.format(name))
+        for key in sorted(x for x in counters if x[0] == name):
+            lines.append('{}{} {}'.format(
+                name, _format_labels(label_names, key[1]),
+                _format_value(counters[key])))
+
+    lines.append('# HELP {} Time spent handling requests.'.format(HISTOGRAM))
+    lines.append('# TYPE {} histogram'.format(HISTOGRAM))
+    label_names = ('app', 'model', 'view', 'le')
+    for labels in sorted(histograms):
+        values = histograms[labels]
+        cumulative = 0
+        for idx, bound in enumerate(BUCKETS + ('+Inf',)):
+            cumulative += values[idx]
+            lines.append('{}_bucket{} {}'.format(
+                HISTOGRAM, _format_labels(label_names,
+                                          labels + (str(bound),)),
+                cumulative))
+        lines.append('{}_sum{} {}'.format(
+            HISTOGRAM, _format_labels(label_names, labels),
+            _format_value(values[-2])))
+        lines.append('{}_count{} {}'.format(
+            HISTOGRAM, _format_labels(label_names, labels), values[-1]))
+    return '\n'.join(lines) + '\n'
+
+
+def reset():
+    """Drops all recorded metrics.
+
+    :returns: None
+
+    """
+    with _shards_lock:
+        _retired.clear()
+        for ref, shard in _shards:
+            shard.clear()
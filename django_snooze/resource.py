@@ -1,14 +1,32 @@
 # -*- coding: utf-8 -*-
 
-from collections import OrderedDict
+import re
+from collections import OrderedDict, namedtuple
+
+from django.core.exceptions import ImproperlyConfigured
 from django.forms.models import modelform_factory
+from django.utils.functional import cached_property
+from django.views.decorators.csrf import csrf_exempt
 from django.db.models.fields import NOT_PROVIDED
 
 from django_snooze import fields
+from django_snooze.cache import LRUCache
+from django_snooze.conf import get_setting
+from django_snooze.exceptions import RESTError
+from django_snooze.rows import (compile_object_serialiser,
+                                compile_row_serialiser,
+                                compile_tuple_serialiser)
 from django_snooze.views import (QueryView,
                                  SchemaView,
                                  ObjectView,
-                                 NewObjectView)
+                                 MultiObjectView,
+                                 NewObjectView,
+                                 build_document)
+
+
+# The validated filter and exclusion parameters of a query shape, as lists of
+# tuples of the parameter, its field adaptor and its lookup type.
+QueryPlan = namedtuple('QueryPlan', ['filters', 'excludes'])
 
 
 class ModelResource(object):
@@ -17,12 +35,22 @@ class ModelResource(object):
     object.
     """
 
-    def __init__(self, model, api):
+    # The attributes that are built on first use in lazy mode, in the order
+    # they're built when the resource isn't lazy.
+    lazy_attributes = ('form', 'fields', 'fields_dict', 'field_defaults',
+                       'version_field', 'indexed_fields', 'columns',
+                       'serialiser', 'row_serialiser', 'query_view',
+                       'schema_view', 'pk_view', 'many_view', 'new_view',
+                       'routes')
+
+    def __init__(self, model, api, lazy=False):
         """This inspects all the model's meta information and process it to
         extract all the information we need.
 
         :param model: The model to inspect.
         :param api: The API object that spawned this resource.
+        :param lazy: Whether to build the form, the field adaptors, the
+                     serialisers and the views on first use instead of now.
         :returns: None
 
         """
@@ -30,30 +58,124 @@ class ModelResource(object):
         self.app = model._meta.app_label
         self.model_name = model._meta.model_name
         self.api = api
+        self.lazy = lazy
 
         self.queryset = self.get_queryset()
-        self.form = self.get_form()
 
-        self.fields = self.get_fields()
-        self.fields_dict = self.get_fields_dict()
-        self.field_defaults = self.get_field_defaults()
+        self._schema_document = None
+        # The compiled serialisers of the field lists of requests.
+        self._tuple_serialisers = LRUCache(
+            get_setting('SERIALISER_CACHE_SIZE'))
+        self._partial_serialisers = LRUCache(
+            get_setting('SERIALISER_CACHE_SIZE'))
+        self._expanded_serialisers = LRUCache(
+            get_setting('SERIALISER_CACHE_SIZE'))
+        self._query_plans = LRUCache(get_setting('QUERY_PLAN_CACHE_SIZE'))
 
-        self.query_view = self.get_query_view()
         self.query_url_re = self.get_query_url_re()
         self.query_reverse_name = self.get_query_reverse_name()
 
-        self.schema_view = self.get_schema_view()
         self.schema_url_re = self.get_schema_url_re()
         self.schema_reverse_name = self.get_schema_reverse_name()
 
-        self.pk_view = self.get_pk_view()
         self.pk_url_re = self.get_pk_url_re()
         self.pk_reverse_name = self.get_pk_reverse_name()
 
-        self.new_view = self.get_new_view()
+        self.many_url_re = self.get_many_url_re()
+        self.many_reverse_name = self.get_many_reverse_name()
+
         self.new_url_re = self.get_new_url_re()
         self.new_reverse_name = self.get_new_reverse_name()
 
+        if not lazy:
+            self.prepare()
+
+    def prepare(self):
+        """Builds everything that's built on first use in lazy mode.
+
+        :returns: None
+
+        """
+        for name in self.lazy_attributes:
+            getattr(self, name)
+
+    # The lazy attributes, each one is built by its get_ method when it's
+    # first used.
+
+    @cached_property
+    def form(self):
+        return self.get_form()
+
+    @cached_property
+    def fields(self):
+        return self.get_fields()
+
+    @cached_property
+    def fields_dict(self):
+        return self.get_fields_dict()
+
+    @cached_property
+    def field_defaults(self):
+        return self.get_field_defaults()
+
+    @cached_property
+    def version_field(self):
+        return self.get_version_field()
+
+    @cached_property
+    def indexed_fields(self):
+        return self.get_indexed_fields()
+
+    @cached_property
+    def columns(self):
+        return self.get_columns()
+
+    @cached_property
+    def serialiser(self):
+        return self.get_serialiser()
+
+    @cached_property
+    def row_serialiser(self):
+        return self.get_row_serialiser()
+
+    @cached_property
+    def query_view(self):
+        return self.get_query_view()
+
+    @cached_property
+    def schema_view(self):
+        return self.get_schema_view()
+
+    @cached_property
+    def pk_view(self):
+        return self.get_pk_view()
+
+    @cached_property
+    def many_view(self):
+        return self.get_many_view()
+
+    @cached_property
+    def new_view(self):
+        return self.get_new_view()
+
+    @cached_property
+    def routes(self):
+        return self.get_routes()
+
+    def get_lazy_view(self, name):
+        """Gets a view that only builds the resource view it hands the
+        request to when it's called, so URL patterns can be set up without
+        building the resource.
+
+        :param name: The attribute name of the view, like query_view.
+        :returns: A view function.
+
+        """
+        @csrf_exempt
+        def view(request, *args, **kwargs):
+            return getattr(self, name)(request, *args, **kwargs)
+        return view
+
     def get_url_re_base(self):
         """
         Method to get the URL base regular expression.
@@ -106,6 +228,260 @@ class ModelResource(object):
                 for x in self.fields
                 if x.default != NOT_PROVIDED}
 
+    def get_columns(self):
+        """Gets the names of the columns to fetch with values_list to get all
+        the data of a model object, related objects come back as their primary
+        key.
+
+        :returns: A list of field names.
+
+        """
+        return [x.name for x in self.fields]
+
+    def get_version_field(self):
+        """Gets the field that changes whenever an object changes, as
+        configured in VERSION_FIELDS.
+
+        :returns: The name of the field, None if there is none.
+
+        """
+        name = get_setting('VERSION_FIELDS').get(
+            '{}.{}'.format(self.app, self.model_name))
+        if name is not None and name not in self.fields_dict:
+            raise ImproperlyConfigured(
+                'Version field {} does not exist on {}.{}.'.format(
+                    name, self.app, self.model_name))
+        return name
+
+    def get_indexed_fields(self):
+        """Finds the fields the database has an index for: primary keys,
+        unique fields, fields with db_index, which includes foreign keys,
+        and the first field of every index_together and unique_together.
+
+        :returns: A frozenset of field names.
+
+        """
+        opts = self.model._meta
+        names = set(x.name for x in opts.fields
+                    if x.primary_key or x.unique or x.db_index)
+        for together in (list(opts.index_together) +
+                         list(opts.unique_together)):
+            if together:
+                names.add(together[0])
+        return frozenset(names)
+
+    def get_limit(self, name):
+        """Gets a query cost limit of the resource from RESOURCE_LIMITS,
+        falling back to the setting of the same name.
+
+        :param name: MAX_ROWS, STATEMENT_TIMEOUT or INDEXED_LOOKUPS_ONLY.
+        :returns: The value of the limit.
+
+        """
+        limits = get_setting('RESOURCE_LIMITS').get(
+            '{}.{}'.format(self.app, self.model_name), {})
+        if name in limits:
+            return limits[name]
+        return get_setting(name)
+
+    def get_serialiser(self):
+        """Compiles the serialiser for whole model objects.
+
+        :returns: A function that converts a model object.
+
+        """
+        return compile_object_serialiser(self.fields)
+
+    def get_row_serialiser(self):
+        """Compiles the serialiser for values_list tuples of all columns, it
+        gives the same result as the object serialiser.
+
+        :returns: A function that converts a tuple.
+
+        """
+        return compile_row_serialiser(self.fields)
+
+    def get_partial_serialiser(self, keys):
+        """Gets the compiled serialiser for model objects that only
+        serialises the given fields, it's compiled on first use.
+
+        :param keys: The names of the fields to serialise.
+        :returns: A function that converts a model object.
+
+        """
+        key = ('object', tuple(keys))
+        serialiser = self._partial_serialisers.get(key)
+        if serialiser is None:
+            serialiser = compile_object_serialiser(
+                [self.fields_dict[x] for x in keys])
+            self._partial_serialisers.set(key, serialiser)
+        return serialiser
+
+    def get_partial_row_serialiser(self, keys):
+        """Gets the compiled serialiser for values_list tuples of the given
+        fields that gives the same result as the partial object serialiser,
+        it's compiled on first use.
+
+        :param keys: The names of the fields in the tuple.
+        :returns: A function that converts a tuple.
+
+        """
+        key = ('row', tuple(keys))
+        serialiser = self._partial_serialisers.get(key)
+        if serialiser is None:
+            serialiser = compile_row_serialiser(
+                [self.fields_dict[x] for x in keys])
+            self._partial_serialisers.set(key, serialiser)
+        return serialiser
+
+    def get_tuple_serialiser(self, keys):
+        """Gets the compiled serialiser for values_list tuples of the given
+        fields, it's compiled on first use.
+
+        :param keys: The names of the fields in the tuple.
+        :returns: A function that converts a tuple.
+
+        """
+        keys = tuple(keys)
+        serialiser = self._tuple_serialisers.get(keys)
+        if serialiser is None:
+            serialiser = compile_tuple_serialiser(
+                [self.fields_dict[x] for x in keys])
+            self._tuple_serialisers.set(keys, serialiser)
+        return serialiser
+
+    def get_related_resource(self, name):
+        """Gets the resource of the model a ForeignKey field points to.
+
+        :param name: The name of the field.
+        :returns: A ModelResource, None if the field isn't a ForeignKey or
+                  the related model isn't exposed.
+
+        """
+        field = self.fields_dict.get(name)
+        if not isinstance(field, fields.ForeignKey):
+            return None
+        return self.api.get_resource(field.related_model)
+
+    def get_expanded_columns(self, expand, keys=None):
+        """Gets the values_list columns of a row with related objects
+        expanded, the columns of the related objects come after the columns
+        of this resource, in order of expansion.
+
+        :param expand: A list of tuples of field name and related resource.
+        :param keys: The names of the fields of this resource to include,
+                     None for all of them.
+        :returns: A list of column names.
+
+        """
+        columns = list(keys or self.columns)
+        for name, resource in expand:
+            columns += ['{}__{}'.format(name, x) for x in resource.columns]
+        return columns
+
+    def get_expanded_row_serialiser(self, expand, keys=None):
+        """Gets a serialiser for rows with the columns from
+        get_expanded_columns, it embeds the related objects in the fields
+        that point to them.
+
+        :param expand: A list of tuples of field name and related resource.
+        :param keys: The names of the fields of this resource to include,
+                     None for all of them.
+        :returns: A function that converts a tuple.
+
+        """
+        key = (tuple(keys or ()), tuple(name for name, resource in expand))
+        serialiser = self._expanded_serialisers.get(key)
+        if serialiser is not None:
+            return serialiser
+
+        if keys:
+            serialise = self.get_partial_row_serialiser(keys)
+        else:
+            serialise = self.row_serialiser
+        related = []
+        start = len(keys or self.columns)
+        for name, resource in expand:
+            end = start + len(resource.columns)
+            related.append((name, resource.row_serialiser, start, end))
+            start = end
+
+        def serialiser(row):
+            obj = serialise(row)
+            for name, serialise_related, start, end in related:
+                if obj[name] is not None:
+                    obj[name] = serialise_related(row[start:end])
+            return obj
+
+        self._expanded_serialisers.set(key, serialiser)
+        return serialiser
+
+    def get_query_plan(self, filter_params, exclude_params):
+        """Gets the query plan of the names of the filter and exclusion
+        parameters of a query. Validating them only depends on the names, so
+        the plans of the most recent query shapes are kept.
+
+        :param filter_params: The filter parameters, only the names are used.
+        :param exclude_params: The exclusion parameters, only the names are
+                               used.
+        :returns: A QueryPlan.
+
+        """
+        key = (tuple(sorted(filter_params)), tuple(sorted(exclude_params)))
+        plan = self._query_plans.get(key)
+        if plan is None:
+            plan = QueryPlan([self.plan_param(x) for x in key[0]],
+                             [self.plan_param(x) for x in key[1]])
+            self._query_plans.set(key, plan)
+        return plan
+
+    def plan_param(self, param):
+        """Validates the name of a query parameter.
+
+        :param param: The query parameter.
+        :returns: A tuple of the parameter, its field adaptor and its lookup
+                  type.
+
+        """
+        field = self.fields_dict.get(param.split('__')[0])
+        if field is None:
+            raise RESTError(400, {
+                'Error': 'Field {} is not queryable'.format(
+                    param.split('__')[0])})
+        return (param, field, field.check_param(param))
+
+    def get_schema(self):
+        """Builds the schema of the resource from the metadata of its fields.
+
+        :returns: An OrderedDict keyed by field name.
+
+        """
+        schema = OrderedDict()
+        for f in self.fields:
+            schema[f.name] = f.schema_info()
+        return schema
+
+    def get_schema_document(self):
+        """Gets the encoded schema document. It's built on first use, help
+        texts can be translated and translations aren't available yet when
+        the models are discovered.
+
+        :returns: A document as returned by build_document.
+
+        """
+        if self._schema_document is None:
+            self._schema_document = build_document(self.get_schema())
+        return self._schema_document
+
+    def rebuild_schema_document(self):
+        """Drops the encoded schema document so it gets rebuilt on its next
+        use, for when the fields of the resource changed.
+
+        :returns: None
+
+        """
+        self._schema_document = None
+
     def get_query_view(self):
         """Constructs the QueryView object for this resource.
 
@@ -161,7 +537,8 @@ class ModelResource(object):
 
         """
         # TODO: Detect different kinds of primary key than plain old integers.
-        return self.get_url_re_base() + r'(?P<pk_url_arg>\d+)/$'
+        # A comma separated list fetches several objects at once.
+        return self.get_url_re_base() + r'(?P<pk_url_arg>\d+(?:,\d+)*)/$'
 
     def get_pk_reverse_name(self):
         """Generates a reverse lookup name for the pk URL.
@@ -171,6 +548,31 @@ class ModelResource(object):
         """
         return 'snooze_{}_{}_pk'.format(self.app, self.model_name)
 
+    def get_many_view(self):
+        """Constructs the MultiObjectView for this resource.
+
+        :returns: The initialised MultiObjectView.
+
+        """
+        return MultiObjectView.as_view(resource=self)
+
+    def get_many_url_re(self):
+        """Constructs the regular expression for the URL that fetches the
+        objects of a list of primary keys.
+
+        :returns: A regular expression string.
+
+        """
+        return self.get_url_re_base() + r'many/$'
+
+    def get_many_reverse_name(self):
+        """Generates a reverse lookup name for the many URL.
+
+        :returns: A reverse lookup string.
+
+        """
+        return 'snooze_{}_{}_many'.format(self.app, self.model_name)
+
     def get_new_view(self):
         """Constructs the NewObjectView.
 
@@ -195,6 +597,34 @@ class ModelResource(object):
         """
         return 'snooze_{}_{}_new'.format(self.app, self.model_name)
 
+    def get_routes(self):
+        """Compiles the URL regular expressions of the resource for the
+        router, in the order the URL patterns are in.
+
+        :returns: A list of tuples of a compiled regular expression and the
+                  view it routes to.
+
+        """
+        return [(re.compile(self.query_url_re), self.query_view),
+                (re.compile(self.schema_url_re), self.schema_view),
+                (re.compile(self.pk_url_re), self.pk_view),
+                (re.compile(self.many_url_re), self.many_view),
+                (re.compile(self.new_url_re), self.new_view)]
+
+    def route(self, path):
+        """Finds the view of a path below the API root.
+
+        :param path: The path, starting with the app label.
+        :returns: A tuple of the view and its keyword arguments, the view is
+                  None if no route matches.
+
+        """
+        for regex, view in self.routes:
+            match = regex.match(path)
+            if match is not None:
+                return (view, match.groupdict())
+        return (None, {})
+
     def obj_to_json(self, obj):
         """Convert an object to a json serialisable object.
 
@@ -202,12 +632,7 @@ class ModelResource(object):
         :returns: A serialisable object.
 
         """
-        obj_dict = {}
-        for obj_field in self.fields:
-            obj_dict[obj_field.name] = obj_field.to_json(
-                getattr(obj, obj_field.name)
-            )
-        return obj_dict
+        return self.serialiser(obj)
 
     def tuple_to_json(self, values, keys):
         """Converts a tuple to json, using the supplied keys as keys.
@@ -217,11 +642,7 @@ class ModelResource(object):
         :returns: A serialisable object.
 
         """
-        obj_dict = OrderedDict()
-        for idx, key in enumerate(keys):
-            obj_dict[key] = self.fields_dict[key].to_json(values[idx])
-
-        return obj_dict
+        return self.get_tuple_serialiser(keys)(values)
 
     def __unicode__(self):
         return u'snooze resource for {}-{}'.format(self.app, self.model_name)
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Compiled row serialisers, these bind the accessors and converters of a set of
+fields once so serialising a row doesn't have to look them up for every cell.
+
+Like collections.namedtuple the serialisers are compiled from source, a row
+is turned into a dictionary by a single function with the converters bound as
+default arguments and the accessors written out as plain attribute or index
+lookups. Fields without a conversion are used as is.
+"""
+
+import sys
+from collections import OrderedDict
+
+# Dictionaries keep their insertion order from Python 3.7 on, so ordered
+# serialisers can build a plain dictionary, which is a lot faster.
+ORDERED_DICTS = sys.version_info >= (3, 7)
+
+
+def _compile(name, fields, accessor, ordered):
+    """Compiles a serialiser function.
+
+    :param name: The name of the function.
+    :param fields: The field adaptors to serialise, in order.
+    :param accessor: A format string that gives the source of the accessor
+                     of a field when formatted with its index and attname.
+    :param ordered: Whether the keys need to stay in order, which takes an
+                    OrderedDict before Python 3.7.
+    :returns: A function that takes a row and returns a dictionary.
+
+    """
+    namespace = {'OrderedDict': OrderedDict}
+    arguments = ['row']
+    items = []
+    for idx, field in enumerate(fields):
+        value = accessor.format(idx=idx, attname=field.attname)
+        converter = field.get_column_converter()
+        if converter is not None:
+            namespace['convert_{}'.format(idx)] = converter
+            arguments.append('convert_{0}=convert_{0}'.format(idx))
+            value = 'convert_{}({})'.format(idx, value)
+        items.append((repr(str(field.name)), value))
+
+    if ordered and not ORDERED_DICTS:
+        # The OrderedDict of Python 2 is written in Python and dominates the
+        # time spent. Setting the items one by one is still about 30% faster
+        # than passing a tuple of pairs to it.
+        body = ''.join('    obj[{}] = {}\n'.format(*x) for x in items)
+        source = 'def {}({}):\n    obj = OrderedDict()\n{}    return obj\n'
+    else:
+        body = '{{{}}}'.format(', '.join('{}: {}'.format(*x) for x in items))
+        source = 'def {}({}):\n    return {}\n'
+    source = source.format(name, ', '.join(arguments), body)
+
+    exec(compile(source, '<{}>'.format(name), 'exec'), namespace)
+    return namespace[name]
+
+
+def compile_object_serialiser(fields):
+    """Compiles a serialiser that converts model objects to a dictionary.
+    Related objects are serialised from the column that holds their primary
+    key, so they're never fetched.
+
+    :param fields: The field adaptors to serialise.
+    :returns: A function that takes a model object and returns a dictionary.
+
+    """
+    return _compile('serialise_object', fields, 'row.{attname}', False)
+
+
+def compile_row_serialiser(fields):
+    """Compiles a serialiser that converts values_list tuples to a
+    dictionary, giving the same result as the object serialiser would for the
+    model object of the row. Values past the given fields are ignored.
+
+    :param fields: The field adaptors of the values, in order.
+    :returns: A function that takes a tuple and returns a dictionary.
+
+    """
+    return _compile('serialise_row', fields, 'row[{idx}]', False)
+
+
+def compile_tuple_serialiser(fields):
+    """Compiles a serialiser that converts values_list tuples to a
+    dictionary that keeps the order of the fields, values past the given
+    fields are ignored.
+
+    :param fields: The field adaptors of the values, in order.
+    :returns: A function that takes a tuple and returns an OrderedDict, or a
+              dict from Python 3.7 on.
+
+    """
+    return _compile('serialise_tuple', fields, 'row[{idx}]', True)
+
+
+def convert_columns(fields, rows):
+    """Converts values_list tuples column by column, each column is turned
+    into a list with a single pass of the converter of its field. Values
+    past the given fields are ignored.
+
+    :param fields: The field adaptors of the values, in order.
+    :param rows: A list of tuples.
+    :returns: A list with a list of converted values per field.
+
+    """
+    columns = []
+    for idx, field in enumerate(fields):
+        converter = field.get_column_converter()
+        values = [row[idx] for row in rows]
+        if converter is not None:
+            values = list(map(converter, values))
+        columns.append(values)
+    return columns
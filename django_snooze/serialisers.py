@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+The serialisers responses can be rendered with, picked by the __format
+system parameter or the Accept header.
+
+Every serialiser has a name that's used as the value of __format and the
+media types it's picked for. Serialisers of optional libraries are always
+registered, they're unavailable if the library isn't installed so asking for
+them can be answered with 406 Not Acceptable instead of a 400.
+"""
+
+import csv
+import io
+import json
+from collections import OrderedDict
+
+from django.utils import six
+from django.utils.encoding import smart_bytes, smart_text
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
+
+if ujson is not None:
+    def dumps(content):
+        """Encodes content as JSON text with ujson.
+
+        :param content: The content to encode.
+        :returns: A string.
+
+        """
+        return ujson.dumps(content, ensure_ascii=False,
+                           escape_forward_slashes=False)
+else:
+    dumps = json.dumps
+
+
+class Serialiser(object):
+    """
+    Base class of the serialisers.
+    """
+
+    # The value of __format that picks the serialiser.
+    name = None
+    # The media types the serialiser is picked for in the Accept header, the
+    # first one is the content type of the responses.
+    media_types = ()
+    # Whether the libraries the serialiser needs are installed.
+    available = True
+
+    @property
+    def content_type(self):
+        return self.media_types[0]
+
+    def serialise(self, content):
+        """Serialises content.
+
+        :param content: The content to serialise.
+        :returns: The serialised content as bytes.
+
+        """
+        raise NotImplementedError
+
+
+class JSONSerialiser(Serialiser):
+    """
+    Serialises to JSON, with ujson if it's installed.
+    """
+
+    name = 'json'
+    media_types = ('application/json; charset=utf-8', 'application/json')
+
+    def serialise(self, content):
+        return smart_bytes(dumps(content))
+
+
+class MessagePackSerialiser(Serialiser):
+    """
+    Serialises to MessagePack, needs the msgpack package.
+    """
+
+    name = 'msgpack'
+    media_types = ('application/x-msgpack', 'application/msgpack')
+    available = msgpack is not None
+
+    def serialise(self, content):
+        return msgpack.packb(content, use_bin_type=True)
+
+
+class CBORSerialiser(Serialiser):
+    """
+    Serialises to CBOR, needs the cbor2 package.
+    """
+
+    name = 'cbor'
+    media_types = ('application/cbor',)
+    available = cbor2 is not None
+
+    def serialise(self, content):
+        return cbor2.dumps(content)
+
+
+class CSVSerialiser(Serialiser):
+    """
+    Serialises to CSV for exports. The objects of a query or a list become
+    the rows, any other content is a single row. The header has the keys of
+    the first row, nested values are written as JSON. Results in the rows
+    layout are written as they are, the columns layout is turned back into
+    rows.
+    """
+
+    name = 'csv'
+    media_types = ('text/csv; charset=utf-8', 'text/csv')
+
+    def get_rows(self, content):
+        """Finds the rows in content.
+
+        :param content: The content to serialise.
+        :returns: A list of dictionaries.
+
+        """
+        if isinstance(content, dict) and isinstance(content.get('objects'),
+                                                    list):
+            return content['objects']
+        if isinstance(content, list):
+            return content
+        return [content]
+
+    def to_cell(self, value):
+        """Converts a value to a cell.
+
+        :param value: The value.
+        :returns: A string.
+
+        """
+        if value is None:
+            return ''
+        if isinstance(value, (dict, list)):
+            value = json.dumps(value)
+        if six.PY2:
+            return smart_bytes(value)
+        return smart_text(value)
+
+    def serialise(self, content):
+        output = io.BytesIO() if six.PY2 else io.StringIO()
+        writer = csv.writer(output)
+        if isinstance(content, dict) and 'columns' in content:
+            if 'rows' in content:
+                rows = content['rows']
+            else:
+                rows = zip(*content['data'])
+            writer.writerow([self.to_cell(x) for x in content['columns']])
+            for row in rows:
+                writer.writerow([self.to_cell(x) for x in row])
+            return smart_bytes(output.getvalue())
+
+        rows = self.get_rows(content)
+        keys = []
+        if rows and isinstance(rows[0], dict):
+            keys = list(rows[0].keys())
+        writer.writerow([self.to_cell(x) for x in keys])
+        for row in rows:
+            if isinstance(row, dict):
+                writer.writerow([self.to_cell(row.get(x)) for x in keys])
+            else:
+                writer.writerow([self.to_cell(row)])
+        return smart_bytes(output.getvalue())
+
+
+SERIALISERS = OrderedDict()
+
+
+def register(serialiser):
+    """Registers a serialiser, replacing any serialiser with the same name.
+
+    :param serialiser: A Serialiser instance.
+    :returns: None
+
+    """
+    SERIALISERS[serialiser.name] = serialiser
+
+
+for serialiser in (JSONSerialiser(), MessagePackSerialiser(),
+                   CBORSerialiser(), CSVSerialiser()):
+    register(serialiser)
+
+
+def get_default_serialiser():
+    """Gets the serialiser used when nothing else is asked for.
+
+    :returns: The JSON serialiser.
+
+    """
+    return SERIALISERS['json']
+
+
+def parse_accept(header):
+    """Parses an Accept header.
+
+    :param header: The value of the header.
+    :returns: A list of media types, best first.
+
+    """
+    accepted = []
+    for idx, part in enumerate(header.split(',')):
+        params = part.split(';')
+        media_type = params[0].strip().lower()
+        if not media_type:
+            continue
+        quality = 1.0
+        for param in params[1:]:
+            key, _, value = param.partition('=')
+            if key.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.append((-quality, idx, media_type))
+    return [x[2] for x in sorted(accepted)]
+
+
+def _matches(pattern, media_type):
+    """Checks if a media type of the Accept header, which can be a wildcard,
+    matches a media type.
+
+    :param pattern: The media type from the Accept header.
+    :param media_type: The media type of a serialiser.
+    :returns: A boolean.
+
+    """
+    media_type = media_type.split(';')[0]
+    if pattern.endswith('/*'):
+        return media_type.startswith(pattern[:-1]) or pattern == '*/*'
+    return pattern == media_type
+
+
+def negotiate(header):
+    """Picks the available serialiser the Accept header likes best, with
+    wildcards picking the first registered one that matches.
+
+    :param header: The value of the Accept header.
+    :returns: A serialiser, None if the header doesn't accept any of them.
+
+    """
+    for pattern in parse_accept(header):
+        for serialiser in SERIALISERS.values():
+            if serialiser.available and any(_matches(pattern, x)
+                                            for x in serialiser.media_types):
+                return serialiser
+    return None
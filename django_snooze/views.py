@@ -1,18 +1,156 @@
 """
 This will contain all the generic CBVs to handle all requests.
 """
+import calendar
+import hashlib
 import json
+import logging
+import operator
+import threading
+import time
 from collections import OrderedDict
-
+from contextlib import contextmanager
+from decimal import Decimal
+from functools import reduce
+from io import BytesIO
+from multiprocessing.pool import ThreadPool
+
+from django.core.exceptions import ValidationError
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import (DatabaseError, IntegrityError, connections,
+                       transaction)
+from django.db.models import Count, Max, Q
 from django.shortcuts import get_object_or_404
 from django.views.generic import View
-from django.http import HttpResponse
+from django.http import (Http404, HttpResponse, HttpResponseNotFound,
+                         StreamingHttpResponse)
+from django.utils import six
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
-from django.core.urlresolvers import reverse
-from django.utils.encoding import smart_text
-
+from django.core.urlresolvers import Resolver404, reverse
+from django.utils.cache import patch_vary_headers
+from django.utils.encoding import smart_bytes, smart_text
+from django.utils.http import (http_date, parse_etags, parse_http_date_safe,
+                               quote_etag, urlencode)
+
+from django_snooze.cache import (get_cache, invalidate_model, make_key,
+                                 record_lookup)
+from django_snooze import (compression, instrumentation, metrics,
+                           serialisers)
+from django_snooze.conf import get_setting
+from django_snooze.db import (StatementTimeout, estimate_count, explain,
+                              get_sql, statement_timeout)
 from django_snooze.exceptions import RESTError
+from django_snooze.fields import EXPENSIVE_LOOKUP_TYPES
+from django_snooze.rows import convert_columns
+
+# TODO: Make these configurable
+SYSTEM_PREFIX = '__'
+EXCLUDE_PREFIX = '!'
+
+logger = logging.getLogger('django_snooze')
+
+# The methods of sub-requests of a batch that can run concurrently.
+READ_METHODS = frozenset(['GET', 'HEAD'])
+
+_batch_pool = None
+_batch_pool_lock = threading.Lock()
+
+
+def get_batch_pool():
+    """Gets the thread pool batch reads run in, it's started on first use
+    with BATCH_THREADS threads.
+
+    :returns: A ThreadPool, None if BATCH_THREADS isn't set.
+
+    """
+    global _batch_pool
+    threads = get_setting('BATCH_THREADS')
+    if not threads:
+        return None
+    with _batch_pool_lock:
+        if _batch_pool is None:
+            _batch_pool = ThreadPool(threads)
+    return _batch_pool
+
+
+def _key_value(value):
+    """Makes a value of a pagination key serialisable.
+
+    :param value: The value of a key field.
+    :returns: A JSON serialisable value.
+
+    """
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def unquote_etag(etag):
+    """Strips the quotes of an ETag, parse_etags returns them unquoted.
+
+    :param etag: A quoted ETag.
+    :returns: The unquoted ETag.
+
+    """
+    return etag[1:-1] if etag.startswith('"') else etag
+
+
+def add_etag_coding(etag, encoding):
+    """Adds the content encoding to a quoted ETag, strong validators have to
+    differ between content codings.
+
+    :param etag: A quoted ETag.
+    :param encoding: The content encoding.
+    :returns: The quoted ETag with the encoding appended, like Django's
+              GZipMiddleware does.
+
+    """
+    return '{};{}"'.format(etag[:-1], encoding)
+
+
+def strip_etag_coding(etag):
+    """Strips the content encoding add_etag_coding appended to an unquoted
+    ETag.
+
+    :param etag: An unquoted ETag.
+    :returns: The ETag of the identity content.
+
+    """
+    base, _, encoding = etag.rpartition(';')
+    if base and encoding in compression.get_encodings():
+        return base
+    return etag
+
+
+def timestamp(value):
+    """Converts a version field value to a timestamp for Last-Modified.
+
+    :param value: A datetime or date.
+    :returns: A timestamp, None if the value isn't a date.
+
+    """
+    if not hasattr(value, 'timetuple'):
+        return None
+    if hasattr(value, 'utctimetuple'):
+        return calendar.timegm(value.utctimetuple())
+    return calendar.timegm(value.timetuple())
+
+
+def build_document(content):
+    """Serialises content that only changes on deploy, like schemas and the
+    index, so it can be kept and sent as is.
+
+    :param content: The content to serialise.
+    :returns: A tuple of the encoded content, its content type, its ETag and
+              a dictionary its compressed variants are kept in.
+
+    """
+    encoded = smart_bytes(serialisers.dumps(content))
+    return (encoded, 'application/json; charset=utf-8',
+            quote_etag(hashlib.md5(encoded).hexdigest()), {})
 
 
 class RESTView(View):
@@ -22,36 +160,220 @@ class RESTView(View):
     It keeps the api and resource variable to get access to their variables.
     """
 
+    _serialiser = None
+    timings = instrumentation.NULL_TIMINGS
+    rows_serialised = 0
+    # The view label of the metrics of the view.
+    metrics_name = 'rest'
+
+    def get_response_serialiser(self):
+        """Picks the serialiser of the response, from the format system
+        parameter or else the Accept header. A format that isn't available
+        is an error, an Accept header that doesn't match any serialiser gets
+        the default one.
+
+        :returns: A serialiser.
+
+        """
+        if self._serialiser is not None:
+            return self._serialiser
+
+        name = self.request.GET.get(SYSTEM_PREFIX + 'format')
+        if name is not None:
+            serialiser = serialisers.SERIALISERS.get(name)
+            if serialiser is None or not serialiser.available:
+                self._serialiser = serialisers.get_default_serialiser()
+                raise RESTError(406, 'Format {} is not available, the '
+                                     'available formats are {}.'.format(
+                                         name, ', '.join(
+                                             x.name for x in
+                                             serialisers.SERIALISERS.values()
+                                             if x.available)))
+        else:
+            serialiser = serialisers.negotiate(
+                self.request.META.get('HTTP_ACCEPT', '*/*'))
+        self._serialiser = serialiser or serialisers.get_default_serialiser()
+        return self._serialiser
+
     def render_serialised_response(self, content, status_code=200, **kwargs):
-        """Figure out what serialiser we need and delegate to the right one.
-        Only JSON is supported for now.
+        """Serialises the content with the serialiser picked for the request.
 
         :param content: The content to serialise.
         :param status_code: The status code of the response.
         :param **kwargs: Additional content to be set.
         :returns: HttpResponse with the right content.
         """
+        serialiser = self.get_response_serialiser()
+        with self.timings.phase('serialise'):
+            serialised_content = serialiser.serialise(content)
+
+        if (status_code == 200 and 'ETag' not in kwargs and
+                self.request.method in ('GET', 'HEAD') and
+                get_setting('ETAGS')):
+            kwargs['ETag'] = quote_etag(hashlib.md5(
+                serialised_content).hexdigest())
+            if self.is_not_modified(kwargs['ETag'], None):
+                return self.render_not_modified(**kwargs)
+
         response = HttpResponse()
         response.status_code = status_code
         for k, v in kwargs.items():
             response[k] = v
-        # TODO: Do some actal delegating here. This is setup for now so that
-        # will be easier later.
-        (serialised_content, content_type) = self._serialise_to_json(content)
         response.write(serialised_content)
+        response['Content-Type'] = serialiser.content_type
+        patch_vary_headers(response, ('Accept',))
+        return self.compress_response(response)
+
+    def render_document(self, document):
+        """Renders a document from build_document, the encoded content is
+        used as is unless another format than JSON was asked for.
+
+        :param document: A tuple of the encoded content, its content type,
+                         its ETag and its compressed variants.
+        :returns: HttpResponse with the document.
+        """
+        serialiser = self.get_response_serialiser()
+        if serialiser is not serialisers.get_default_serialiser():
+            return self.render_serialised_response(
+                json.loads(smart_text(document[0]),
+                           object_pairs_hook=OrderedDict))
+
+        content, content_type, etag, compressed = document
+        headers = {}
+        if get_setting('ETAGS'):
+            if self.is_not_modified(etag, None):
+                return self.render_not_modified(ETag=etag)
+            headers['ETag'] = etag
+
+        response = HttpResponse(content, content_type=content_type)
+        for k, v in headers.items():
+            response[k] = v
+        patch_vary_headers(response, ('Accept',))
+        return self.compress_response(response, compressed)
+
+    def render_not_modified(self, **kwargs):
+        """Renders an empty 304 Not Modified response.
+
+        :param **kwargs: Additional headers to be set, like the validators.
+        :returns: HttpResponse with status code 304.
+        """
+        # Echo the ETag of the compressed content if that's what the client
+        # has.
+        encoding = self.get_content_encoding()
+        if 'ETag' in kwargs and encoding is not None:
+            etag = add_etag_coding(kwargs['ETag'], encoding)
+            if unquote_etag(etag) in parse_etags(
+                    self.request.META.get('HTTP_IF_NONE_MATCH', '')):
+                kwargs['ETag'] = etag
+
+        response = HttpResponse(status=304)
+        for k, v in kwargs.items():
+            response[k] = v
+        return response
+
+    def render_streaming_response(self, streaming_content, content_type,
+                                  status_code=200, **kwargs):
+        """Wraps already serialised content that is generated on the fly in a
+        streaming response.
+
+        :param streaming_content: An iterator of serialised chunks.
+        :param content_type: The content type of the chunks.
+        :param status_code: The status code of the response.
+        :param **kwargs: Additional headers to be set.
+        :returns: StreamingHttpResponse with the content.
+        """
+        response = StreamingHttpResponse(streaming_content)
+        response.status_code = status_code
+        for k, v in kwargs.items():
+            response[k] = v
         response['Content-Type'] = content_type
+        return self.compress_response(response)
+
+    def get_content_encoding(self):
+        """Picks the content encoding of the response from the
+        Accept-Encoding header.
+
+        :returns: An encoding, None if the response isn't compressed.
+
+        """
+        if not get_setting('COMPRESSION'):
+            return None
+        return compression.negotiate(
+            self.request.META.get('HTTP_ACCEPT_ENCODING', ''))
+
+    def compress_response(self, response, cache=None):
+        """Compresses the body of a response if the client accepts it and
+        it's at least COMPRESSION_MIN_SIZE bytes. Streamed bodies are
+        compressed as they're sent.
+
+        :param response: The response.
+        :param cache: A dictionary to keep the compressed body in, keyed by
+                      encoding and level, for bodies that never change.
+        :returns: The response.
+
+        """
+        if not get_setting('COMPRESSION'):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = self.get_content_encoding()
+        if encoding is None or response.has_header('Content-Encoding'):
+            return response
+
+        level = get_setting('COMPRESSION_LEVEL')
+        if response.streaming:
+            response.streaming_content = compression.compress_stream(
+                response.streaming_content, encoding, level)
+        else:
+            if len(response.content) < get_setting('COMPRESSION_MIN_SIZE'):
+                return response
+            key = (encoding, level)
+            compressed = cache.get(key) if cache is not None else None
+            if compressed is None:
+                with self.timings.phase('compress'):
+                    compressed = compression.compress(response.content,
+                                                      encoding, level)
+                if cache is not None:
+                    cache[key] = compressed
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        if response.has_header('ETag'):
+            response['ETag'] = add_etag_coding(response['ETag'], encoding)
         return response
 
-    def _serialise_to_json(self, content):
-        """Serialises content to json.
+    def get_request_body(self):
+        """Gets the body of the request, decompressed if the client sent a
+        Content-Encoding.
 
-        :param content: The content to serialise.
-        :returns: A tuple of the serialised content and the content-type.
+        :returns: The body as bytes.
+
+        """
+        encoding = self.request.META.get('HTTP_CONTENT_ENCODING',
+                                         '').strip().lower()
+        if encoding in ('', 'identity'):
+            return self.request.body
+        if encoding not in compression.get_encodings():
+            raise RESTError(415, 'Content encoding {} is not supported.'
+                                 .format(encoding))
+        try:
+            return compression.decompress(self.request.body, encoding,
+                                          get_setting('MAX_BODY_SIZE'))
+        except ValueError as e:
+            raise RESTError(400, str(e))
+
+    def get_json_body(self):
+        """Parses the request body as JSON.
+
+        :returns: The parsed body.
+        :raises RESTError: When the body isn't valid JSON.
 
         """
-        serialised_content = json.dumps(content)
-        content_type = 'application/json; charset=utf-8'
-        return (serialised_content, content_type)
+        try:
+            return json.loads(smart_text(self.get_request_body()))
+        except ValueError:
+            raise RESTError(400, 'The body is not valid JSON.')
 
     def get(self, request, *args, **kwargs):
         """Handles get requests.
@@ -62,9 +384,69 @@ class RESTView(View):
         :returns: The response.
 
         """
+        headers = {}
+        # Without conditional headers there's nothing to answer early, the
+        # ETag is computed from the content instead.
+        if get_setting('ETAGS') and self.is_conditional():
+            etag, last_modified = self.get_validators(**kwargs)
+            if etag is not None:
+                headers['ETag'] = etag
+            if last_modified is not None:
+                headers['Last-Modified'] = http_date(last_modified)
+            if headers and self.is_not_modified(etag, last_modified):
+                return self.render_not_modified(**headers)
+
         content, status_code = self.get_content_data(**kwargs)
+        if status_code != 200:
+            headers = {}
         return self.render_serialised_response(content,
-                                               status_code=status_code)
+                                               status_code=status_code,
+                                               **headers)
+
+    def get_validators(self, **kwargs):
+        """Gets an ETag and last modification time of the content without
+        building it, so conditional requests can be answered without doing
+        the work. Views that can't do this cheaply return None, their ETag is
+        computed from the serialised content.
+
+        :param **kwargs: The keyword arguments of the request.
+        :returns: A tuple of the quoted ETag and the last modification time
+                  as a timestamp, either can be None.
+
+        """
+        return (None, None)
+
+    def is_conditional(self):
+        """Checks if the request has conditional headers.
+
+        :returns: Boolean
+
+        """
+        return bool(self.request.META.get('HTTP_IF_NONE_MATCH') or
+                    self.request.META.get('HTTP_IF_MODIFIED_SINCE'))
+
+    def is_not_modified(self, etag, last_modified):
+        """Checks the conditional request headers against the validators of
+        the content, If-None-Match takes precedence over If-Modified-Since.
+
+        :param etag: The quoted ETag of the content or None.
+        :param last_modified: The last modification timestamp or None.
+        :returns: Boolean
+
+        """
+        if_none_match = self.request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            if etag is None:
+                return False
+            etags = [strip_etag_coding(x)
+                     for x in parse_etags(if_none_match)]
+            return '*' in etags or unquote_etag(etag) in etags
+
+        if_modified_since = parse_http_date_safe(
+            self.request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+        return (last_modified is not None and
+                if_modified_since is not None and
+                int(last_modified) <= if_modified_since)
 
     @method_decorator(csrf_exempt)
     def dispatch(self, *args, **kwargs):
@@ -78,11 +460,157 @@ class RESTView(View):
         :returns: The response.
 
         """
+        self._serialiser = None
+        self.timings = instrumentation.start_timings()
+        self.rows_serialised = 0
+        start = time.time()
+        response = None
+        error = False
         try:
-            return super(RESTView, self).dispatch(*args, **kwargs)
-        except RESTError as e:
-            return self.render_serialised_response(e.content,
-                                                   status_code=e.status_code)
+            try:
+                response = super(RESTView, self).dispatch(*args, **kwargs)
+            except RESTError as e:
+                error = True
+                response = self.render_serialised_response(
+                    e.content, status_code=e.status_code)
+            except Http404:
+                response = HttpResponseNotFound()
+                raise
+            if self.timings.enabled:
+                self.finish_timings(response)
+            return response
+        finally:
+            # Stops the query logging when the view raised.
+            self.timings.finish()
+            duration = time.time() - start
+            if self.metrics_enabled():
+                self.record_metrics(response, error, duration)
+            threshold = get_setting('SLOW_REQUEST_THRESHOLD')
+            if threshold is not None and duration >= threshold:
+                self.log_slow_request(duration)
+
+    def get_slow_request_details(self):
+        """Gets what's logged about a slow request, views that run queries
+        add their SQL and query plan.
+
+        :returns: An OrderedDict.
+
+        """
+        labels = self.get_metrics_labels()
+        return OrderedDict([
+            ('resource', '.'.join(x for x in labels[:2] if x)),
+            ('view', labels[2]),
+            ('method', self.request.method),
+            ('params', urlencode(sorted(self.request.GET.lists()),
+                                 doseq=True)),
+        ])
+
+    def log_slow_request(self, duration):
+        """Logs a request that took longer than SLOW_REQUEST_THRESHOLD to the
+        django_snooze logger, the details are in the snooze_details
+        attribute of the log record as well. The time of streamed responses
+        doesn't include sending the body.
+
+        :param duration: The time spent in the view, in seconds.
+        :returns: None
+
+        """
+        details = self.get_slow_request_details()
+        lines = ['Slow request to {} took {:.3f}s'.format(self.request.path,
+                                                          duration)]
+        for key, value in details.items():
+            if key == 'plan':
+                lines.append('plan:')
+                lines.extend('    ' + ' | '.join(smart_text(x)
+                                                 for x in row.values())
+                             for row in value or [])
+            else:
+                lines.append('{}: {}'.format(key, smart_text(value)))
+        logger.warning('\n'.join(lines),
+                       extra={'snooze_details': details,
+                              'snooze_duration': duration})
+
+    def metrics_enabled(self):
+        """Checks if the metrics of the request are recorded, which is the
+        case when the API of the view serves them.
+
+        :returns: Boolean
+
+        """
+        api = getattr(self, 'api', None)
+        if api is None:
+            api = getattr(getattr(self, 'resource', None), 'api', None)
+        if api is None:
+            return get_setting('METRICS')
+        return api.metrics
+
+    def get_metrics_labels(self):
+        """Gets the labels the metrics of the request are recorded under.
+
+        :returns: A tuple of the app, model and view.
+
+        """
+        resource = getattr(self, 'resource', None)
+        if resource is None:
+            return ('', '', self.metrics_name)
+        return (resource.app, resource.model_name, self.metrics_name)
+
+    def record_metrics(self, response, error, duration):
+        """Records the metrics of the request, requests that raised an
+        exception are recorded as a server error.
+
+        :param response: The response, None if the view raised.
+        :param error: Whether the request was answered with a RESTError.
+        :param duration: The time spent in the view, in seconds.
+        :returns: None
+
+        """
+        labels = self.get_metrics_labels()
+        size = 0
+        if response is None:
+            status = 500
+        else:
+            status = response.status_code
+            if response.streaming:
+                response.streaming_content = self.count_stream(
+                    labels, response.streaming_content)
+            else:
+                size = len(response.content)
+        metrics.record_request(labels, status, duration,
+                               rows=self.rows_serialised, size=size,
+                               error=error)
+
+    def count_stream(self, labels, chunks):
+        """Wraps the body of a streamed response to record its size and the
+        rows converted for it once it's sent.
+
+        :param labels: The labels of the metrics of the request.
+        :param chunks: The chunks of the body.
+        :returns: A generator of the chunks.
+
+        """
+        rows = self.rows_serialised
+        size = 0
+        try:
+            for chunk in chunks:
+                size += len(chunk)
+                yield chunk
+        finally:
+            metrics.record_stream(labels, size, self.rows_serialised - rows)
+
+    def finish_timings(self, response):
+        """Finishes the timings of an instrumented request, sets the
+        Server-Timing header and sends the request_timed signal.
+
+        :param response: The response.
+        :returns: None
+
+        """
+        self.timings.finish()
+        response['Server-Timing'] = self.timings.server_timing()
+        instrumentation.request_timed.send(
+            sender=self.__class__, view=self, request=self.request,
+            response=response, timings=self.timings)
 
 
 class IndexView(RESTView):
@@ -90,68 +618,641 @@ class IndexView(RESTView):
     A simple CBV for showing the index of all resources.
     """
 
-    api = None
+    metrics_name = 'index'
+    api = None
+
+    def get(self, request, *args, **kwargs):
+        """Responds with the index document the API keeps.
+
+        :param request: The django request object.
+        :param *args: Optional arguments.
+        :param **kwargs: Optional keyword arguments.
+        :returns: The response.
+
+        """
+        return self.render_document(self.api.get_index_document())
+
+    def get_content_data(self, **kwargs):
+        """Gets the index data structure of the API.
+
+        :param **kwargs: Not used, kept because it gets passed to us.
+        :returns: A tuple containing the index structure and the status code.
+
+        """
+        return (self.api.get_index(), 200)
+
+
+class RouterView(View):
+    """
+    Routes all resource URLs of an API from a single URL pattern, the
+    resource is looked up by app label and model name and picks the view.
+    """
+
+    api = None
+
+    @method_decorator(csrf_exempt)
+    def dispatch(self, request, app, model_name, path):
+        """Hands the request to the view of the resource.
+
+        :param request: The django request object.
+        :param app: The app label from the URL.
+        :param model_name: The model name from the URL.
+        :param path: The rest of the URL.
+        :returns: The response of the resource view.
+
+        """
+        resource = self.api.get_resource_by_name(app, model_name)
+        if resource is None:
+            raise Http404('No resource for {}.{}.'.format(app, model_name))
+
+        view, kwargs = resource.route('{}/{}/{}'.format(app, model_name,
+                                                        path))
+        if view is None:
+            raise Http404('No route for {}.'.format(path))
+        return view(request, **kwargs)
+
+
+class MetricsView(View):
+    """
+    Shows the request metrics in the Prometheus text exposition format.
+    """
+
+    http_method_names = ['get', 'head']
+
+    def get(self, request, *args, **kwargs):
+        """Renders the metrics of all threads of the process.
+
+        :param request: The django request object.
+        :param *args: Optional arguments.
+        :param **kwargs: Optional keyword arguments.
+        :returns: The response.
+
+        """
+        return HttpResponse(metrics.render(),
+                            content_type='text/plain; version=0.0.4; '
+                                         'charset=utf-8')
+
+
+class BatchView(RESTView):
+    """
+    Runs a list of API requests in one HTTP request. The sub-requests are
+    resolved against the URLs of the API and handed to the views directly,
+    without going through the middleware again.
+    """
+
+    metrics_name = 'batch'
+    api = None
+    http_method_names = ['post']
+
+    def post(self, request, *args, **kwargs):
+        """Runs the sub-requests in the JSON body, a list of objects with a
+        method, a path and optionally a body. If BATCH_THREADS is set the
+        reads before the first write run concurrently, everything from the
+        first write on runs in order in this thread so reads see the writes
+        before them.
+
+        :param request: The django request object.
+        :param *args: Optional arguments.
+        :param **kwargs: Optional keyword arguments.
+        :returns: A response with a JSON array of the status, headers and
+                  body of every sub-request.
+
+        """
+        if not self.request.META.get(
+            'CONTENT_TYPE', ''
+        ).startswith('application/json'):
+            raise RESTError(400, {'Status': 'Wrong Content-Type.'})
+        items = self.get_json_body()
+        if not isinstance(items, list):
+            raise RESTError(400, 'The body must be a JSON array of requests.')
+        max_requests = get_setting('BATCH_MAX_REQUESTS')
+        if max_requests is not None and len(items) > max_requests:
+            raise RESTError(400, 'No more than {} requests can be batched.'
+                                 .format(max_requests))
+
+        sub_requests = [self.build_request(x) for x in items]
+        pool = get_batch_pool()
+        # The threads of the pool have their own connections, they can't see
+        # what this thread's transaction hasn't committed yet.
+        if pool is not None and any(x.in_atomic_block
+                                    for x in connections.all()):
+            pool = None
+
+        reads = []
+        if pool is not None:
+            for sub_request in sub_requests:
+                if sub_request.method not in READ_METHODS:
+                    break
+                reads.append(sub_request)
+
+        results = []
+        if len(reads) > 1:
+            # Every thread runs a share of the reads, one after the other.
+            threads = get_setting('BATCH_THREADS')
+            size = -(-len(reads) // threads)
+            for chunk in pool.map(self.run_concurrent_requests,
+                                  [reads[x:x + size]
+                                   for x in range(0, len(reads), size)]):
+                results += chunk
+        else:
+            reads = []
+        for sub_request in sub_requests[len(reads):]:
+            results.append(self.run_request(sub_request))
+
+        return self.compress_response(HttpResponse(
+            b'[' + b','.join(results) + b']',
+            content_type='application/json; charset=utf-8'))
+
+    def build_request(self, item):
+        """Builds the request object of a sub-request, it shares the
+        environment and the user of the batch request.
+
+        :param item: A dictionary with the method, path and body.
+        :returns: A WSGIRequest.
+
+        """
+        if not isinstance(item, dict) or 'path' not in item:
+            raise RESTError(400, 'Every request needs a path.')
+        errors = {}
+        for key in ('method', 'path', 'content_type'):
+            if key in item and not isinstance(item[key], six.string_types):
+                errors[key] = 'Must be a string.'
+        if not isinstance(item.get('body'),
+                          six.string_types + (dict, list, type(None))):
+            errors['body'] = 'Must be a string, a JSON object or an array.'
+        if errors:
+            raise RESTError(400, {'Errors': errors})
+
+        method = item.get('method', 'GET').upper()
+        path, _, query_string = item['path'].partition('?')
+        root = reverse('{}:index'.format(self.api.name))
+        if not path.startswith(root):
+            path = root + path.lstrip('/')
+
+        body = item.get('body')
+        content_type = item.get('content_type', 'application/json')
+        if body is None:
+            body = b''
+        elif isinstance(body, (dict, list)):
+            body = smart_bytes(json.dumps(body))
+        else:
+            body = smart_bytes(body)
+
+        environ = dict(self.request.META)
+        environ.update({
+            'REQUEST_METHOD': method,
+            'PATH_INFO': path,
+            'SCRIPT_NAME': '',
+            'QUERY_STRING': query_string,
+            'CONTENT_TYPE': content_type,
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.input': BytesIO(body),
+            # The results are embedded in a JSON array.
+            'HTTP_ACCEPT': 'application/json',
+        })
+        for key in ('HTTP_ACCEPT_ENCODING', 'HTTP_CONTENT_ENCODING'):
+            environ.pop(key, None)
+        for key in ('HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE'):
+            environ.pop(key, None)
+        sub_request = WSGIRequest(environ)
+        sub_request.snooze_path = path[len(root):]
+        if hasattr(self.request, 'user'):
+            sub_request.user = self.request.user
+        return sub_request
+
+    def run_request(self, sub_request):
+        """Resolves a sub-request against the API and runs its view.
+
+        :param sub_request: The request object of the sub-request.
+        :returns: The encoded JSON object of the result.
+
+        """
+        try:
+            match = self.api.get_resolver().resolve(sub_request.snooze_path)
+            if match.func is self.api.batch_view:
+                raise RESTError(400, 'Batches can not be nested.')
+            response = match.func(sub_request, *match.args, **match.kwargs)
+        except (Resolver404, Http404):
+            return self.encode_result(404, {}, smart_bytes(json.dumps(
+                {'Status': 'Not found.'})), 'application/json')
+        except RESTError as e:
+            return self.encode_result(e.status_code, {}, smart_bytes(
+                json.dumps(e.content)), 'application/json')
+
+        if response.streaming:
+            content = b''.join(response.streaming_content)
+        else:
+            content = response.content
+        headers = dict((k, v) for k, v in response.items()
+                       if k != 'Content-Type')
+        return self.encode_result(response.status_code, headers, content,
+                                  response.get('Content-Type', ''))
+
+    def run_concurrent_requests(self, sub_requests):
+        """Runs sub-requests one after the other in a thread of the batch
+        pool. The database connections of the thread are closed afterwards
+        the way Django does at the end of a request, which keeps persistent
+        connections if CONN_MAX_AGE is set.
+
+        :param sub_requests: The request objects of the sub-requests.
+        :returns: A list of the encoded JSON objects of the results.
+
+        """
+        try:
+            return [self.run_request(x) for x in sub_requests]
+        finally:
+            for connection in connections.all():
+                connection.close_if_unusable_or_obsolete()
+
+    def encode_result(self, status_code, headers, content, content_type):
+        """Encodes the result of a sub-request, JSON bodies are embedded as
+        they are so they don't have to be decoded and encoded again.
+
+        :param status_code: The status code of the response.
+        :param headers: A dictionary of response headers.
+        :param content: The encoded body.
+        :param content_type: The content type of the body.
+        :returns: The encoded JSON object.
+
+        """
+        if not content_type.startswith('application/json'):
+            content = smart_bytes(json.dumps(smart_text(content,
+                                                        errors='replace')))
+        elif not content:
+            content = b'null'
+        # The body goes in place of the closing brace of the encoded object.
+        return (smart_bytes(json.dumps({'status': status_code,
+                                        'headers': headers})[:-1]) +
+                b', "body": ' + content + b'}')
+
+
+class ResourceView(RESTView):
+    """
+    Parent class for all resource views.
+
+    This will only contain the resource class variable for now but it's
+    seperated out for possible extension reasons.
+    """
+    resource = None
+
+    def get_version_etag(self, *values):
+        """Builds an ETag from the values of the version field, combined with
+        the query string so different representations get different ETags.
+
+        :param *values: The values the content depends on.
+        :returns: A quoted ETag.
+
+        """
+        parts = [self.resource.app, self.resource.model_name,
+                 sorted(self.request.GET.lists()),
+                 self.get_response_serialiser().name]
+        parts += [smart_text(x) for x in values]
+        return quote_etag(hashlib.md5(
+            smart_bytes(json.dumps(parts))).hexdigest())
+
+    def get_expansions(self, values):
+        """Parses the expand system parameter, a comma separated list of
+        ForeignKey fields whose related objects should be embedded.
+
+        :param values: The values of the expand parameter.
+        :returns: A list of tuples of field name and related resource.
+
+        """
+        if not values:
+            return []
+
+        if len(values) > 1:
+            raise RESTError(400,
+                            'Expand needs a single comma separated string.')
+
+        expand = [(name, self.resource.get_related_resource(name))
+                  for name in values[0].split(',')]
+
+        errors = {name: "Field {} is not expandable.".format(name)
+                  for name, resource in expand
+                  if resource is None}
+        errors.update(self._duplicate_errors([name for name, resource
+                                              in expand]))
+
+        if errors:
+            raise RESTError(400,
+                            {'Errors': errors})
+
+        return expand
+
+    def get_field_selection(self, values):
+        """Parses the fields system parameter, a comma separated list of the
+        fields to return.
+
+        :param values: The values of the fields parameter.
+        :returns: A list of field names, None if all fields are wanted.
+
+        """
+        if not values:
+            return None
+
+        if len(values) > 1:
+            raise RESTError(400,
+                            'Fields needs a single comma separated string.')
+
+        fields = values[0].split(',')
+
+        errors = {field: "Field {} is not selectable.".format(field)
+                  for field in fields
+                  if not self._check_valid_field(field)}
+        errors.update(self._duplicate_errors(fields))
+
+        if errors:
+            raise RESTError(400,
+                            {'Errors': errors})
+
+        return fields
+
+    def _duplicate_errors(self, names):
+        """Finds the names that are given more than once in a list of
+        fields, every distinct list compiles its own serialiser.
+
+        :param names: The list of names.
+        :returns: A dictionary of errors keyed by name.
+
+        """
+        seen = set()
+        errors = {}
+        for name in names:
+            if name in seen:
+                errors[name] = "Field {} is given more than once.".format(
+                    name)
+            seen.add(name)
+        return errors
+
+    def check_expansions(self, expand, fields):
+        """Checks that all expanded fields are part of the field selection.
+
+        :param expand: A list of tuples of field name and related resource.
+        :param fields: The selected field names, None if all are selected.
+        :returns: None
+
+        """
+        if fields is None:
+            return
+
+        errors = {name: "Field {} is expanded but not selected.".format(name)
+                  for name, resource in expand
+                  if name not in fields}
+
+        if errors:
+            raise RESTError(400,
+                            {'Errors': errors})
+
+    def _check_valid_field(self, field):
+        """Checks if a field exists.
+
+        :param field: The field.
+        :returns: Boolean
+        """
+        exists = False
+        if field in self.resource.fields_dict:
+            exists = True
+        return exists
+
+
+class QueryView(ResourceView):
+    """
+    This view will handle queries for self.resource. GET requests fetch the
+    matching objects, PATCH and DELETE requests update or delete all of them
+    in a single query.
+    """
+
+    metrics_name = 'query'
+    http_method_names = ['get', 'head', 'patch', 'delete']
+    constructed_queryset = None
+    ordering = None
+
+    def get(self, request, *args, **kwargs):
+        """Overriding the get method to add a parse_get_data.
+
+        :param request: The django request object.
+        :param *args: Optional argumenta.
+        :param **kwargs: Optional keyword arguments.
+        :returns: The response.
+
+        """
+        with self.timings.phase('parse'):
+            self.parse_get_data(request.GET)
+
+        if self._bool_param('explain'):
+            return self.render_explain_response()
+
+        if self._bool_param('count'):
+            return self.render_count_response()
+
+        stream_format = self.get_stream_format()
+        if stream_format:
+            # Streamed responses are always JSON, other formats are refused
+            # instead of ignored.
+            if (SYSTEM_PREFIX + 'format' in request.GET and
+                    self.get_response_serialiser().name != 'json'):
+                raise RESTError(406, 'Streamed responses are only available '
+                                     'as JSON.')
+            # Construct the queryset up front so errors in the query are
+            # still reported with a proper status code.
+            queryset = self.construct_queryset()
+            if self.layout:
+                raise RESTError(400, 'Layout can not be combined with '
+                                     'stream.')
+            if stream_format == 'ndjson':
+                return self.render_streaming_response(
+                    self.stream_ndjson(queryset),
+                    'application/x-ndjson; charset=utf-8')
+            return self.render_streaming_response(
+                self.stream_json(queryset),
+                'application/json; charset=utf-8')
+
+        return super(QueryView, self).get(request, *args, **kwargs)
+
+    def head(self, request, *args, **kwargs):
+        """HEAD requests only get the total number of objects of the query.
+
+        :param request: The django request object.
+        :param *args: Optional arguments.
+        :param **kwargs: Optional keyword arguments.
+        :returns: The response.
+
+        """
+        self.parse_get_data(request.GET)
+        return self.render_count_response()
+
+    def patch(self, request, *args, **kwargs):
+        """Updates all objects that match the filter and exclusion parameters
+        with the field values in the JSON body, in a single query.
+
+        :param request: The django request object.
+        :param *args: Optional arguments.
+        :param **kwargs: Optional keyword arguments.
+        :returns: The response with the number of updated objects.
+
+        """
+        if not self.request.META.get(
+            'CONTENT_TYPE', ''
+        ).startswith('application/json'):
+            raise RESTError(400, {'Status': 'Wrong Content-Type.'})
+        data = self.get_json_body()
+        if not isinstance(data, dict) or not data:
+            raise RESTError(400, 'The body must be a JSON object of fields.')
+        values = self.clean_update_data(data)
 
-    def get_content_data(self, **kwargs):
-        """This will iterate over all apps and models discovered by the API
-        and return an index data structure.
+        self.parse_get_data(request.GET)
+        with transaction.atomic():
+            queryset = self.get_bulk_queryset()
+            count = queryset.update(**values)
+        invalidate_model(self.resource.model)
+        return self.render_serialised_response({'Status': 'success',
+                                                'count': count})
 
-        :param **kwargs: Not used, kept because it gets passed to us.
-        :returns: A tuple containing the index structure and the status code.
+    def delete(self, request, *args, **kwargs):
+        """Deletes all objects that match the filter and exclusion
+        parameters. The count doesn't include objects deleted by cascades.
+
+        :param request: The django request object.
+        :param *args: Optional arguments.
+        :param **kwargs: Optional keyword arguments.
+        :returns: The response with the number of deleted objects.
 
         """
-        index_struct = {}
-        for app, resources in self.api._resources.items():
-            app_dict = index_struct.get(app, {})
-            for resource in resources:
-                app_dict[resource.model_name] = {
-                    'query_path': reverse('{}:{}'.format(
-                        self.api.app_name,
-                        resource.query_reverse_name
-                    )),
-                    'schema_path': reverse('{}:{}'.format(
-                        self.api.app_name,
-                        resource.schema_reverse_name
-                    )),
-                    'new_path': reverse('{}:{}'.format(
-                        self.api.app_name,
-                        resource.new_reverse_name
-                    ))
-                }
-            index_struct[app] = app_dict
-
-        return (index_struct, 200)
+        self.parse_get_data(request.GET)
+        with transaction.atomic():
+            queryset = self.get_bulk_queryset()
+            # QuerySet.delete doesn't return the number of deleted rows.
+            count = queryset.count()
+            queryset.delete()
+        invalidate_model(self.resource.model)
+        return self.render_serialised_response({'Status': 'success',
+                                                'count': count})
+
+    def get_bulk_queryset(self):
+        """Gets the queryset of the objects to update or delete, checking the
+        guards against changing more than intended: system parameters like
+        limit don't narrow down the objects so they're refused, a filter or
+        exclusion is required if BULK_REQUIRE_FILTER is set and no more than
+        BULK_MAX_ROWS objects may match.
+
+        :returns: The queryset.
 
+        """
+        params = sorted(SYSTEM_PREFIX + x for x in self.system_params
+                        if x != 'format')
+        if params:
+            raise RESTError(400, 'Parameters {} can not be used to change '
+                                 'objects in bulk.'.format(', '.join(params)))
+        if (get_setting('BULK_REQUIRE_FILTER') and
+                not self.filter_params and not self.exclude_params):
+            raise RESTError(400, 'A filter is required to change objects '
+                                 'in bulk.')
+
+        queryset = self.get_filtered_queryset()
+
+        max_rows = get_setting('BULK_MAX_ROWS')
+        if max_rows is not None:
+            count = queryset.count()
+            if count > max_rows:
+                raise RESTError(400, 'The query matches {} objects, no more '
+                                     'than {} can be changed at once.'.format(
+                                         count, max_rows))
+        return queryset
 
-class ResourceView(RESTView):
-    """
-    Parent class for all resource views.
+    def clean_update_data(self, data):
+        """Validates the fields of an update with the fields of the resource
+        form, so they get the same validation objects get when they're
+        created.
 
-    This will only contain the resource class variable for now but it's
-    seperated out for possible extension reasons.
-    """
-    resource = None
+        :param data: A dictionary of field values.
+        :returns: A dictionary of cleaned values.
 
+        """
+        form_fields = self.resource.form.base_fields
+        values = {}
+        errors = {}
+        for name, value in data.items():
+            if name not in form_fields:
+                errors[name] = ['This field can not be updated.']
+                continue
+            try:
+                values[name] = form_fields[name].clean(value)
+            except ValidationError as e:
+                errors[name] = e.messages
+        if errors:
+            raise RESTError(400, {'Status': 'failed', 'errors': errors})
+        return values
 
-class QueryView(ResourceView):
-    """
-    This view will handle queries for self.resource, it only supports GET
-    requests at the moment with POST-queries planned in the near future.
-    """
+    def get_validators(self, **kwargs):
+        """Builds the validators from the highest value of the version field
+        and the number of matching objects, if the resource has a version
+        field. Expanded objects aren't covered by the version field.
 
-    http_method_names = ['get', 'head']
+        :param **kwargs: Not used in this request.
+        :returns: A tuple of the ETag and the last modification time.
 
-    def get(self, request, *args, **kwargs):
-        """Overriding the get method to add a parse_get_data.
+        """
+        field = self.resource.version_field
+        if field is None or 'expand' in self.system_params:
+            return (None, None)
+
+        # Invalid queries are answered with an error, not a 304.
+        self.construct_queryset()
+        queryset = self.get_filtered_queryset()
+        with self.statement_timeout():
+            aggregate = queryset.aggregate(version=Max(field),
+                                           count=Count('pk'))
+        return (self.get_version_etag(aggregate['version'],
+                                      aggregate['count']),
+                timestamp(aggregate['version']))
+
+    def render_count_response(self):
+        """Renders the total number of objects of the query, which is also
+        set in the X-Total-Count header.
 
-        :param request: The django request object.
-        :param *args: Optional argumenta.
-        :param **kwargs: Optional keyword arguments.
         :returns: The response.
 
         """
-        self.parse_get_data(request.GET)
-        return super(QueryView, self).get(request, *args, **kwargs)
+        count, estimated = self.get_count()
+        headers = {'X-Total-Count': str(count)}
+        if estimated:
+            headers['X-Total-Count-Estimated'] = 'true'
+        return self.render_serialised_response(
+            {'count': count, 'estimated': estimated}, **headers)
+
+    def get_count(self):
+        """Counts the objects that match the filter and exclusion parameters.
+        The count is cached if COUNT_CACHE_TIMEOUT is set and estimated from
+        the database statistics for big results if COUNT_ESTIMATE_THRESHOLD
+        is set.
+
+        :returns: A tuple of the count and whether it's an estimate.
+
+        """
+        timeout = get_setting('COUNT_CACHE_TIMEOUT')
+        if timeout is not None:
+            key = make_key('count', self.resource, [self.resource.model],
+                           self.filter_params, self.exclude_params)
+            cached = get_cache().get(key)
+            if cached is not None:
+                return cached
+
+        queryset = self.get_filtered_queryset()
+
+        result = None
+        threshold = get_setting('COUNT_ESTIMATE_THRESHOLD')
+        if threshold is not None:
+            estimate = estimate_count(queryset)
+            if estimate is not None and estimate >= threshold:
+                result = (estimate, True)
+        if result is None:
+            with self.statement_timeout():
+                result = (queryset.count(), False)
+
+        if timeout is not None:
+            get_cache().set(key, result, timeout)
+        return result
 
     def parse_get_data(self, get_dict):
         """Parses the get parameters and sorts them for further use.
@@ -160,10 +1261,6 @@ class QueryView(ResourceView):
         :returns: None
 
         """
-        # TODO: Make these configurable
-        SYSTEM_PREFIX = '__'
-        EXCLUDE_PREFIX = '!'
-
         self.system_params = {}
         self.filter_params = {}
         self.exclude_params = {}
@@ -184,12 +1281,128 @@ class QueryView(ResourceView):
         :returns: A fully constructed queryset.
 
         """
-        queryset = self.resource.queryset
-        queryset = self.filter_queryset(queryset)
-        queryset = self.exclude_queryset(queryset)
+        queryset = self.get_filtered_queryset()
         queryset = self.misc_alter_queryset(queryset)
+        self.check_ordering_cost()
+        # Kept for the slow request log.
+        self.constructed_queryset = queryset
+        return queryset
+
+    def get_filtered_queryset(self):
+        """Gets the queryset of the objects that match the filter and
+        exclusion parameters, which every request of this view works on.
+
+        :returns: The filtered queryset.
+
+        """
+        queryset = self.exclude_queryset(
+            self.filter_queryset(self.resource.queryset))
+        self.check_query_cost()
         return queryset
 
+    def check_query_cost(self):
+        """Checks that the filters and exclusions only use expensive lookups
+        on indexed fields, if INDEXED_LOOKUPS_ONLY is set for the resource.
+
+        :returns: None
+
+        """
+        if not self.resource.get_limit('INDEXED_LOOKUPS_ONLY'):
+            return
+
+        indexed = self.resource.indexed_fields
+        plan = self.get_query_plan()
+        errors = {}
+        for param, field, lookup_type in plan.filters + plan.excludes:
+            if (lookup_type in EXPENSIVE_LOOKUP_TYPES and
+                    field.name not in indexed):
+                errors[param] = 'Lookup type {} is only allowed on indexed ' \
+                                'fields.'.format(lookup_type)
+
+        if errors:
+            raise RESTError(400,
+                            {'Errors': errors})
+
+    def check_ordering_cost(self):
+        """Checks that the ordering only uses indexed fields, if
+        INDEXED_LOOKUPS_ONLY is set for the resource.
+
+        :returns: None
+
+        """
+        if not self.resource.get_limit('INDEXED_LOOKUPS_ONLY'):
+            return
+
+        indexed = self.resource.indexed_fields
+        errors = {}
+        for field in self.ordering or []:
+            if field.lstrip('-') not in indexed:
+                errors[field] = 'Ordering is only allowed on indexed fields.'
+
+        if errors:
+            raise RESTError(400,
+                            {'Errors': errors})
+
+    @contextmanager
+    def statement_timeout(self):
+        """Cancels the queries run in the block once they take longer than
+        the STATEMENT_TIMEOUT of the resource.
+
+        :returns: A context manager.
+        :raises RESTError: When a query is cancelled.
+
+        """
+        try:
+            with statement_timeout(self.resource.queryset.db,
+                                   self.resource.get_limit(
+                                       'STATEMENT_TIMEOUT')):
+                yield
+        except StatementTimeout:
+            raise RESTError(503, 'The query took too long.')
+
+    def render_explain_response(self):
+        """Responds with the SQL and the query plan of the current query
+        instead of its results, only for staff users.
+
+        :returns: The response.
+
+        """
+        user = getattr(self.request, 'user', None)
+        if user is None or not user.is_staff:
+            raise RESTError(403, 'Only staff users can explain queries.')
+
+        queryset = self.construct_queryset()
+        plan = explain(queryset)
+        if plan is None:
+            raise RESTError(501, 'The database backend can not explain '
+                                 'queries.')
+        sql, params = get_sql(queryset)
+        return self.render_serialised_response(OrderedDict([
+            ('sql', sql),
+            ('params', [smart_text(x) for x in params]),
+            ('plan', plan),
+        ]))
+
+    def get_slow_request_details(self):
+        """Adds the SQL and the query plan of the query to the details of a
+        slow request. Nothing is added when the result came from the cache.
+
+        :returns: An OrderedDict.
+
+        """
+        details = super(QueryView, self).get_slow_request_details()
+        queryset = self.constructed_queryset
+        if queryset is None:
+            return details
+
+        details['sql'], params = get_sql(queryset)
+        details['sql_params'] = [smart_text(x) for x in params]
+        try:
+            details['plan'] = explain(queryset)
+        except DatabaseError as e:
+            details['plan'] = [{'error': smart_text(e)}]
+        return details
+
     def filter_queryset(self, queryset):
         """Applies all the filter parameters to the queryset.
 
@@ -197,11 +1410,15 @@ class QueryView(ResourceView):
         :returns: A queryset with filters applied to it.
 
         """
-        # TODO: Handle relations and non-existent fields.
-        for query_filter, query_value in self.filter_params.items():
-            query_filter, query_value = self._process_param(query_filter,
-                                                            query_value)
-            queryset = queryset.filter(**{query_filter: query_value})
+        # TODO: Handle relations.
+        filters = {}
+        for param, field, lookup_type in self.get_query_plan().filters:
+            filters[param] = field.process_value(lookup_type,
+                                                 self.filter_params[param])
+        if filters:
+            # Without relations a single filter call is the same as chaining
+            # them, and a lot cheaper.
+            queryset = queryset.filter(**filters)
         return queryset
 
     def exclude_queryset(self, queryset):
@@ -211,13 +1428,22 @@ class QueryView(ResourceView):
         :returns: A queryset with exclusions applied to it.
 
         """
-        # TODO: Handle relations and non-existent fields.
-        for query_filter, query_value in self.exclude_params.items():
-            query_filter, query_value = self._process_param(query_filter,
-                                                            query_value)
-            queryset = queryset.exclude(**{query_filter: query_value})
+        # TODO: Handle relations.
+        for param, field, lookup_type in self.get_query_plan().excludes:
+            queryset = queryset.exclude(**{param: field.process_value(
+                lookup_type, self.exclude_params[param])})
         return queryset
 
+    def get_query_plan(self):
+        """Gets the validated plan of the filter and exclusion parameters
+        from the resource, which keeps the plans of recent query shapes.
+
+        :returns: A QueryPlan.
+
+        """
+        return self.resource.get_query_plan(self.filter_params,
+                                            self.exclude_params)
+
     def misc_alter_queryset(self, queryset):
         """Run miscellaneous queryset alterations, this will contain a lot of
         the "system" parameters.
@@ -227,15 +1453,53 @@ class QueryView(ResourceView):
 
         """
         self.render_values_list = False
+        self.ordering = None
+        self.keyset = None
+        self.expand = self.get_expansions(
+            self.system_params.get('expand', []))
+        self.selected_fields = self.get_field_selection(
+            self.system_params.get('fields', []))
+        self.check_expansions(self.expand, self.selected_fields)
+        self.layout = self.get_layout(self.system_params.get('layout', []))
+        if self.layout and self.expand:
+            raise RESTError(400, 'Expand can not be combined with layout.')
         if 'order_by' in self.system_params:
             queryset = self.order_by(queryset, self.system_params['order_by'])
 
+        if 'after' in self.system_params or 'before' in self.system_params:
+            queryset = self.keyset_filter(queryset)
+
         if 'values_list' in self.system_params:
+            if self.expand or self.selected_fields:
+                raise RESTError(
+                    400,
+                    'Expand and fields can not be combined with values_list.')
             queryset = self.values_list(queryset,
                                         self.system_params['values_list'])
+        else:
+            queryset = self.select_columns(queryset)
+
+        queryset = self.paginate(queryset)
 
         return queryset
 
+    def get_layout(self, values):
+        """Parses the layout system parameter, it returns the results as a
+        table instead of a list of objects: rows gives a list of columns and
+        an array per row, columns gives a list of columns and an array per
+        column.
+
+        :param values: The values of the layout parameter.
+        :returns: The layout, None for a list of objects.
+
+        """
+        if not values or values == ['objects']:
+            return None
+        if len(values) > 1 or values[0] not in ('rows', 'columns'):
+            raise RESTError(400, 'Layout needs to be objects, rows or '
+                                 'columns.')
+        return values[0]
+
     def order_by(self, queryset, fields):
         """Applies order to the queryset.
 
@@ -259,8 +1523,62 @@ class QueryView(ResourceView):
             raise RESTError(400,
                             {'Errors': errors})
 
+        self.ordering = fields
         return queryset.order_by(*fields)
 
+    def keyset_filter(self, queryset):
+        """Applies keyset pagination to the queryset. The after and before
+        parameters take the key of the last or first object of the previous
+        page, that is the value of every field in the ordering with the primary
+        key as tie breaker. A single value key is given as is, a key of
+        multiple values as a JSON list. An empty value starts at the first
+        (after) or last (before) page.
+
+        :param queryset: The queryset to apply the keyset filter to.
+        :returns: A queryset that only contains objects past the key.
+
+        """
+        if 'after' in self.system_params and 'before' in self.system_params:
+            raise RESTError(400, 'After and before can not be combined.')
+
+        self.keyset = 'after' if 'after' in self.system_params else 'before'
+        values = self.system_params[self.keyset]
+        if len(values) > 1:
+            raise RESTError(400, '{} takes a single value.'.format(
+                self.keyset.capitalize()))
+
+        ordering = list(self.ordering or [])
+        pk_name = self.resource.model._meta.pk.name
+        if pk_name not in [field.lstrip('-') for field in ordering]:
+            ordering.append(pk_name)
+        self.ordering = ordering
+
+        # Paging backwards is done by walking the reversed ordering, the page
+        # gets turned around again when it's rendered.
+        if self.keyset == 'before':
+            queryset = queryset.order_by(*[self._reverse_order(field)
+                                           for field in ordering])
+        else:
+            queryset = queryset.order_by(*ordering)
+
+        if not values[0]:
+            return queryset
+
+        key = self._parse_key(values[0])
+        if len(key) != len(ordering):
+            raise RESTError(400, {
+                'Error': '{} needs a value for each of {}.'.format(
+                    self.keyset.capitalize(), ','.join(ordering))})
+
+        nulls_largest = connections[
+            queryset.db].features.nulls_order_largest
+        try:
+            return queryset.filter(self._keyset_q(ordering, key,
+                                                  nulls_largest))
+        except (ValueError, TypeError, ValidationError):
+            raise RESTError(400, {'Error': 'Invalid key {}.'.format(
+                values[0])})
+
     def values_list(self, queryset, fields):
         """Constructs a values_list object.
 
@@ -281,62 +1599,477 @@ class QueryView(ResourceView):
         errors = {field: "Field {} is not listable.".format(field)
                   for field in fields
                   if not self._check_valid_field(field)}
+        errors.update(self._duplicate_errors(fields))
 
         if errors:
             raise RESTError(400,
                             {'Errors': errors})
 
         self.render_values_list = fields
-        return queryset.values_list(*fields)
+
+        # Keyset pagination needs the key of the rows, fetch the key fields
+        # that weren't asked for as well, they're not rendered.
+        self.row_columns = list(fields)
+        if self.keyset:
+            self.row_columns += [field.lstrip('-')
+                                 for field in self.ordering
+                                 if field.lstrip('-') not in fields]
+
+        return queryset.values_list(*self.row_columns)
+
+    def select_columns(self, queryset):
+        """Fetches all the columns of the resource as values_list tuples, this
+        saves instantiating a model object for every row. Only the selected
+        fields are fetched if there is a field selection, the columns of
+        expanded related objects are fetched in the same query.
+
+        :param queryset: The queryset to select the columns of.
+        :returns: A values_list queryset.
+
+        """
+        self.row_columns = self.resource.get_expanded_columns(
+            self.expand, self.selected_fields)
+
+        # Like values_list, keyset pagination needs the key fields.
+        if self.keyset:
+            self.row_columns += [field.lstrip('-')
+                                 for field in self.ordering
+                                 if field.lstrip('-') not in self.row_columns]
+
+        return queryset.values_list(*self.row_columns)
+
+    def paginate(self, queryset):
+        """Slices the queryset according to the limit and offset parameters.
+        A single extra row is fetched to find out if there is a next page.
+
+        :param queryset: The queryset to paginate.
+        :returns: The sliced queryset.
+
+        """
+        self.limit = self._int_param('limit', get_setting('DEFAULT_LIMIT'), 1)
+        self.offset = self._int_param('offset', 0, 0)
+
+        for max_limit in (get_setting('MAX_LIMIT'),
+                          self.resource.get_limit('MAX_ROWS')):
+            if max_limit is not None and (self.limit is None or
+                                          self.limit > max_limit):
+                self.limit = max_limit
+
+        if self.keyset and self.offset:
+            raise RESTError(400,
+                            'Offset can not be combined with after or before.')
+
+        if not self.keyset and (self.limit is not None or self.offset):
+            queryset = self.stable_order(queryset)
+
+        if self.limit is None:
+            return queryset[self.offset:] if self.offset else queryset
+        return queryset[self.offset:self.offset + self.limit + 1]
+
+    def stable_order(self, queryset):
+        """Adds the primary key to the ordering of the queryset as a tie
+        breaker, so the pages of offset pagination don't overlap or skip
+        rows. The ordering of __order_by, the queryset or the model comes
+        first.
+
+        :param queryset: The queryset to order.
+        :returns: The ordered queryset.
+
+        """
+        if self.ordering:
+            ordering = list(self.ordering)
+        elif queryset.query.order_by:
+            ordering = list(queryset.query.order_by)
+        elif queryset.query.default_ordering:
+            ordering = list(self.resource.model._meta.ordering)
+        else:
+            ordering = []
+        if '?' in ordering:
+            return queryset
+
+        pk_name = self.resource.model._meta.pk.name
+        if not set([pk_name, 'pk']) & set(field.lstrip('-')
+                                          for field in ordering):
+            ordering.append(pk_name)
+        return queryset.order_by(*ordering)
 
     def get_content_data(self, **kwargs):
-        """Handles getting the content for the current query.
+        """Handles getting the content for the current query, from the cache
+        if QUERY_CACHE_TIMEOUT is set.
 
         :param **kwargs: Not used in this request.
         :returns: A tuple of the content dictionary and the status code.
 
+        """
+        timeout = get_setting('QUERY_CACHE_TIMEOUT')
+        if timeout is None:
+            return self.query_content_data()
+
+        # Expanded objects are cached as well, so writes to their models
+        # have to invalidate the result too.
+        models = [self.resource.model]
+        models += [resource.model for name, resource in self.get_expansions(
+            self.system_params.get('expand', []))]
+        key = make_key('query', self.resource, models, self.filter_params,
+                       self.exclude_params, self.system_params)
+
+        cache = get_cache()
+        with self.timings.phase('cache'):
+            result = cache.get(key)
+        record_lookup(self.resource, result is not None)
+        if result is None:
+            result = self.query_content_data()
+            cache.set(key, result, timeout)
+        return result
+
+    def query_content_data(self):
+        """Runs the current query and serialises the results.
+
+        :returns: A tuple of the content dictionary and the status code.
+
         """
         content = {}
-        objects = []
 
-        # TODO: Make this faster?
-        for obj in self.construct_queryset():
-            if self.render_values_list:
-                obj_dict = self.resource.tuple_to_json(obj,
-                                                       self.render_values_list)
-            else:
-                obj_dict = self.resource.obj_to_json(obj)
-            objects.append(obj_dict)
+        with self.timings.phase('queryset'):
+            queryset = self.construct_queryset()
+        if self.layout:
+            return self.query_table_content_data(queryset)
+
+        serialise = self.get_row_serialiser()
+        if self.timings.enabled:
+            # Fetch the rows first so fetching and converting can be timed
+            # apart.
+            with self.timings.phase('fetch'):
+                rows = list(self.iter_rows(queryset))
+        else:
+            rows = self.iter_rows(queryset)
+        with self.timings.phase('convert'):
+            objects = [serialise(row) for row in rows]
+        self.rows_serialised += len(objects)
 
         content['objects'] = objects
+        content['next'], content['prev'] = self.get_page_links()
         return (content, 200)
 
-    def _process_param(self, param, value):
-        """Checks if a field exists and then hands it to the field's parameter
-        process method.
+    def query_table_content_data(self, queryset):
+        """Runs the current query and converts the results column by column,
+        for the rows and columns layouts.
 
-        :param param: The query parameter.
-        :param value: The query value.
-        :returns: A typle of the processed parameter and a processed value.
+        :param queryset: The constructed queryset.
+        :returns: A tuple of the content dictionary and the status code.
 
         """
-        field_name = param.split('__')[0]
-        if not self._check_valid_field(field_name):
-            raise RESTError(400, {
-                'Error': 'Field {} is not queryable'.format(field_name)})
-        return self.resource.fields_dict[field_name].process_param(param,
-                                                                   value)
+        keys = list(self.render_values_list or self.selected_fields or
+                    self.resource.columns)
+        with self.timings.phase('fetch'):
+            rows = list(self.iter_rows(queryset))
+        with self.timings.phase('convert'):
+            columns = convert_columns([self.resource.fields_dict[x]
+                                       for x in keys], rows)
+        self.rows_serialised += len(rows)
+
+        content = {'columns': keys}
+        if self.layout == 'rows':
+            content['rows'] = [list(x) for x in zip(*columns)]
+        else:
+            content['data'] = columns
+        content['next'], content['prev'] = self.get_page_links()
+        return (content, 200)
 
-    def _check_valid_field(self, field):
-        """Checks if a field exists.
+    def iter_rows(self, queryset):
+        """Iterates over the rows of the current page, keeping track of the
+        first and last row and whether there are more rows past the page.
 
-        :param field: The field.
+        :param queryset: The constructed queryset.
+        :returns: A generator of values_list tuples.
+
+        """
+        self.has_more = False
+        self.first_row = self.last_row = None
+
+        with self.statement_timeout():
+            if self.keyset == 'before':
+                # This page was fetched in reverse, turn it back around.
+                rows = list(queryset)
+                if self.limit is not None and len(rows) > self.limit:
+                    self.has_more = True
+                    rows = rows[:self.limit]
+                rows.reverse()
+            else:
+                # TODO: Pass a chunk_size once we require a Django that has
+                # it, until then iterator() fetches GET_ITERATOR_CHUNK_SIZE
+                # rows at a time.
+                rows = queryset.iterator()
+
+            for idx, row in enumerate(rows):
+                if self.limit is not None and idx == self.limit:
+                    self.has_more = True
+                    break
+                if idx == 0:
+                    self.first_row = row
+                self.last_row = row
+                yield row
+
+    def get_row_serialiser(self):
+        """Gets the compiled serialiser for the rows of the current query.
+
+        :returns: A function that converts a row to a serialisable object.
+
+        """
+        if self.render_values_list:
+            return self.resource.get_tuple_serialiser(self.render_values_list)
+        if self.expand:
+            return self.resource.get_expanded_row_serialiser(
+                self.expand, self.selected_fields)
+        if self.selected_fields:
+            return self.resource.get_partial_row_serialiser(
+                self.selected_fields)
+        return self.resource.row_serialiser
+
+    def get_page_links(self):
+        """Builds the links to the next and previous pages, this can only be
+        called after iter_rows went through the page.
+
+        :returns: A tuple of the next and previous links, None if there is no
+                  such page.
+
+        """
+        next_link = prev_link = None
+
+        if self.keyset:
+            started = bool(self.system_params[self.keyset][0])
+            if self.keyset == 'after':
+                more_after, more_before = self.has_more, started
+            else:
+                more_after, more_before = started, self.has_more
+            if self.last_row is not None and more_after:
+                next_link = self.get_page_link(
+                    after=self._row_key(self.last_row))
+            if self.first_row is not None and more_before:
+                prev_link = self.get_page_link(
+                    before=self._row_key(self.first_row))
+        elif self.limit is not None:
+            if self.has_more:
+                next_link = self.get_page_link(offset=self.offset + self.limit)
+            if self.offset:
+                prev_link = self.get_page_link(
+                    offset=max(0, self.offset - self.limit))
+
+        return (next_link, prev_link)
+
+    def get_stream_format(self):
+        """Figures out if the response should be streamed and in what format.
+        Streaming is selected with the stream system parameter, 1 or json for
+        a JSON document and ndjson for newline delimited JSON, or by accepting
+        application/x-ndjson.
+
+        :returns: 'json', 'ndjson' or None if the response isn't streamed.
+
+        """
+        if 'stream' in self.system_params:
+            values = self.system_params['stream']
+            if len(values) > 1:
+                raise RESTError(400, 'Stream takes a single value.')
+            if values[0] in ('1', 'json'):
+                return 'json'
+            if values[0] == 'ndjson':
+                return 'ndjson'
+            if values[0] != '0':
+                raise RESTError(400,
+                                'Stream needs to be 0, 1, json or ndjson.')
+            return None
+
+        if 'application/x-ndjson' in self.request.META.get('HTTP_ACCEPT', ''):
+            return 'ndjson'
+        return None
+
+    def stream_json(self, queryset):
+        """Generates the query response as a JSON document, one chunk of rows
+        at a time. The document is the same as the one of a normal response.
+
+        :param queryset: The constructed queryset.
+        :returns: A generator of strings.
+
+        """
+        yield '{"objects": ['
+        separator = ''
+        for chunk in self._chunk_rows(queryset):
+            yield separator + ', '.join(chunk)
+            separator = ', '
+        next_link, prev_link = self.get_page_links()
+        yield '], "next": {}, "prev": {}}}'.format(json.dumps(next_link),
+                                                   json.dumps(prev_link))
+
+    def stream_ndjson(self, queryset):
+        """Generates the query response as newline delimited JSON, one object
+        per line. There is no room for the page links in this format, clients
+        can page by key with the last object they got.
+
+        :param queryset: The constructed queryset.
+        :returns: A generator of strings.
+
+        """
+        for chunk in self._chunk_rows(queryset):
+            yield '\n'.join(chunk) + '\n'
+
+    def _chunk_rows(self, queryset):
+        """Serialises the rows of the queryset to JSON and groups them in
+        lists of STREAM_CHUNK_SIZE rows.
+
+        :param queryset: The constructed queryset.
+        :returns: A generator of lists of JSON strings.
+
+        """
+        chunk_size = get_setting('STREAM_CHUNK_SIZE')
+        serialise = self.get_row_serialiser()
+        chunk = []
+        for row in self.iter_rows(queryset):
+            chunk.append(serialisers.dumps(serialise(row)))
+            if len(chunk) >= chunk_size:
+                self.rows_serialised += len(chunk)
+                yield chunk
+                chunk = []
+        if chunk:
+            self.rows_serialised += len(chunk)
+            yield chunk
+
+    def get_page_link(self, **params):
+        """Builds a link to the current query with different paging
+        parameters.
+
+        :param **params: The paging system parameters to set.
+        :returns: The link.
+
+        """
+        query = self.request.GET.copy()
+        for name in ('offset', 'after', 'before'):
+            query.pop(SYSTEM_PREFIX + name, None)
+        for name, value in params.items():
+            query[SYSTEM_PREFIX + name] = value
+
+        return '{}?{}'.format(
+            reverse('{}:{}'.format(self.resource.api.name,
+                                   self.resource.query_reverse_name)),
+            query.urlencode())
+
+    def _int_param(self, name, default, minimum):
+        """Gets a system parameter as an integer.
+
+        :param name: The name of the system parameter.
+        :param default: The value to return if the parameter isn't given.
+        :param minimum: The minimum value of the parameter.
+        :returns: The integer value.
+
+        """
+        if name not in self.system_params:
+            return default
+
+        values = self.system_params[name]
+        if len(values) > 1:
+            raise RESTError(400, '{} takes a single value.'.format(
+                name.capitalize()))
+        try:
+            value = int(values[0])
+        except ValueError:
+            raise RESTError(400, '{} needs to be an integer.'.format(
+                name.capitalize()))
+        if value < minimum:
+            raise RESTError(400, '{} needs to be at least {}.'.format(
+                name.capitalize(), minimum))
+        return value
+
+    def _bool_param(self, name):
+        """Gets a system parameter as a boolean, 1 and true are true.
+
+        :param name: The name of the system parameter.
         :returns: Boolean
+
         """
-        exists = False
-        if field in self.resource.fields_dict:
-            exists = True
-        return exists
+        values = self.system_params.get(name, [])
+        if len(values) > 1:
+            raise RESTError(400, '{} takes a single value.'.format(
+                name.capitalize()))
+        return bool(values) and values[0].lower() in ('1', 'true')
+
+    def _parse_key(self, value):
+        """Parses a keyset pagination key, either a single value or a JSON
+        list of values.
+
+        :param value: The key as given in the query.
+        :returns: A list of values.
+
+        """
+        try:
+            key = json.loads(value)
+        except ValueError:
+            key = value
+        if not isinstance(key, list):
+            key = [key]
+        return key
+
+    def _row_key(self, row):
+        """Gets the keyset pagination key of a row.
+
+        :param row: A values_list tuple.
+        :returns: The key, formatted like _parse_key expects it.
+
+        """
+        values = [row[self.row_columns.index(field.lstrip('-'))]
+                  for field in self.ordering]
+        key = [_key_value(value) for value in values]
+        if len(key) == 1:
+            return smart_text(key[0])
+        return json.dumps(key)
+
+    def _keyset_q(self, ordering, key, nulls_largest):
+        """Constructs the filter that only matches rows that come after the
+        key in the current ordering. NULL sorts as the largest or the
+        smallest value depending on the database, so NULL values in the key
+        and rows with NULL values are placed accordingly.
+
+        :param ordering: The ordering, including the primary key.
+        :param key: The values of the key.
+        :param nulls_largest: Whether the database sorts NULL after all
+                              other values.
+        :returns: A Q object.
+
+        """
+        clauses = []
+        for idx, field in enumerate(ordering):
+            name = field.lstrip('-')
+            greater = not field.startswith('-')
+            if self.keyset == 'before':
+                greater = not greater
+            # NULL sorts past the key when it's on the side we walk to.
+            nulls_past = greater == nulls_largest
+
+            if key[idx] is None:
+                if nulls_past:
+                    # Nothing sorts past NULL on this field.
+                    continue
+                clause = Q(**{'{}__isnull'.format(name): False})
+            else:
+                clause = Q(**{'{}__{}'.format(name, 'gt' if greater
+                                              else 'lt'): key[idx]})
+                if nulls_past:
+                    clause |= Q(**{'{}__isnull'.format(name): True})
+            for prev_field, prev_value in zip(ordering[:idx], key[:idx]):
+                if prev_value is None:
+                    clause &= Q(**{'{}__isnull'.format(
+                        prev_field.lstrip('-')): True})
+                else:
+                    clause &= Q(**{prev_field.lstrip('-'): prev_value})
+            clauses.append(clause)
+        return reduce(operator.or_, clauses)
+
+    def _reverse_order(self, field):
+        """Reverses the direction of an order_by field.
+
+        :param field: The order_by field.
+        :returns: The field ordered the other way around.
+
+        """
+        return field[1:] if field.startswith('-') else '-' + field
 
 
 class SchemaView(ResourceView):
@@ -345,8 +2078,20 @@ class SchemaView(ResourceView):
     GET requests.
     """
 
+    metrics_name = 'schema'
     http_method_names = ['get', 'head']
 
+    def get(self, request, *args, **kwargs):
+        """Responds with the schema document the resource keeps.
+
+        :param request: The django request object.
+        :param *args: Optional arguments.
+        :param **kwargs: Optional keyword arguments.
+        :returns: The response.
+
+        """
+        return self.render_document(self.resource.get_schema_document())
+
     def get_content_data(self, **kwargs):
         """Handles getting the schema dictionary for the current resource.
 
@@ -354,10 +2099,7 @@ class SchemaView(ResourceView):
         :returns: A tuple of the content dictionary and the status code.
 
         """
-        schema = OrderedDict()
-        for f in self.resource.fields:
-            schema[f.name] = f.schema_info()
-        return (schema, 200)
+        return (self.resource.get_schema(), 200)
 
 
 class ObjectView(ResourceView):
@@ -365,18 +2107,154 @@ class ObjectView(ResourceView):
     Shows the requested object.
     """
 
+    metrics_name = 'pk'
     http_method_names = ['get', 'head']
 
+    def get_validators(self, pk_url_arg, **kwargs):
+        """Builds the validators from the value of the version field of the
+        object, if the resource has a version field. Expanded objects aren't
+        covered by the version field.
+
+        :param pk_url_arg: The primary key of the requested object.
+        :param **kwargs: Not used in this request.
+        :returns: A tuple of the ETag and the last modification time.
+
+        """
+        field = self.resource.version_field
+        if (field is None or SYSTEM_PREFIX + 'expand' in self.request.GET or
+                ',' in pk_url_arg):
+            return (None, None)
+
+        versions = list(self.resource.queryset.filter(
+            pk=pk_url_arg).values_list(field, flat=True)[:1])
+        if not versions:
+            return (None, None)
+        return (self.get_version_etag(versions[0]), timestamp(versions[0]))
+
     def get_content_data(self, pk_url_arg,  **kwargs):
-        """Gets a single object and returns a serialisable dictionary.
+        """Gets a single object and returns a serialisable dictionary, or
+        several objects if the primary key is a comma separated list.
 
         :param pk_url_arg: The primary key of the requested object.
         :param **kwargs: Not used in this request.
         :returns: A tuple with the object dictionary and the status code.
 
         """
-        obj = get_object_or_404(self.resource.queryset, pk=pk_url_arg)
-        return (self.resource.obj_to_json(obj), 200)
+        if ',' in pk_url_arg:
+            return self.get_many_content_data(pk_url_arg.split(','))
+
+        expand = self.get_expansions(
+            self.request.GET.getlist(SYSTEM_PREFIX + 'expand'))
+        fields = self.get_field_selection(
+            self.request.GET.getlist(SYSTEM_PREFIX + 'fields'))
+        self.check_expansions(expand, fields)
+
+        queryset = self.resource.queryset
+        if fields:
+            queryset = queryset.only(*fields)
+        if expand:
+            queryset = queryset.select_related(*[name for name, resource
+                                                 in expand])
+
+        obj = get_object_or_404(queryset, pk=pk_url_arg)
+        if fields:
+            obj_dict = self.resource.get_partial_serialiser(fields)(obj)
+        else:
+            obj_dict = self.resource.obj_to_json(obj)
+        for name, resource in expand:
+            related = getattr(obj, name)
+            if related is not None:
+                obj_dict[name] = resource.obj_to_json(related)
+        self.rows_serialised += 1
+        return (obj_dict, 200)
+
+    def get_many_content_data(self, pks):
+        """Gets the objects of a list of primary keys in a single query, like
+        in_bulk but as values_list rows that go through the row serialisers.
+
+        :param pks: A list of primary keys.
+        :returns: A tuple with a dictionary of the objects keyed by primary
+                  key and a list of the missing primary keys, and the status
+                  code.
+
+        """
+        # int would round floats and take booleans as 0 and 1, which fetches
+        # other objects than the ones asked for.
+        if not all((isinstance(x, six.integer_types) and
+                    not isinstance(x, bool)) or
+                   (isinstance(x, six.string_types) and x.isdigit())
+                   for x in pks):
+            raise RESTError(400, 'Primary keys must be integers.')
+        try:
+            pks = [int(x) for x in pks]
+        except ValueError:
+            raise RESTError(400, 'Primary keys must be integers.')
+        # Keep the order of the request, without duplicates.
+        pks = list(OrderedDict.fromkeys(pks))
+        max_pks = get_setting('MAX_PKS')
+        if max_pks is not None and len(pks) > max_pks:
+            raise RESTError(400, 'No more than {} objects can be fetched at '
+                                 'once.'.format(max_pks))
+
+        expand = self.get_expansions(
+            self.request.GET.getlist(SYSTEM_PREFIX + 'expand'))
+        fields = self.get_field_selection(
+            self.request.GET.getlist(SYSTEM_PREFIX + 'fields'))
+        self.check_expansions(expand, fields)
+
+        if expand:
+            columns = self.resource.get_expanded_columns(expand, fields)
+            serialise = self.resource.get_expanded_row_serialiser(expand,
+                                                                  fields)
+        elif fields:
+            columns = list(fields)
+            serialise = self.resource.get_partial_row_serialiser(fields)
+        else:
+            columns = list(self.resource.columns)
+            serialise = self.resource.row_serialiser
+        # The primary key goes last, the serialisers ignore extra values.
+        columns.append(self.resource.model._meta.pk.name)
+
+        found = {}
+        for row in self.resource.queryset.filter(
+                pk__in=pks).values_list(*columns):
+            found[row[-1]] = serialise(row)
+
+        objects = OrderedDict((str(x), found[x]) for x in pks if x in found)
+        missing = [x for x in pks if x not in found]
+        self.rows_serialised += len(found)
+        return ({'objects': objects, 'missing': missing}, 200)
+
+
+class MultiObjectView(ObjectView):
+    """
+    Shows the objects of a list of primary keys sent as a JSON array, for
+    lists too long for the URL.
+    """
+
+    metrics_name = 'many'
+    http_method_names = ['post']
+
+    def post(self, request, *args, **kwargs):
+        """Gets the objects of the primary keys in the JSON body.
+
+        :param request: The django request object.
+        :param *args: Optional arguments.
+        :param **kwargs: Optional keyword arguments.
+        :returns: The response.
+
+        """
+        if not self.request.META.get(
+            'CONTENT_TYPE', ''
+        ).startswith('application/json'):
+            raise RESTError(400, {'Status': 'Wrong Content-Type.'})
+        pks = self.get_json_body()
+        if not isinstance(pks, list):
+            raise RESTError(400, 'The body must be a JSON array of primary '
+                                 'keys.')
+        content, status_code = self.get_many_content_data(pks)
+        return self.render_serialised_response(content,
+                                               status_code=status_code)
 
 
 class NewObjectView(ResourceView):
@@ -384,11 +2262,13 @@ class NewObjectView(ResourceView):
     Creates a new object via a modelform.
     """
 
+    metrics_name = 'new'
     http_method_names = ['post']
 
     def post(self, request, *args, **kwargs):
         """Creates an object, using the json in the request body as data of the
-        modelform in the API object
+        modelform in the API object. A JSON array or NDJSON creates an object
+        for every item.
 
         :param request: The django request object.
         :param *args: Optional arguments.
@@ -397,31 +2277,123 @@ class NewObjectView(ResourceView):
 
         """
 
-        if self.request.META.get(
-            'CONTENT_TYPE', ''
-        ).startswith('application/json'):
-            data = json.loads(smart_text(request.body))
-            # Load missing defaults if needed.
-            for key, value in self.resource.field_defaults.items():
-                if key not in data.keys():
-                    data[key] = value
-            form = self.resource.form(data=data)
-            if form.is_valid():
-                obj = form.save()
-                response = {'Status': 'success',
-                            'Location': reverse('{}:{}'.format(
-                                self.resource.api.name,
-                                self.resource.pk_reverse_name
-                            ), args=[obj.pk]),
-                            'pk': obj.pk}
-                status_code = 201
+        content_type = self.request.META.get('CONTENT_TYPE', '')
+        if content_type.startswith('application/json'):
+            data = self.get_json_body()
+            if isinstance(data, list):
+                response, status_code = self.create_objects(data)
+            elif isinstance(data, dict):
+                response, status_code = self.create_object(data)
             else:
-                response = {'Status': 'failed',
-                            'errors': form.errors}
-                raise RESTError(400, response)
+                raise RESTError(400, 'The body must be a JSON object or '
+                                     'array.')
+        elif content_type.startswith('application/x-ndjson'):
+            response, status_code = self.create_objects(
+                self.parse_ndjson(smart_text(self.get_request_body())))
         else:
             response = {'Status': 'Wrong Content-Type.'}
             raise RESTError(400, response)
 
         return self.render_serialised_response(response,
                                                status_code=status_code)
+
+    def get_form(self, data):
+        """Gets the modelform of the resource for the data of an object,
+        with the defaults filled in for missing fields.
+
+        :param data: A dictionary of field values.
+        :returns: A bound ModelForm.
+
+        """
+        # Load missing defaults if needed.
+        for key, value in self.resource.field_defaults.items():
+            if key not in data:
+                data[key] = value
+        return self.resource.form(data=data)
+
+    def create_object(self, data):
+        """Creates a single object.
+
+        :param data: A dictionary of field values.
+        :returns: A tuple with a serialisable response and the status code.
+
+        """
+        form = self.get_form(data)
+        if not form.is_valid():
+            raise RESTError(400, {'Status': 'failed',
+                                  'errors': form.errors})
+        obj = form.save()
+        invalidate_model(self.resource.model)
+        return ({'Status': 'success',
+                 'Location': reverse('{}:{}'.format(
+                     self.resource.api.name,
+                     self.resource.pk_reverse_name
+                 ), args=[obj.pk]),
+                 'pk': obj.pk}, 201)
+
+    def create_objects(self, items):
+        """Creates a list of objects, every one is validated by the modelform
+        and the valid ones are inserted with bulk_create in batches of
+        BULK_BATCH_SIZE, all in one transaction. bulk_create doesn't give
+        back primary keys on every database, so only the number of created
+        objects is returned, with the errors keyed by index.
+
+        :param items: An iterable of dictionaries of field values, items
+                      that failed to parse are given as None.
+        :returns: A tuple with a serialisable response and the status code.
+
+        """
+        if self.resource.model._meta.parents:
+            raise RESTError(400, {'Status': 'Bulk creation is not supported '
+                                            'for inherited models.'})
+
+        objs = []
+        errors = {}
+        for idx, data in enumerate(items):
+            if not isinstance(data, dict):
+                errors[idx] = {'__all__': ['Not a JSON object.']}
+                continue
+            form = self.get_form(data)
+            if form.is_valid():
+                objs.append(form.save(commit=False))
+            else:
+                errors[idx] = form.errors
+
+        if not objs and not errors:
+            raise RESTError(400, 'There are no objects to create.')
+        if not objs:
+            raise RESTError(400, {'Status': 'failed', 'errors': errors})
+
+        # The forms validate every object on its own, objects that clash
+        # with each other, like on a unique field, only fail on insert.
+        try:
+            with transaction.atomic():
+                self.resource.model.objects.bulk_create(
+                    objs, batch_size=get_setting('BULK_BATCH_SIZE'))
+        except IntegrityError as e:
+            raise RESTError(400, {'Status': 'failed',
+                                  'errors': {'__all__': [smart_text(e)]}})
+        invalidate_model(self.resource.model)
+
+        response = {'Status': 'partial' if errors else 'success',
+                    'created': len(objs)}
+        if errors:
+            response['errors'] = errors
+        return (response, 201)
+
+    def parse_ndjson(self, content):
+        """Parses newline delimited JSON, one object per line. Blank lines
+        are skipped, lines that aren't valid JSON come back as None so they
+        get reported as an error at their index.
+
+        :param content: The text to parse.
+        :returns: A generator of parsed lines.
+
+        """
+        for line in content.splitlines():
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None
@@ -0,0 +1,87 @@
+import argparse
+import json
+import platform
+from importlib import import_module
+
+try:
+    from django.conf import settings
+
+    settings.configure(
+        DEBUG=False,
+        USE_TZ=True,
+        DATABASES={
+            "default": {
+                "ENGINE": "django.db.backends.sqlite3",
+                "NAME": ":memory:",
+            }
+        },
+        ROOT_URLCONF="tests.urls",
+        INSTALLED_APPS=[
+            "django.contrib.auth",
+            "django.contrib.contenttypes",
+            "django.contrib.sites",
+            "tests",
+            "django_snooze",
+            "benchmarks",
+        ],
+        SITE_ID=1,
+    )
+
+    import django
+except ImportError:
+    raise ImportError(
+        "To fix this error, run: pip install -r requirements-test.txt")
+
+BENCHMARKS = [
+    'benchmarks.serialisation',
+    'benchmarks.urls',
+    'benchmarks.startup',
+    'benchmarks.params',
+    'benchmarks.rest',
+]
+
+
+def run_benchmarks(*benchmark_args, **kwargs):
+    if not benchmark_args:
+        benchmark_args = BENCHMARKS
+
+    # Django 1.7 and up need the app registry to be populated.
+    if hasattr(django, 'setup'):
+        django.setup()
+
+    import benchmarks
+    if kwargs.get('sizes'):
+        benchmarks.SIZES = kwargs['sizes']
+
+    for name in benchmark_args:
+        print(name)
+        start = len(benchmarks.RESULTS)
+        import_module(name).run()
+        for result in benchmarks.RESULTS[start:]:
+            result['benchmark'] = name
+
+    if kwargs.get('json'):
+        with open(kwargs['json'], 'w') as output:
+            json.dump({
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'memory': benchmarks.get_memory_source(),
+                'sizes': benchmarks.SIZES,
+                'results': benchmarks.RESULTS,
+            }, output, indent=2, sort_keys=True)
+
+
+def parse_sizes(value):
+    return [int(x) for x in value.split(',')]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('benchmarks', nargs='*',
+                        help='The benchmark modules to run, all by default.')
+    parser.add_argument('--json', help='Write the results to this file.')
+    parser.add_argument('--sizes', type=parse_sizes,
+                        help='Comma separated numbers of rows to seed, like '
+                             '1000,10000,100000,1000000.')
+    args = parser.parse_args()
+    run_benchmarks(*args.benchmarks, json=args.json, sizes=args.sizes)
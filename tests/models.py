@@ -13,6 +13,19 @@ class Simple(models.Model):
         return '{}/{}'.format(self.one, self.two)
 
 
+class Related(models.Model):
+    """
+    Test model with relations.
+    """
+
+    simple = models.ForeignKey(Simple)
+    other = models.ForeignKey(Simple, null=True, related_name='others')
+    name = models.CharField(max_length=20)
+
+    def __unicode__(self):
+        return self.name
+
+
 class Abstract(models.Model):
     """
     Abstract test model.
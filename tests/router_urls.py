@@ -0,0 +1,11 @@
+from django.conf.urls import patterns, include, url
+
+from django_snooze.apis import API
+
+api = API(router=True)
+api.discover_models()
+
+urlpatterns = patterns(
+    '',
+    url(r'^api/', include(api.urls)),
+)
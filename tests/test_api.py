@@ -1,5 +1,18 @@
+from django.db import models
+from django.db.models.signals import post_delete, post_save
 from django.test import TestCase
+from django.test.utils import override_settings
 from django_snooze import apis
+from tests.models import Simple
+
+
+class Unregistered(models.Model):
+    """
+    Model of an app that isn't installed, so no API registers it.
+    """
+
+    class Meta:
+        app_label = 'unregistered'
 
 
 class APITestCase(TestCase):
@@ -22,3 +35,39 @@ class APITestCase(TestCase):
         self.assertIn('auth', self.api._resources.keys())
         tests_models = [x.model_name for x in self.api._resources['tests']]
         self.assertNotIn('abstract', tests_models)
+
+    def test_index_document(self):
+        document = self.api.get_index_document()
+        self.assertIs(document, self.api.get_index_document())
+        self.api.rebuild_documents()
+        self.assertIsNot(document, self.api.get_index_document())
+        self.assertEqual(document, self.api.get_index_document())
+
+    def test_invalidation_receivers(self):
+        self.assertTrue(post_save.has_listeners(Simple))
+        self.assertTrue(post_delete.has_listeners(Simple))
+        # Receivers stop Django from deleting without fetching the objects.
+        self.assertFalse(post_save.has_listeners(Unregistered))
+        self.assertFalse(post_delete.has_listeners(Unregistered))
+
+    @override_settings(SNOOZE_INCLUDE=['tests', 'auth.User'],
+                       SNOOZE_EXCLUDE=['tests.Related'])
+    def test_include_exclude(self):
+        api = apis.API()
+        api.discover_models()
+        self.assertEqual(set(['tests', 'auth']), set(api._resources.keys()))
+        self.assertEqual(['user'],
+                         [x.model_name for x in api._resources['auth']])
+        tests_models = [x.model_name for x in api._resources['tests']]
+        self.assertIn('simple', tests_models)
+        self.assertNotIn('related', tests_models)
+
+    @override_settings(SNOOZE_LAZY_RESOURCES=True)
+    def test_lazy(self):
+        api = apis.API()
+        api.discover_models()
+        self.assertTrue(api.urls)
+        for resources in api._resources.values():
+            for resource in resources:
+                self.assertTrue(resource.lazy)
+                self.assertNotIn('form', resource.__dict__)
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+import threading
+
+from django.core import management
+from django.db import connections, transaction
+from django.test import TestCase, TransactionTestCase
+from django.test.client import Client
+from django.test.utils import override_settings
+from django.utils.encoding import smart_text
+
+from django_snooze.views import BatchView
+from tests.models import Simple
+
+
+class BatchTestCase(TestCase):
+
+    def setUp(self):
+        management.call_command('loaddata',
+                                'django_snooze/fixtures/test_data.json',
+                                verbosity=0)
+        self.client = Client()
+
+    def tearDown(self):
+        management.call_command('flush', interactive=False, verbosity=0)
+
+    def batch(self, requests):
+        r = self.client.post('/api/batch/', data=json.dumps(requests),
+                             content_type='application/json')
+        self.assertEqual(200, r.status_code)
+        return json.loads(smart_text(r.content))
+
+    def test_batch(self):
+        results = self.batch([
+            {'method': 'GET', 'path': 'tests/simple/1/'},
+            {'path': '/api/tests/simple/?one=333&__fields=id'},
+            {'method': 'POST', 'path': 'tests/simple/new/',
+             'body': {'one': 42}},
+            {'path': 'tests/simple/1/?__stream=ndjson'},
+        ])
+        self.assertEqual([200, 200, 201, 200],
+                         [x['status'] for x in results])
+        self.assertEqual(111, results[0]['body']['one'])
+        self.assertIn('ETag', results[0]['headers'])
+        self.assertEqual([3, 6], [x['id']
+                                  for x in results[1]['body']['objects']])
+        self.assertTrue(Simple.objects.filter(
+            pk=results[2]['body']['pk'], one=42).exists())
+
+    def test_batch_errors(self):
+        results = self.batch([
+            {'path': 'tests/simple/999/'},
+            {'path': 'tests/nonexistent/'},
+            {'path': 'tests/simple/?__limit=spam'},
+            {'method': 'POST', 'path': 'batch/', 'body': []},
+        ])
+        self.assertEqual([404, 404, 400, 400],
+                         [x['status'] for x in results])
+
+    def test_batch_invalid(self):
+        r = self.client.post('/api/batch/', data=json.dumps({'path': ''}),
+                             content_type='application/json')
+        self.assertEqual(400, r.status_code)
+        r = self.client.post('/api/batch/', data=json.dumps([{}]),
+                             content_type='application/json')
+        self.assertEqual(400, r.status_code)
+        r = self.client.post('/api/batch/', data='[{spam',
+                             content_type='application/json')
+        self.assertEqual(400, r.status_code)
+        for item in ({'path': 5}, {'path': '', 'method': 5},
+                     {'path': '', 'content_type': []},
+                     {'path': '', 'body': 5}):
+            r = self.client.post('/api/batch/', data=json.dumps([item]),
+                                 content_type='application/json')
+            self.assertEqual(400, r.status_code)
+            self.assertEqual(1, len(json.loads(smart_text(r.content))[
+                'Errors']))
+        with override_settings(SNOOZE_BATCH_MAX_REQUESTS=1):
+            r = self.client.post('/api/batch/',
+                                 data=json.dumps([{'path': ''}] * 2),
+                                 content_type='application/json')
+        self.assertEqual(400, r.status_code)
+
+    @override_settings(SNOOZE_BATCH_THREADS=2)
+    def test_batch_concurrent(self):
+        results = self.batch([{'path': ''},
+                              {'path': 'tests/simple/schema/'},
+                              {'path': 'tests/related/schema/'}])
+        self.assertEqual([200] * 3, [x['status'] for x in results])
+        self.assertIn('tests', results[0]['body'])
+        self.assertIn('two', results[1]['body'])
+        self.assertIn('simple', results[2]['body'])
+
+
+@override_settings(SNOOZE_BATCH_THREADS=2)
+class ConcurrentBatchTestCase(TransactionTestCase):
+
+    def setUp(self):
+        management.call_command('loaddata',
+                                'django_snooze/fixtures/test_data.json',
+                                verbosity=0)
+        self.client = Client()
+        self.threads = []
+        shared = connections['default']
+        run_concurrent_requests = BatchView.__dict__['run_concurrent_requests']
+
+        def run_shared(view, sub_requests):
+            # The test database is in memory, the threads of the pool have
+            # to share the connection of the test to see it.
+            self.threads.append(threading.current_thread())
+            connections['default'] = shared
+            return run_concurrent_requests(view, sub_requests)
+
+        shared.allow_thread_sharing = True
+        self.addCleanup(setattr, shared, 'allow_thread_sharing', False)
+        BatchView.run_concurrent_requests = run_shared
+        self.addCleanup(setattr, BatchView, 'run_concurrent_requests',
+                        run_concurrent_requests)
+
+    def batch(self, requests):
+        r = self.client.post('/api/batch/', data=json.dumps(requests),
+                             content_type='application/json')
+        self.assertEqual(200, r.status_code)
+        return json.loads(smart_text(r.content))
+
+    def test_concurrent_reads(self):
+        results = self.batch([{'path': 'tests/simple/1/'},
+                              {'path': 'tests/simple/?one=333'},
+                              {'path': 'tests/simple/2/'},
+                              {'path': 'tests/related/1/'}])
+        self.assertEqual([200] * 4, [x['status'] for x in results])
+        self.assertEqual([1, 2], [results[0]['body']['id'],
+                                  results[2]['body']['id']])
+        self.assertEqual(2, len(results[1]['body']['objects']))
+        self.assertEqual('First', results[3]['body']['name'])
+        self.assertEqual(2, len(self.threads))
+        self.assertNotIn(threading.current_thread(), self.threads)
+
+    def test_reads_after_write(self):
+        results = self.batch([
+            {'path': 'tests/simple/?one=42'},
+            {'path': 'tests/simple/1/'},
+            {'method': 'POST', 'path': 'tests/simple/new/',
+             'body': {'one': 42}},
+            {'path': 'tests/simple/?one=42'},
+            {'path': 'tests/simple/?one=42'},
+        ])
+        self.assertEqual([200, 200, 201, 200, 200],
+                         [x['status'] for x in results])
+        self.assertEqual(0, len(results[0]['body']['objects']))
+        self.assertEqual(1, len(results[3]['body']['objects']))
+        self.assertEqual(1, len(results[4]['body']['objects']))
+        # Only the reads before the write ran in the pool.
+        self.assertEqual(2, len(self.threads))
+
+    def test_transaction(self):
+        with transaction.atomic():
+            results = self.batch([{'path': 'tests/simple/1/'},
+                                  {'path': 'tests/simple/2/'}])
+        self.assertEqual([200, 200], [x['status'] for x in results])
+        self.assertEqual([], self.threads)
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+from django.test import TestCase
+from django.test.client import Client
+from django.test.utils import override_settings
+from django.core import management
+from django.utils.encoding import smart_text
+
+from django_snooze import cache
+from tests.models import Simple
+
+
+@override_settings(SNOOZE_QUERY_CACHE_TIMEOUT=60)
+class QueryCacheTestCase(TestCase):
+
+    def setUp(self):
+        management.call_command('loaddata',
+                                'django_snooze/fixtures/test_data.json',
+                                verbosity=0)
+        cache.get_cache().clear()
+        self.client = Client()
+
+    def tearDown(self):
+        management.call_command('flush', interactive=False, verbosity=0)
+
+    def get_objects(self, url):
+        r = self.client.get(url)
+        self.assertEqual(200, r.status_code)
+        return json.loads(smart_text(r.content))['objects']
+
+    def test_cached(self):
+        objects = self.get_objects('/api/tests/simple/?one=333&__order_by=id')
+        with self.assertNumQueries(0):
+            cached = self.get_objects(
+                '/api/tests/simple/?__order_by=id&one=333')
+        self.assertEqual(objects, cached)
+
+    def test_save_invalidates(self):
+        self.get_objects('/api/tests/simple/?one=333')
+        Simple.objects.create(one=333, two='New')
+        objects = self.get_objects('/api/tests/simple/?one=333')
+        self.assertEqual(3, len(objects))
+
+    def test_delete_invalidates(self):
+        self.get_objects('/api/tests/simple/?one=333')
+        Simple.objects.get(pk=3).delete()
+        objects = self.get_objects('/api/tests/simple/?one=333')
+        self.assertEqual(1, len(objects))
+
+    def test_create_invalidates(self):
+        self.get_objects('/api/tests/simple/?one=42')
+        self.client.post('/api/tests/simple/new/',
+                         data=json.dumps({'one': 42}),
+                         content_type='application/json')
+        self.assertEqual(1, len(self.get_objects('/api/tests/simple/?one=42')))
+
+    def test_expanded_invalidates(self):
+        url = '/api/tests/related/?__order_by=id&__expand=simple'
+        self.get_objects(url)
+        Simple.objects.filter(pk=1).update(two='Changed')
+        Simple.objects.get(pk=1).save()
+        self.assertEqual('Changed', self.get_objects(url)[0]['simple']['two'])
+
+    def test_stats(self):
+        before = cache.get_stats().get('tests.simple',
+                                       {'hits': 0, 'misses': 0})
+        self.get_objects('/api/tests/simple/?one=1')
+        self.get_objects('/api/tests/simple/?one=1')
+        after = cache.get_stats()['tests.simple']
+        self.assertEqual(before['hits'] + 1, after['hits'])
+        self.assertEqual(before['misses'] + 1, after['misses'])
+
+
+class LRUCacheTestCase(TestCase):
+
+    def test_lru(self):
+        lru = cache.LRUCache(2)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        self.assertEqual(1, lru.get('a'))
+        lru.set('c', 3)
+        self.assertEqual(2, len(lru))
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual(1, lru.get('a'))
+        self.assertEqual(3, lru.get('c'))
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+import gzip
+import io
+import json
+import zlib
+
+import mock
+from django.core import management
+from django.test import TestCase
+from django.test.client import Client
+from django.test.utils import override_settings
+from django.utils.encoding import smart_bytes, smart_text
+
+from django_snooze import apis, compression
+from tests.models import Simple
+
+
+def gunzip(data):
+    return gzip.GzipFile(fileobj=io.BytesIO(data)).read()
+
+
+class CompressionTestCase(TestCase):
+
+    def test_negotiate(self):
+        self.assertEqual('gzip', compression.negotiate('gzip, deflate'))
+        self.assertEqual('deflate',
+                         compression.negotiate('gzip;q=0.5, deflate'))
+        self.assertEqual('gzip', compression.negotiate('*'))
+        self.assertIsNone(compression.negotiate('identity'))
+        self.assertIsNone(compression.negotiate('gzip;q=0, deflate;q=0'))
+
+    def test_compress_stream(self):
+        chunks = [smart_bytes('chunk {}\n'.format(x)) for x in range(100)]
+        compressed = list(compression.compress_stream(chunks, 'gzip', 6))
+        self.assertTrue(len(compressed) > 1)
+        self.assertEqual(b''.join(chunks), gunzip(b''.join(compressed)))
+
+    def test_decompress(self):
+        data = b'spam' * 1000
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        compressed = compressor.compress(data) + compressor.flush()
+        self.assertEqual(data, compression.decompress(compressed, 'gzip',
+                                                      None))
+        self.assertRaises(ValueError, compression.decompress, compressed,
+                          'gzip', 100)
+        self.assertRaises(ValueError, compression.decompress, b'spam',
+                          'deflate', None)
+
+
+class CompressedResponseTestCase(TestCase):
+
+    def setUp(self):
+        management.call_command('loaddata',
+                                'django_snooze/fixtures/test_data.json',
+                                verbosity=0)
+        self.client = Client()
+
+    def tearDown(self):
+        management.call_command('flush', interactive=False, verbosity=0)
+
+    @override_settings(SNOOZE_COMPRESSION_MIN_SIZE=100)
+    def test_compressed(self):
+        r = self.client.get('/api/tests/simple/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual('gzip', r['Content-Encoding'])
+        self.assertIn('Accept-Encoding', r['Vary'])
+        content = json.loads(smart_text(gunzip(r.content)))
+        self.assertEqual(6, len(content['objects']))
+
+    @override_settings(SNOOZE_COMPRESSION_MIN_SIZE=100)
+    def test_etag(self):
+        r = self.client.get('/api/tests/simple/')
+        etag = r['ETag']
+        r = self.client.get('/api/tests/simple/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual('{};gzip"'.format(etag[:-1]), r['ETag'])
+
+        r = self.client.get('/api/tests/simple/', HTTP_ACCEPT_ENCODING='gzip',
+                            HTTP_IF_NONE_MATCH=r['ETag'])
+        self.assertEqual(304, r.status_code)
+        self.assertEqual('{};gzip"'.format(etag[:-1]), r['ETag'])
+        r = self.client.get('/api/tests/simple/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(304, r.status_code)
+        self.assertEqual(etag, r['ETag'])
+
+    @override_settings(SNOOZE_COMPRESSION_MIN_SIZE=100)
+    def test_document(self):
+        resource = apis.api.get_resource(Simple)
+        resource.rebuild_schema_document()
+        with mock.patch.object(compression, 'compress',
+                               wraps=compression.compress) as compress:
+            for encoding in ('gzip', 'gzip', 'deflate', 'deflate'):
+                r = self.client.get('/api/tests/simple/schema/',
+                                    HTTP_ACCEPT_ENCODING=encoding)
+                self.assertEqual(encoding, r['Content-Encoding'])
+        # Every variant is compressed once and kept with the document.
+        self.assertEqual(2, compress.call_count)
+        self.assertEqual(resource.get_schema(),
+                         json.loads(smart_text(zlib.decompress(r.content))))
+
+    def test_min_size(self):
+        r = self.client.get('/api/tests/simple/1/',
+                            HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(r.has_header('Content-Encoding'))
+        with override_settings(SNOOZE_COMPRESSION_MIN_SIZE=0):
+            r = self.client.get('/api/tests/simple/?one=111',
+                                HTTP_ACCEPT_ENCODING='deflate')
+        self.assertEqual('deflate', r['Content-Encoding'])
+        self.assertIn(b'Some string', zlib.decompress(r.content))
+
+    @override_settings(SNOOZE_COMPRESSION=False)
+    def test_disabled(self):
+        r = self.client.get('/api/tests/simple/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(r.has_header('Content-Encoding'))
+
+    def test_streamed(self):
+        r = self.client.get('/api/tests/simple/?__stream=ndjson',
+                            HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual('gzip', r['Content-Encoding'])
+        lines = smart_text(gunzip(b''.join(r.streaming_content))).splitlines()
+        self.assertEqual(6, len(lines))
+
+    def test_compressed_request(self):
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        body = compressor.compress(smart_bytes(json.dumps(
+            [{'one': 1000}, {'one': 1001}]))) + compressor.flush()
+        r = self.client.post('/api/tests/simple/new/', data=body,
+                             content_type='application/json',
+                             HTTP_CONTENT_ENCODING='gzip')
+        self.assertEqual(201, r.status_code)
+        self.assertEqual(2, Simple.objects.filter(one__gte=1000).count())
+
+        r = self.client.post('/api/tests/simple/new/', data=b'spam',
+                             content_type='application/json',
+                             HTTP_CONTENT_ENCODING='gzip')
+        self.assertEqual(400, r.status_code)
+        r = self.client.post('/api/tests/simple/new/', data=b'spam',
+                             content_type='application/json',
+                             HTTP_CONTENT_ENCODING='compress')
+        self.assertEqual(415, r.status_code)
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+from django.test import TestCase
+from django.test.client import Client
+from django.core import management
+from django.utils.http import http_date
+
+from django_snooze import apis
+from tests.models import Simple
+
+
+class ConditionalTestCase(TestCase):
+
+    def setUp(self):
+        management.call_command('loaddata',
+                                'django_snooze/fixtures/test_data.json',
+                                verbosity=0)
+        self.client = Client()
+
+    def tearDown(self):
+        management.call_command('flush', interactive=False, verbosity=0)
+
+    def assertNotModified(self, url, etag):
+        r = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(304, r.status_code)
+        self.assertEqual(b'', r.content)
+        self.assertEqual(etag, r['ETag'])
+
+    def test_fetch_etag(self):
+        r = self.client.get('/api/tests/simple/1/')
+        self.assertEqual(200, r.status_code)
+        self.assertNotModified('/api/tests/simple/1/', r['ETag'])
+
+        Simple.objects.filter(pk=1).update(two='Changed')
+        r = self.client.get('/api/tests/simple/1/',
+                            HTTP_IF_NONE_MATCH=r['ETag'])
+        self.assertEqual(200, r.status_code)
+
+    def test_query_etag(self):
+        r = self.client.get('/api/tests/simple/?one=333')
+        self.assertNotModified('/api/tests/simple/?one=333', r['ETag'])
+        r2 = self.client.get('/api/tests/simple/?one=222')
+        self.assertNotEqual(r['ETag'], r2['ETag'])
+
+    def test_wildcard(self):
+        r = self.client.get('/api/tests/simple/1/', HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(304, r.status_code)
+
+    def test_schema_etag(self):
+        r = self.client.get('/api/tests/simple/schema/')
+        with self.assertNumQueries(0):
+            self.assertNotModified('/api/tests/simple/schema/', r['ETag'])
+
+    def test_index_etag(self):
+        r = self.client.get('/api/')
+        self.assertNotModified('/api/', r['ETag'])
+
+    def test_version_field(self):
+        resource = apis.api.get_resource(Simple)
+        resource.version_field = 'one'
+        try:
+            # Unconditional requests don't look up the version, their ETag
+            # is the hash of the content.
+            with self.assertNumQueries(1):
+                r = self.client.get('/api/tests/simple/?one=1')
+            self.assertEqual(200, r.status_code)
+
+            r = self.client.get('/api/tests/simple/1/',
+                                HTTP_IF_NONE_MATCH='"spam"')
+            etag = r['ETag']
+            with self.assertNumQueries(1):
+                self.assertNotModified('/api/tests/simple/1/', etag)
+            r = self.client.get('/api/tests/simple/?one=1',
+                                HTTP_IF_NONE_MATCH='"spam"')
+            with self.assertNumQueries(1):
+                self.assertNotModified('/api/tests/simple/?one=1', r['ETag'])
+            r = self.client.get('/api/tests/simple/?one=1&__limit=spam',
+                                HTTP_IF_NONE_MATCH=r['ETag'])
+            self.assertEqual(400, r.status_code)
+            Simple.objects.filter(pk=1).update(one=112)
+            r = self.client.get('/api/tests/simple/1/',
+                                HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(200, r.status_code)
+        finally:
+            resource.version_field = None
+
+    def test_if_modified_since(self):
+        resource = apis.api.get_resource(Simple)
+        resource.version_field = 'one'
+        try:
+            # Integer versions don't give a modification time.
+            r = self.client.get('/api/tests/simple/1/',
+                                HTTP_IF_MODIFIED_SINCE=http_date())
+            self.assertEqual(200, r.status_code)
+            self.assertFalse(r.has_header('Last-Modified'))
+        finally:
+            resource.version_field = None
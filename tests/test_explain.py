@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core import management
+from django.core.urlresolvers import resolve
+from django.test import TestCase
+from django.test.client import Client, RequestFactory
+from django.test.utils import override_settings
+from django.utils.encoding import smart_text
+
+from django_snooze.db import explain
+from tests.models import Simple
+
+
+class RecordingHandler(logging.Handler):
+
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class ExplainTestCase(TestCase):
+
+    def setUp(self):
+        management.call_command('loaddata',
+                                'django_snooze/fixtures/test_data.json',
+                                verbosity=0)
+        self.client = Client()
+        self.handler = RecordingHandler()
+        logging.getLogger('django_snooze').addHandler(self.handler)
+
+    def tearDown(self):
+        logging.getLogger('django_snooze').removeHandler(self.handler)
+        management.call_command('flush', interactive=False, verbosity=0)
+
+    def get(self, path, user):
+        request = RequestFactory().get(path)
+        request.user = user
+        match = resolve(request.path_info)
+        return match.func(request, *match.args, **match.kwargs)
+
+    def test_explain(self):
+        plan = explain(Simple.objects.filter(one=1))
+        self.assertTrue(plan)
+        self.assertIn('detail', plan[0])
+        self.assertEqual([], explain(Simple.objects.filter(pk__in=[])))
+
+    def test_explain_param(self):
+        r = self.get('/api/tests/simple/?one=1&__explain=1',
+                     User(is_staff=True))
+        self.assertEqual(200, r.status_code)
+        r_data = json.loads(smart_text(r.content))
+        self.assertIn('"tests_simple"', r_data['sql'])
+        self.assertEqual(['1'], r_data['params'])
+        self.assertTrue(r_data['plan'])
+
+    def test_explain_param_not_staff(self):
+        r = self.get('/api/tests/simple/?__explain=1', User(is_staff=False))
+        self.assertEqual(403, r.status_code)
+        r = self.get('/api/tests/simple/?__explain=1', AnonymousUser())
+        self.assertEqual(403, r.status_code)
+        r = self.client.get('/api/tests/simple/?__explain=1')
+        self.assertEqual(403, r.status_code)
+
+    def test_no_slow_log(self):
+        self.client.get('/api/tests/simple/')
+        self.assertEqual([], self.handler.records)
+
+    @override_settings(SNOOZE_SLOW_REQUEST_THRESHOLD=0)
+    def test_slow_log(self):
+        self.client.get('/api/tests/simple/?two=spam&one__gte=1')
+        self.assertEqual(1, len(self.handler.records))
+        record = self.handler.records[0]
+        self.assertEqual(logging.WARNING, record.levelno)
+        details = record.snooze_details
+        self.assertEqual('tests.simple', details['resource'])
+        self.assertEqual('query', details['view'])
+        self.assertEqual('one__gte=1&two=spam', details['params'])
+        self.assertIn('"tests_simple"', details['sql'])
+        self.assertEqual(['1', 'spam'], sorted(details['sql_params']))
+        self.assertTrue(details['plan'])
+        self.assertIn('plan:', record.getMessage())
+
+    @override_settings(SNOOZE_SLOW_REQUEST_THRESHOLD=0)
+    def test_slow_log_index(self):
+        self.client.get('/api/')
+        details = self.handler.records[0].snooze_details
+        self.assertEqual('', details['resource'])
+        self.assertEqual('index', details['view'])
+        self.assertNotIn('sql', details)
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+from django.core import management
+from django.db import connection
+from django.test import TestCase
+from django.test.client import Client
+from django.test.utils import override_settings
+
+from django_snooze import instrumentation
+
+
+class InstrumentationTestCase(TestCase):
+
+    def setUp(self):
+        management.call_command('loaddata',
+                                'django_snooze/fixtures/test_data.json',
+                                verbosity=0)
+        self.client = Client()
+        self.received = []
+        instrumentation.request_timed.connect(self.receive)
+
+    def tearDown(self):
+        instrumentation.request_timed.disconnect(self.receive)
+        management.call_command('flush', interactive=False, verbosity=0)
+
+    def receive(self, sender, view, request, response, timings, **kwargs):
+        self.received.append((view, response, timings))
+
+    def test_disabled(self):
+        r = self.client.get('/api/tests/simple/')
+        self.assertFalse(r.has_header('Server-Timing'))
+        self.assertEqual([], self.received)
+
+    @override_settings(SNOOZE_INSTRUMENTATION=True)
+    def test_query(self):
+        logged = len(connection.queries)
+        r = self.client.get('/api/tests/simple/?one=1')
+        self.assertEqual(200, r.status_code)
+        names = [x.split(';')[0] for x in r['Server-Timing'].split(', ')]
+        self.assertEqual(['parse', 'queryset', 'fetch', 'convert',
+                          'serialise', 'db', 'total'], names)
+        self.assertIn('desc="1 queries"', r['Server-Timing'])
+
+        self.assertEqual(1, len(self.received))
+        view, response, timings = self.received[0]
+        self.assertIs(r, response)
+        self.assertEqual(1, timings.queries)
+        self.assertFalse(getattr(connection, 'force_debug_cursor',
+                                 getattr(connection, 'use_debug_cursor',
+                                         False)))
+        # The queries are only logged while the request is timed.
+        self.assertEqual(logged, len(connection.queries))
+
+    @override_settings(SNOOZE_INSTRUMENTATION=True)
+    def test_error(self):
+        r = self.client.get('/api/tests/simple/?spam=1')
+        self.assertEqual(400, r.status_code)
+        self.assertIn('total;dur=', r['Server-Timing'])
+        self.assertEqual(400, self.received[0][1].status_code)
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+from django.core import management
+from django.db import connection
+from django.test import TestCase
+from django.test.client import Client
+from django.test.utils import override_settings
+from django.utils.encoding import smart_text
+
+from django_snooze import apis
+from django_snooze.apis import API
+from django_snooze.db import StatementTimeout, statement_timeout
+from django_snooze.resource import ModelResource
+from tests.models import Related, Simple
+
+
+class LimitsTestCase(TestCase):
+
+    def setUp(self):
+        management.call_command('loaddata',
+                                'django_snooze/fixtures/test_data.json',
+                                verbosity=0)
+        self.client = Client()
+
+    def tearDown(self):
+        management.call_command('flush', interactive=False, verbosity=0)
+
+    def get_data(self, path, status_code=200):
+        r = self.client.get(path)
+        self.assertEqual(status_code, r.status_code)
+        return json.loads(smart_text(r.content))
+
+    def test_indexed_fields(self):
+        api = API()
+        self.assertEqual(frozenset(['id']),
+                         ModelResource(Simple, api).indexed_fields)
+        self.assertEqual(frozenset(['id', 'simple', 'other']),
+                         ModelResource(Related, api).indexed_fields)
+
+    @override_settings(SNOOZE_RESOURCE_LIMITS={'tests.simple':
+                                               {'MAX_ROWS': 2}})
+    def test_max_rows(self):
+        r_data = self.get_data('/api/tests/simple/')
+        self.assertEqual(2, len(r_data['objects']))
+        self.assertIn('__offset=2', r_data['next'])
+        r_data = self.get_data('/api/tests/simple/?__limit=5')
+        self.assertEqual(2, len(r_data['objects']))
+        r_data = self.get_data('/api/tests/simple/?__limit=1')
+        self.assertEqual(1, len(r_data['objects']))
+
+        # Other resources aren't limited.
+        r_data = self.get_data('/api/tests/related/')
+        self.assertEqual(Related.objects.count(), len(r_data['objects']))
+
+    @override_settings(SNOOZE_INDEXED_LOOKUPS_ONLY=True)
+    def test_indexed_lookups_only(self):
+        r_data = self.get_data('/api/tests/simple/?two__icontains=a', 400)
+        self.assertIn('two__icontains', r_data['Errors'])
+        r_data = self.get_data('/api/tests/simple/?!two__regex=a', 400)
+        self.assertIn('two__regex', r_data['Errors'])
+        r_data = self.get_data('/api/tests/simple/?__order_by=-two', 400)
+        self.assertIn('-two', r_data['Errors'])
+
+        self.get_data('/api/tests/simple/?two=spam&id__icontains=1')
+        self.get_data('/api/tests/simple/?__order_by=-id')
+        self.get_data('/api/tests/related/?__order_by=simple')
+
+    @override_settings(SNOOZE_INDEXED_LOOKUPS_ONLY=True)
+    def test_indexed_lookups_only_everywhere(self):
+        path = '/api/tests/simple/?two__icontains=a'
+        self.get_data(path + '&__count=1', 400)
+        self.assertEqual(400, self.client.head(path).status_code)
+        resource = apis.api.get_resource(Simple)
+        resource.version_field = 'one'
+        try:
+            with self.assertNumQueries(0):
+                r = self.client.get(path, HTTP_IF_NONE_MATCH='"spam"')
+            self.assertEqual(400, r.status_code)
+        finally:
+            resource.version_field = None
+        r = self.client.patch(path, json.dumps({'two': 'eggs'}),
+                              content_type='application/json')
+        self.assertEqual(400, r.status_code)
+        self.assertEqual(400, self.client.delete(path).status_code)
+        self.assertFalse(Simple.objects.filter(two='eggs').exists())
+
+    @override_settings(SNOOZE_INDEXED_LOOKUPS_ONLY=True,
+                       SNOOZE_RESOURCE_LIMITS={
+                           'tests.simple': {'INDEXED_LOOKUPS_ONLY': False}})
+    def test_indexed_lookups_only_per_resource(self):
+        self.get_data('/api/tests/simple/?two__icontains=a')
+        self.get_data('/api/tests/related/?name__icontains=a', 400)
+
+    def test_statement_timeout(self):
+        Simple.objects.bulk_create([Simple(one=x) for x in range(500)])
+        with self.assertRaises(StatementTimeout):
+            with statement_timeout(connection.alias, 1e-9):
+                list(Simple.objects.all())
+        # The timeout is gone after the block.
+        self.assertEqual(506, len(list(Simple.objects.all())))
+
+        with override_settings(SNOOZE_STATEMENT_TIMEOUT=1e-9):
+            r_data = self.get_data('/api/tests/simple/', 503)
+            self.assertEqual('The query took too long.', r_data)
+            self.get_data('/api/tests/simple/?one__gte=0&__count=1', 503)
+        # Conditional requests that only build the validators too.
+        resource = apis.api.get_resource(Simple)
+        resource.version_field = 'one'
+        try:
+            path = '/api/tests/simple/?one__gte=0'
+            etag = self.client.get(path, HTTP_IF_NONE_MATCH='"spam"')['ETag']
+            self.assertEqual(304, self.client.get(
+                path, HTTP_IF_NONE_MATCH=etag).status_code)
+            with override_settings(SNOOZE_STATEMENT_TIMEOUT=1e-9):
+                self.assertEqual(503, self.client.get(
+                    path, HTTP_IF_NONE_MATCH=etag).status_code)
+        finally:
+            resource.version_field = None
+        with override_settings(SNOOZE_STATEMENT_TIMEOUT=60):
+            r_data = self.get_data('/api/tests/simple/')
+            self.assertEqual(506, len(r_data['objects']))
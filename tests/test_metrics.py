@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+import threading
+
+from django.core import management
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+from django.test.client import Client
+from django.test.utils import override_settings
+from django.utils.encoding import smart_text
+
+from django_snooze import apis, metrics
+
+
+@override_settings(ROOT_URLCONF='tests.metrics_urls', SNOOZE_METRICS=True)
+class MetricsTestCase(TestCase):
+
+    def setUp(self):
+        management.call_command('loaddata',
+                                'django_snooze/fixtures/test_data.json',
+                                verbosity=0)
+        self.client = Client()
+        metrics.reset()
+
+    def tearDown(self):
+        metrics.reset()
+        management.call_command('flush', interactive=False, verbosity=0)
+
+    def get_samples(self):
+        r = self.client.get(reverse('django_snooze:metrics'))
+        self.assertEqual(200, r.status_code)
+        self.assertTrue(r['Content-Type'].startswith('text/plain'))
+        return [x for x in smart_text(r.content).splitlines()
+                if not x.startswith('#')]
+
+    def test_query(self):
+        r = self.client.get('/api/tests/simple/?__limit=2')
+        self.assertEqual(200, r.status_code)
+        samples = self.get_samples()
+
+        labels = 'app="tests",model="simple",view="query"'
+        self.assertIn('snooze_requests_total{{{},status="200"}} 1'.format(
+            labels), samples)
+        self.assertIn('snooze_rows_serialised_total{{{}}} 2'.format(labels),
+                      samples)
+        self.assertIn('snooze_response_bytes_total{{{}}} {}'.format(
+            labels, len(r.content)), samples)
+        self.assertIn('snooze_request_duration_seconds_bucket{{{},le="+Inf"}} '
+                      '1'.format(labels), samples)
+        self.assertIn('snooze_request_duration_seconds_count{{{}}} 1'.format(
+            labels), samples)
+
+    def test_errors(self):
+        self.client.get('/api/tests/simple/?spam=1')
+        self.client.get('/api/tests/simple/999/')
+        samples = self.get_samples()
+
+        self.assertIn('snooze_errors_total{app="tests",model="simple",'
+                      'view="query",status="400"} 1', samples)
+        self.assertIn('snooze_requests_total{app="tests",model="simple",'
+                      'view="pk",status="404"} 1', samples)
+
+    def test_stream(self):
+        r = self.client.get('/api/tests/simple/?__stream=1&__limit=2')
+        body = b''.join(r.streaming_content)
+        samples = self.get_samples()
+
+        labels = 'app="tests",model="simple",view="query"'
+        self.assertIn('snooze_rows_serialised_total{{{}}} 2'.format(labels),
+                      samples)
+        self.assertIn('snooze_response_bytes_total{{{}}} {}'.format(
+            labels, len(body)), samples)
+
+    def test_histogram(self):
+        metrics.record_request(('a', 'b', 'query'), 200, 0.02)
+        metrics.record_request(('a', 'b', 'query'), 200, 0.3)
+        samples = self.get_samples()
+
+        bucket = 'snooze_request_duration_seconds_bucket{{app="a",model="b",' \
+                 'view="query",le="{}"}} {}'
+        self.assertIn(bucket.format('0.01', 0), samples)
+        self.assertIn(bucket.format('0.025', 1), samples)
+        self.assertIn(bucket.format('0.5', 2), samples)
+        self.assertIn(bucket.format('+Inf', 2), samples)
+
+    def test_finished_threads(self):
+        def record():
+            metrics.record_request(('a', 'b', 'query'), 200, 0.02)
+
+        for i in range(50):
+            thread = threading.Thread(target=record)
+            thread.start()
+            thread.join()
+        samples = self.get_samples()
+
+        self.assertIn('snooze_requests_total{app="a",model="b",view="query",'
+                      'status="200"} 50', samples)
+        # The shards of the finished threads are folded into one total.
+        self.assertLessEqual(len(metrics._shards), 1)
+        self.assertIn('snooze_requests_total{app="a",model="b",view="query",'
+                      'status="200"} 50', self.get_samples())
+
+    def test_disabled(self):
+        # The API of these URLs doesn't serve the metrics, so it doesn't
+        # record them either.
+        self.assertFalse(apis.api.metrics)
+        with override_settings(ROOT_URLCONF='tests.urls'):
+            r = self.client.get('/api/tests/simple/')
+        self.assertEqual(200, r.status_code)
+        self.assertEqual({}, dict(metrics.collect()[0]))
+
+    @override_settings(SNOOZE_METRICS=False)
+    def test_enabled_by_api(self):
+        self.client.get('/api/tests/simple/')
+        self.assertIn('snooze_requests_total{app="tests",model="simple",'
+                      'view="query",status="200"} 1', self.get_samples())
@@ -1,7 +1,13 @@
+import json
+
 from django.test import TestCase
+from django.test.client import RequestFactory
+from django.test.utils import override_settings
+from django.utils.encoding import smart_text
 from django.core import management
 
 from django_snooze import apis
+from django_snooze.exceptions import RESTError
 from django_snooze.resource import ModelResource
 from django_snooze.fields import IntegerField, CharField
 
@@ -47,6 +53,72 @@ class ResourceTestCase(TestCase):
         self.assertEqual(111, obj_dict['one'])
         self.assertEqual('Some string', obj_dict['two'])
 
+    def test_row_serialisation(self):
+        rows = Simple.objects.values_list(*self.resource.columns)
+        for obj, row in zip(Simple.objects.all(), rows):
+            self.assertEqual(
+                json.dumps(self.resource.obj_to_json(obj)),
+                json.dumps(self.resource.row_serialiser(row)))
+
+    def test_tuple_serialisation(self):
+        values = Simple.objects.values_list('two', 'one').get(pk=1)
+        obj_dict = self.resource.tuple_to_json(values, ['two', 'one'])
+        self.assertEqual(['two', 'one'], list(obj_dict.keys()))
+        self.assertEqual(111, obj_dict['one'])
+        self.assertEqual('Some string', obj_dict['two'])
+
+    def test_tuple_serialiser_cache(self):
+        serialiser = self.resource.get_tuple_serialiser(['one'])
+        self.assertIs(serialiser, self.resource.get_tuple_serialiser(['one']))
+        self.assertIsNot(serialiser,
+                         self.resource.get_tuple_serialiser(['two']))
+
+    def test_serialiser_cache_size(self):
+        with override_settings(SNOOZE_SERIALISER_CACHE_SIZE=2):
+            resource = ModelResource(Simple, self.api)
+        for keys in (['one'], ['two'], ['id'], ['one', 'two']):
+            resource.get_tuple_serialiser(keys)
+            resource.get_partial_serialiser(keys)
+        self.assertEqual(2, len(resource._tuple_serialisers))
+        self.assertEqual(2, len(resource._partial_serialisers))
+
+    def test_schema_document(self):
+        document = self.resource.get_schema_document()
+        self.assertIs(document, self.resource.get_schema_document())
+        content, content_type, etag, compressed = document
+        self.assertEqual(self.resource.get_schema(),
+                         json.loads(content.decode('utf-8')))
+        self.resource.rebuild_schema_document()
+        self.assertIsNot(document, self.resource.get_schema_document())
+        self.assertEqual(document, self.resource.get_schema_document())
+
+    def test_lazy(self):
+        resource = ModelResource(Simple, self.api, lazy=True)
+        self.assertNotIn('fields', resource.__dict__)
+        self.assertNotIn('pk_view', resource.__dict__)
+        view = resource.get_lazy_view('pk_view')
+        self.assertNotIn('pk_view', resource.__dict__)
+        r = view(RequestFactory().get('/'), pk_url_arg='1')
+        self.assertEqual(200, r.status_code)
+        self.assertEqual(1, json.loads(smart_text(r.content))['id'])
+        self.assertIn('fields', resource.__dict__)
+        self.assertIn('pk_view', resource.__dict__)
+
+    def test_query_plan(self):
+        plan = self.resource.get_query_plan({'two__in': [], 'one': []},
+                                            {'id__gt': []})
+        self.assertEqual([('one', self.resource.fields_dict['one'], 'exact'),
+                          ('two__in', self.resource.fields_dict['two'],
+                           'in')],
+                         plan.filters)
+        self.assertEqual(['id__gt'], [x[0] for x in plan.excludes])
+        self.assertIs(plan, self.resource.get_query_plan(
+            {'one': [], 'two__in': []}, {'id__gt': []}))
+        self.assertRaises(RESTError, self.resource.get_query_plan,
+                          {'spam': []}, {})
+        self.assertRaises(RESTError, self.resource.get_query_plan,
+                          {'one__spam': []}, {})
+
     def test_stringify(self):
         self.assertEqual(u'snooze resource for tests-simple',
                          self.resource.__unicode__())
@@ -1,12 +1,17 @@
 # -*- coding: utf-8 -*-
 
 import json
+from collections import OrderedDict
 
+import mock
+from django.db import IntegrityError
 from django.test import TestCase
 from django.test.client import Client
+from django.test.utils import override_settings
 from django.core import management
 from django.utils.encoding import smart_text
 
+from django_snooze.cache import get_cache
 from tests.models import Simple
 
 
@@ -56,6 +61,12 @@ class RESTTestCase(TestCase):
         self.assertEqual(one, schema['one'])
         self.assertEqual(u'spam', schema['two']['default'])
 
+    def test_schema_translated_help_text(self):
+        r = self.client.get('/api/auth/user/schema/')
+        self.assertEqual(200, r.status_code)
+        schema = json.loads(smart_text(r.content))
+        self.assertIn(u'Designates', schema['is_staff']['help_text'])
+
     def test_fetch(self):
         r = self.client.get('/api/tests/simple/1/')
         self.assertEqual(200, r.status_code)
@@ -73,6 +84,54 @@ class RESTTestCase(TestCase):
         r = self.client.get('/api/tests/simple/10/')
         self.assertEqual(404, r.status_code)
 
+    def test_fetch_many(self):
+        with self.assertNumQueries(1):
+            r = self.client.get('/api/tests/simple/3,1,999,3/')
+        self.assertEqual(200, r.status_code)
+        r_data = json.loads(smart_text(r.content),
+                            object_pairs_hook=OrderedDict)
+        self.assertEqual([u'3', u'1'], list(r_data['objects'].keys()))
+        self.assertEqual({u'id': 1, u'one': 111, u'two': u'Some string'},
+                         r_data['objects']['1'])
+        self.assertEqual([999], r_data['missing'])
+
+    def test_fetch_many_fields_expand(self):
+        r = self.client.get('/api/tests/related/1,2/'
+                            '?__fields=simple,name&__expand=simple')
+        r_data = json.loads(smart_text(r.content))
+        self.assertEqual({u'name': u'First',
+                          u'simple': {u'id': 1, u'one': 111,
+                                      u'two': u'Some string'}},
+                         r_data['objects']['1'])
+        self.assertEqual(3, r_data['objects']['2']['simple']['id'])
+
+    def test_fetch_many_post(self):
+        r = self.client.post('/api/tests/simple/many/',
+                             data=json.dumps([4, 2, 1000]),
+                             content_type='application/json')
+        self.assertEqual(200, r.status_code)
+        r_data = json.loads(smart_text(r.content),
+                            object_pairs_hook=OrderedDict)
+        self.assertEqual([u'4', u'2'], list(r_data['objects'].keys()))
+        self.assertEqual([1000], r_data['missing'])
+        for pks in (['spam'], [1.5], [True], [None], [[1]], ['-1']):
+            r = self.client.post('/api/tests/simple/many/',
+                                 data=json.dumps(pks),
+                                 content_type='application/json')
+            self.assertEqual(400, r.status_code)
+        r = self.client.post('/api/tests/simple/many/',
+                             data=json.dumps(['4', 2]),
+                             content_type='application/json')
+        self.assertEqual(200, r.status_code)
+        r = self.client.post('/api/tests/simple/many/', data='[1,',
+                             content_type='application/json')
+        self.assertEqual(400, r.status_code)
+        with override_settings(SNOOZE_MAX_PKS=2):
+            r = self.client.post('/api/tests/simple/many/',
+                                 data=json.dumps([1, 2, 3]),
+                                 content_type='application/json')
+        self.assertEqual(400, r.status_code)
+
     def test_create_full(self):
         new_obj_dict = {
             u'one': 42,
@@ -119,6 +178,76 @@ class RESTTestCase(TestCase):
                              data=new_obj_dict)
         self.assertEqual(400, r.status_code)
 
+    @override_settings(SNOOZE_BULK_BATCH_SIZE=2)
+    def test_create_bulk(self):
+        new_objs = [{u'one': 1000 + x} for x in range(5)]
+        # Three inserts between the savepoint queries of the transaction.
+        with self.assertNumQueries(5):
+            r = self.client.post('/api/tests/simple/new/',
+                                 data=json.dumps(new_objs),
+                                 content_type='application/json')
+        self.assertEqual(201, r.status_code)
+        r_data = json.loads(smart_text(r.content))
+        self.assertEqual({u'Status': u'success', u'created': 5}, r_data)
+        created = Simple.objects.filter(one__gte=1000).order_by('one')
+        self.assertEqual([1000, 1001, 1002, 1003, 1004],
+                         [x.one for x in created])
+        self.assertEqual(set([u'spam']), set(x.two for x in created))
+
+    def test_create_bulk_errors(self):
+        new_objs = [{u'one': 1000}, {u'two': u'Need more data'}, 5]
+        r = self.client.post('/api/tests/simple/new/',
+                             data=json.dumps(new_objs),
+                             content_type='application/json')
+        self.assertEqual(201, r.status_code)
+        r_data = json.loads(smart_text(r.content))
+        self.assertEqual(u'partial', r_data['Status'])
+        self.assertEqual(1, r_data['created'])
+        self.assertEqual(set([u'1', u'2']), set(r_data['errors'].keys()))
+        self.assertIn(u'one', r_data['errors']['1'])
+        self.assertEqual(1, Simple.objects.filter(one=1000).count())
+
+        r = self.client.post('/api/tests/simple/new/',
+                             data=json.dumps(new_objs[1:]),
+                             content_type='application/json')
+        self.assertEqual(400, r.status_code)
+
+    def test_create_invalid_body(self):
+        for content in ('{spam', '5', '"spam"', 'null'):
+            r = self.client.post('/api/tests/simple/new/', data=content,
+                                 content_type='application/json')
+            self.assertEqual(400, r.status_code)
+
+        r = self.client.post('/api/tests/simple/new/', data='[]',
+                             content_type='application/json')
+        self.assertEqual(400, r.status_code)
+        self.assertEqual(u'There are no objects to create.',
+                         json.loads(smart_text(r.content)))
+
+    def test_create_bulk_integrity_error(self):
+        new_objs = [{u'one': 1000}, {u'one': 1001}]
+        with mock.patch.object(Simple.objects, 'bulk_create',
+                               side_effect=IntegrityError('UNIQUE')):
+            r = self.client.post('/api/tests/simple/new/',
+                                 data=json.dumps(new_objs),
+                                 content_type='application/json')
+        self.assertEqual(400, r.status_code)
+        r_data = json.loads(smart_text(r.content))
+        self.assertEqual(u'failed', r_data['Status'])
+        self.assertIn(u'__all__', r_data['errors'])
+        self.assertFalse(Simple.objects.filter(one__gte=1000).exists())
+
+    def test_create_ndjson(self):
+        content = '{"one": 1000}\n\n{"one": 1001, "two": "Eggs"}\n{"one"\n'
+        r = self.client.post('/api/tests/simple/new/',
+                             data=content,
+                             content_type='application/x-ndjson')
+        self.assertEqual(201, r.status_code)
+        r_data = json.loads(smart_text(r.content))
+        self.assertEqual(2, r_data['created'])
+        self.assertEqual([u'2'], list(r_data['errors'].keys()))
+        self.assertEqual(u'Eggs', Simple.objects.get(one=1001).two)
+
     def test_query_all(self):
         r = self.client.get('/api/tests/simple/')
         self.assertEqual(200, r.status_code)
@@ -235,3 +364,352 @@ class RESTTestCase(TestCase):
     def test_values_list_invalid_field(self):
         r = self.client.get('/api/tests/simple/?__values_list=on')
         self.assertEqual(400, r.status_code)
+
+    def test_query_duplicate_fields(self):
+        for query in ('__values_list=name,simple,name', '__fields=name,name',
+                      '__fields=id,other&__expand=other,other'):
+            r = self.client.get('/api/tests/related/?{}'.format(query))
+            self.assertEqual(400, r.status_code)
+            self.assertIn('more than once', smart_text(r.content))
+
+    def test_query_limit(self):
+        r = self.client.get('/api/tests/simple/?__order_by=id&__limit=2')
+        self.assertEqual(200, r.status_code)
+        r_data = json.loads(smart_text(r.content))
+        self.assertEqual([1, 2], [obj['id'] for obj in r_data['objects']])
+        self.assertIsNone(r_data['prev'])
+        self.assertIn('__offset=2', r_data['next'])
+
+    def test_query_offset(self):
+        r = self.client.get(
+            '/api/tests/simple/?__order_by=id&__limit=2&__offset=4')
+        self.assertEqual(200, r.status_code)
+        r_data = json.loads(smart_text(r.content))
+        self.assertEqual([5, 6], [obj['id'] for obj in r_data['objects']])
+        self.assertIsNone(r_data['next'])
+        self.assertIn('__offset=2', r_data['prev'])
+
+    def test_query_invalid_limit(self):
+        r = self.client.get('/api/tests/simple/?__limit=spam')
+        self.assertEqual(400, r.status_code)
+        r = self.client.get('/api/tests/simple/?__limit=0')
+        self.assertEqual(400, r.status_code)
+
+    def test_query_keyset(self):
+        r = self.client.get('/api/tests/simple/?__limit=4&__after=')
+        self.assertEqual(200, r.status_code)
+        r_data = json.loads(smart_text(r.content))
+        self.assertEqual([1, 2, 3, 4],
+                         [obj['id'] for obj in r_data['objects']])
+        self.assertIsNone(r_data['prev'])
+
+        r = self.client.get(r_data['next'])
+        r_data = json.loads(smart_text(r.content))
+        self.assertEqual([5, 6], [obj['id'] for obj in r_data['objects']])
+        self.assertIsNone(r_data['next'])
+
+        r = self.client.get(r_data['prev'])
+        r_data = json.loads(smart_text(r.content))
+        self.assertEqual([1, 2, 3, 4],
+                         [obj['id'] for obj in r_data['objects']])
+
+    def test_query_keyset_ordered(self):
+        r = self.client.get(
+            '/api/tests/simple/?__order_by=-one,two&__limit=3&__after=')
+        r_data = json.loads(smart_text(r.content))
+        self.assertEqual([333, 333, 222],
+                         [obj['one'] for obj in r_data['objects']])
+
+        r = self.client.get(r_data['next'])
+        self.assertEqual(200, r.status_code)
+        r_data = json.loads(smart_text(r.content))
+        self.assertEqual(['Some string', 'A', 'B'],
+                         [obj['two'] for obj in r_data['objects']])
+
+    def walk_pages(self, path, link='next'):
+        ids = []
+        while path:
+            r = self.client.get(path)
+            self.assertEqual(200, r.status_code)
+            r_data = json.loads(smart_text(r.content))
+            ids += [obj['id'] for obj in r_data['objects']]
+            path = r_data[link]
+        return ids
+
+    def test_query_keyset_nullable(self):
+        for ordering in ('other', '-other'):
+            ids = self.walk_pages('/api/tests/related/?__order_by={}&'
+                                  '__limit=1&__after='.format(ordering))
+            self.assertEqual([1, 2], sorted(ids))
+            ids = self.walk_pages('/api/tests/related/?__order_by={}&'
+                                  '__limit=1&__before='.format(ordering),
+                                  link='prev')
+            self.assertEqual([1, 2], sorted(ids))
+
+    def test_query_offset_stable(self):
+        ids = self.walk_pages('/api/tests/simple/?__order_by=one&__limit=1')
+        self.assertEqual([1, 2, 3, 4, 5, 6], sorted(ids))
+        self.assertEqual(sorted(ids, key=lambda x: (
+            Simple.objects.get(pk=x).one, x)), ids)
+
+    def test_query_keyset_values_list(self):
+        r = self.client.get(
+            '/api/tests/simple/?__values_list=one&__limit=5&__after=1')
+        self.assertEqual(200, r.status_code)
+        r_data = json.loads(smart_text(r.content))
+        self.assertEqual([{'one': 222}, {'one': 333}, {'one': 1},
+                          {'one': 1}, {'one': 333}], r_data['objects'])
+
+    def test_query_keyset_invalid_key(self):
+        r = self.client.get('/api/tests/simple/?__order_by=one&__after=1')
+        self.assertEqual(400, r.status_code)
+        r = self.client.get('/api/tests/simple/?__after=spam')
+        self.assertEqual(400, r.status_code)
+        r = self.client.get('/api/tests/simple/?__after=1&__offset=1')
+        self.assertEqual(400, r.status_code)
+
+    def test_query_stream_json(self):
+        r = self.client.get('/api/tests/simple/?__stream=1&__limit=4')
+        self.assertEqual(200, r.status_code)
+        self.assertTrue(r.streaming)
+        self.assertEqual(u'application/json; charset=utf-8',
+                         r['Content-Type'])
+        r_data = json.loads(smart_text(b''.join(r.streaming_content)))
+        self.assertEqual(4, len(r_data['objects']))
+        self.assertEqual(111, r_data['objects'][0]['one'])
+        self.assertIn('__offset=4', r_data['next'])
+        self.assertIsNone(r_data['prev'])
+
+    def test_query_stream_ndjson(self):
+        r = self.client.get('/api/tests/simple/?two__contains=string',
+                            HTTP_ACCEPT='application/x-ndjson')
+        self.assertEqual(200, r.status_code)
+        self.assertTrue(r.streaming)
+        lines = smart_text(b''.join(r.streaming_content)).splitlines()
+        self.assertEqual(3, len(lines))
+        self.assertEqual(222, json.loads(lines[1])['one'])
+
+    def test_query_stream_invalid(self):
+        r = self.client.get('/api/tests/simple/?__stream=spam')
+        self.assertEqual(400, r.status_code)
+        r = self.client.get('/api/tests/simple/?__stream=1&three=333')
+        self.assertEqual(400, r.status_code)
+        r = self.client.get('/api/tests/simple/?__stream=1&__layout=rows')
+        self.assertEqual(400, r.status_code)
+        r = self.client.get('/api/tests/simple/?__stream=1&__format=spam')
+        self.assertEqual(406, r.status_code)
+        r = self.client.get('/api/tests/simple/?__stream=1&__format=csv')
+        self.assertEqual(406, r.status_code)
+        r = self.client.get('/api/tests/simple/?__stream=1&__format=json')
+        self.assertEqual(200, r.status_code)
+
+    def test_query_foreign_keys(self):
+        with self.assertNumQueries(1):
+            r = self.client.get('/api/tests/related/?__order_by=id')
+        self.assertEqual(200, r.status_code)
+        r_data = json.loads(smart_text(r.content))
+        self.assertEqual(1, r_data['objects'][0]['simple'])
+        self.assertEqual(2, r_data['objects'][0]['other'])
+        self.assertIsNone(r_data['objects'][1]['other'])
+
+    def test_query_expand(self):
+        with self.assertNumQueries(1):
+            r = self.client.get(
+                '/api/tests/related/?__order_by=id&__expand=simple,other')
+        self.assertEqual(200, r.status_code)
+        r_data = json.loads(smart_text(r.content))
+        first, second = r_data['objects']
+        self.assertEqual({u'id': 1, u'one': 111, u'two': u'Some string'},
+                         first['simple'])
+        self.assertEqual(222, first['other']['one'])
+        self.assertEqual(333, second['simple']['one'])
+        self.assertIsNone(second['other'])
+
+    def test_query_expand_invalid(self):
+        r = self.client.get('/api/tests/related/?__expand=name')
+        self.assertEqual(400, r.status_code)
+        r = self.client.get(
+            '/api/tests/related/?__expand=simple&__values_list=name')
+        self.assertEqual(400, r.status_code)
+
+    def test_fetch_expand(self):
+        with self.assertNumQueries(1):
+            r = self.client.get('/api/tests/related/1/')
+        self.assertEqual(200, r.status_code)
+        obj = json.loads(smart_text(r.content))
+        self.assertEqual(1, obj['simple'])
+
+        with self.assertNumQueries(1):
+            r = self.client.get('/api/tests/related/2/?__expand=simple,other')
+        self.assertEqual(200, r.status_code)
+        obj = json.loads(smart_text(r.content))
+        self.assertEqual(u'Yet another string', obj['simple']['two'])
+        self.assertIsNone(obj['other'])
+
+    def test_query_fields(self):
+        with self.assertNumQueries(1):
+            r = self.client.get('/api/tests/simple/?__fields=two,id')
+        self.assertEqual(200, r.status_code)
+        r_data = json.loads(smart_text(r.content))
+        self.assertEqual(6, len(r_data['objects']))
+        self.assertEqual({u'id': 1, u'two': u'Some string'},
+                         r_data['objects'][0])
+
+    def test_query_fields_expand(self):
+        r = self.client.get(
+            '/api/tests/related/?__fields=simple&__expand=simple')
+        self.assertEqual(200, r.status_code)
+        r_data = json.loads(smart_text(r.content))
+        self.assertEqual([u'simple'], list(r_data['objects'][0].keys()))
+        self.assertEqual(111, r_data['objects'][0]['simple']['one'])
+
+    def test_query_fields_keyset(self):
+        r = self.client.get(
+            '/api/tests/simple/?__fields=one&__limit=2&__after=')
+        self.assertEqual(200, r.status_code)
+        r_data = json.loads(smart_text(r.content))
+        self.assertEqual([{u'one': 111}, {u'one': 222}], r_data['objects'])
+        self.assertIn('__after=2', r_data['next'])
+
+    def test_query_fields_invalid(self):
+        r = self.client.get('/api/tests/simple/?__fields=on')
+        self.assertEqual(400, r.status_code)
+        r = self.client.get(
+            '/api/tests/simple/?__fields=one&__values_list=one')
+        self.assertEqual(400, r.status_code)
+        r = self.client.get(
+            '/api/tests/related/?__fields=name&__expand=simple')
+        self.assertEqual(400, r.status_code)
+
+    def test_fetch_fields(self):
+        r = self.client.get('/api/tests/simple/1/?__fields=one')
+        self.assertEqual(200, r.status_code)
+        obj = json.loads(smart_text(r.content))
+        self.assertEqual({u'one': 111}, obj)
+        r = self.client.get('/api/tests/related/1/?__fields=name,other'
+                            '&__expand=other')
+        self.assertEqual(200, r.status_code)
+        obj = json.loads(smart_text(r.content))
+        self.assertEqual(u'First', obj['name'])
+        self.assertEqual(222, obj['other']['one'])
+        r = self.client.get('/api/tests/simple/1/?__fields=on')
+        self.assertEqual(400, r.status_code)
+
+    def test_query_count(self):
+        r = self.client.get('/api/tests/simple/?two__contains=string'
+                            '&__count=1')
+        self.assertEqual(200, r.status_code)
+        self.assertEqual('3', r['X-Total-Count'])
+        r_data = json.loads(smart_text(r.content))
+        self.assertEqual({u'count': 3, u'estimated': False}, r_data)
+
+    def test_query_count_head(self):
+        r = self.client.head('/api/tests/simple/?!one=333')
+        self.assertEqual(200, r.status_code)
+        self.assertEqual('4', r['X-Total-Count'])
+        self.assertEqual(b'', r.content)
+        r = self.client.head('/api/tests/simple/?three=333')
+        self.assertEqual(400, r.status_code)
+
+    @override_settings(SNOOZE_COUNT_CACHE_TIMEOUT=60)
+    def test_query_count_cached(self):
+        get_cache().clear()
+        r = self.client.head('/api/tests/simple/?one=333&two__contains=s')
+        self.assertEqual('1', r['X-Total-Count'])
+        with self.assertNumQueries(0):
+            r = self.client.head('/api/tests/simple/?two__contains=s&one=333')
+        self.assertEqual('1', r['X-Total-Count'])
+
+    @override_settings(SNOOZE_COUNT_ESTIMATE_THRESHOLD=0)
+    def test_query_count_estimate_unsupported(self):
+        r = self.client.get('/api/tests/simple/?__count=1')
+        self.assertEqual('6', r['X-Total-Count'])
+        self.assertFalse(r.has_header('X-Total-Count-Estimated'))
+
+    def test_bulk_update(self):
+        r = self.client.patch('/api/tests/simple/?one=333',
+                              data=json.dumps({'two': 'Updated'}),
+                              content_type='application/json')
+        self.assertEqual(200, r.status_code)
+        r_data = json.loads(smart_text(r.content))
+        self.assertEqual({u'Status': u'success', u'count': 2}, r_data)
+        self.assertEqual(2, Simple.objects.filter(two='Updated').count())
+
+    def test_bulk_update_invalid(self):
+        r = self.client.patch('/api/tests/simple/?one=333',
+                              data=json.dumps({'one': 'spam', 'id': 5}),
+                              content_type='application/json')
+        self.assertEqual(400, r.status_code)
+        r_data = json.loads(smart_text(r.content))
+        self.assertEqual(set([u'one', u'id']), set(r_data['errors'].keys()))
+        r = self.client.patch('/api/tests/simple/?one=333',
+                              data=json.dumps([]),
+                              content_type='application/json')
+        self.assertEqual(400, r.status_code)
+        r = self.client.patch('/api/tests/simple/?one=333', data='{spam',
+                              content_type='application/json')
+        self.assertEqual(400, r.status_code)
+
+    def test_bulk_delete(self):
+        r = self.client.delete('/api/tests/simple/?one=1')
+        self.assertEqual(200, r.status_code)
+        r_data = json.loads(smart_text(r.content))
+        self.assertEqual(2, r_data['count'])
+        self.assertEqual(4, Simple.objects.count())
+
+    def test_bulk_require_filter(self):
+        r = self.client.delete('/api/tests/simple/')
+        self.assertEqual(400, r.status_code)
+        self.assertEqual(6, Simple.objects.count())
+        with override_settings(SNOOZE_BULK_REQUIRE_FILTER=False):
+            r = self.client.patch('/api/tests/simple/',
+                                  data=json.dumps({'two': 'Updated'}),
+                                  content_type='application/json')
+        self.assertEqual(200, r.status_code)
+        self.assertEqual(6, Simple.objects.filter(two='Updated').count())
+
+    def test_bulk_system_params(self):
+        r = self.client.delete('/api/tests/simple/?one=1&__limit=1')
+        self.assertEqual(400, r.status_code)
+        self.assertIn('__limit', json.loads(smart_text(r.content)))
+        r = self.client.patch('/api/tests/simple/?one=333&__order_by=id',
+                              data=json.dumps({'two': 'Updated'}),
+                              content_type='application/json')
+        self.assertEqual(400, r.status_code)
+        self.assertEqual(6, Simple.objects.count())
+        self.assertFalse(Simple.objects.filter(two='Updated').exists())
+
+    @override_settings(SNOOZE_BULK_MAX_ROWS=1)
+    def test_bulk_max_rows(self):
+        r = self.client.delete('/api/tests/simple/?one=1')
+        self.assertEqual(400, r.status_code)
+        self.assertEqual(6, Simple.objects.count())
+        r = self.client.delete('/api/tests/simple/?one=111')
+        self.assertEqual(200, r.status_code)
+
+    def test_query_layout_rows(self):
+        r = self.client.get('/api/tests/simple/?__values_list=one,two'
+                            '&__order_by=id&__limit=2&__layout=rows')
+        self.assertEqual(200, r.status_code)
+        r_data = json.loads(smart_text(r.content))
+        self.assertEqual([u'one', u'two'], r_data['columns'])
+        self.assertEqual([[111, u'Some string'], [222, u'Some other string']],
+                         r_data['rows'])
+        self.assertIsNotNone(r_data['next'])
+
+    def test_query_layout_columns(self):
+        r = self.client.get('/api/tests/related/?__order_by=id'
+                            '&__layout=columns')
+        self.assertEqual(200, r.status_code)
+        r_data = json.loads(smart_text(r.content))
+        self.assertEqual([u'id', u'simple', u'other', u'name'],
+                         r_data['columns'])
+        self.assertEqual([[1, 2], [1, 3], [2, None], [u'First', u'Second']],
+                         r_data['data'])
+
+    def test_query_layout_invalid(self):
+        r = self.client.get('/api/tests/simple/?__layout=spam')
+        self.assertEqual(400, r.status_code)
+        r = self.client.get('/api/tests/related/?__layout=rows'
+                            '&__expand=simple')
+        self.assertEqual(400, r.status_code)
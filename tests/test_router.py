@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+from django.core import management
+from django.core.urlresolvers import resolve, reverse
+from django.test import TestCase
+from django.test.client import Client
+from django.test.utils import override_settings
+from django.utils.encoding import smart_text
+
+
+@override_settings(ROOT_URLCONF='tests.router_urls')
+class RouterTestCase(TestCase):
+
+    def setUp(self):
+        management.call_command('loaddata',
+                                'django_snooze/fixtures/test_data.json',
+                                verbosity=0)
+        self.client = Client()
+
+    def tearDown(self):
+        management.call_command('flush', interactive=False, verbosity=0)
+
+    def test_resolve(self):
+        match = resolve('/api/tests/simple/1/')
+        self.assertEqual('router', match.url_name)
+        self.assertEqual('1/', match.kwargs['path'])
+
+    def test_reverse(self):
+        self.assertEqual('/api/tests/simple/1/',
+                         reverse('django_snooze:snooze_tests_simple_pk',
+                                 kwargs={'pk_url_arg': 1}))
+
+    def test_routes(self):
+        r = self.client.get('/api/tests/simple/1/')
+        self.assertEqual(200, r.status_code)
+        self.assertEqual(1, json.loads(smart_text(r.content))['id'])
+        r = self.client.get('/api/tests/simple/schema/')
+        self.assertEqual(200, r.status_code)
+        r = self.client.get('/api/tests/simple/', {'one': 1})
+        self.assertEqual(200, r.status_code)
+        r = self.client.post('/api/tests/simple/new/',
+                             data=json.dumps({'one': 7}),
+                             content_type='application/json')
+        self.assertEqual(201, r.status_code)
+        data = json.loads(smart_text(r.content))
+        self.assertEqual('/api/tests/simple/{}/'.format(data['pk']),
+                         data['Location'])
+
+    def test_not_found(self):
+        r = self.client.get('/api/tests/nonexistent/')
+        self.assertEqual(404, r.status_code)
+        r = self.client.get('/api/tests/simple/spam/')
+        self.assertEqual(404, r.status_code)
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+import json
+from collections import OrderedDict
+
+from django.core import management
+from django.test import TestCase
+from django.test.client import Client
+from django.utils.encoding import smart_text
+
+from django_snooze import serialisers
+
+
+class NegotiationTestCase(TestCase):
+
+    def test_parse_accept(self):
+        self.assertEqual(['text/csv', 'application/json', '*/*'],
+                         serialisers.parse_accept(
+                             'application/json;q=0.9, */*;q=0.1, '
+                             'text/csv, image/png;q=0'))
+
+    def test_negotiate(self):
+        self.assertEqual('csv', serialisers.negotiate('text/*').name)
+        self.assertEqual('json', serialisers.negotiate('*/*').name)
+        self.assertEqual('json', serialisers.negotiate(
+            'text/html;q=0.5, application/json').name)
+        self.assertIsNone(serialisers.negotiate('image/png'))
+
+    def test_csv(self):
+        content = {'objects': [OrderedDict([('id', 1), ('two', u'Spä,m')]),
+                               OrderedDict([('id', 2), ('two', None)])]}
+        self.assertEqual(u'id,two\r\n1,"Spä,m"\r\n2,\r\n',
+                         smart_text(serialisers.SERIALISERS['csv'].serialise(
+                             content)))
+
+
+class FormatTestCase(TestCase):
+
+    def setUp(self):
+        management.call_command('loaddata',
+                                'django_snooze/fixtures/test_data.json',
+                                verbosity=0)
+        self.client = Client()
+
+    def tearDown(self):
+        management.call_command('flush', interactive=False, verbosity=0)
+
+    def test_format_param(self):
+        r = self.client.get('/api/tests/simple/?one=111&__format=csv'
+                            '&__values_list=id,two')
+        self.assertEqual(200, r.status_code)
+        self.assertEqual('text/csv; charset=utf-8', r['Content-Type'])
+        self.assertEqual(u'id,two\r\n1,Some string\r\n', smart_text(r.content))
+
+    def test_accept(self):
+        r = self.client.get('/api/tests/simple/1/', HTTP_ACCEPT='text/csv')
+        self.assertEqual('text/csv; charset=utf-8', r['Content-Type'])
+        self.assertIn('Accept', r['Vary'])
+        r = self.client.get('/api/tests/simple/1/', HTTP_ACCEPT='text/html')
+        self.assertEqual('application/json; charset=utf-8',
+                         r['Content-Type'])
+
+    def test_csv_rows(self):
+        r = self.client.get('/api/tests/simple/?__order_by=id&__limit=1'
+                            '&__layout=rows&__format=csv')
+        self.assertEqual(u'id,one,two\r\n1,111,Some string\r\n',
+                         smart_text(r.content))
+        r = self.client.get('/api/tests/simple/?__order_by=id&__limit=2'
+                            '&__layout=columns&__format=csv')
+        self.assertEqual(u'id,one,two\r\n1,111,Some string\r\n'
+                         u'2,222,Some other string\r\n',
+                         smart_text(r.content))
+
+    def test_document(self):
+        r = self.client.get('/api/tests/simple/schema/?__format=csv')
+        self.assertEqual('text/csv; charset=utf-8', r['Content-Type'])
+        self.assertTrue(smart_text(r.content).startswith(u'id,one,two'))
+
+    def test_unavailable(self):
+        r = self.client.get('/api/tests/simple/1/?__format=spam')
+        self.assertEqual(406, r.status_code)
+        self.assertEqual('application/json; charset=utf-8',
+                         r['Content-Type'])
+        self.assertIn(u'json', json.loads(smart_text(r.content)))
+        if not serialisers.SERIALISERS['msgpack'].available:
+            r = self.client.get('/api/tests/simple/1/?__format=msgpack')
+            self.assertEqual(406, r.status_code)